@@ -0,0 +1,135 @@
+"""
+Measures how long the CLI takes to start.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and reports
+the cumulative import time of main and of its slowest top-level imports, the
+wall-clock time of `python main.py --help`, and which heavy optional
+dependencies got imported at startup (none should be).
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--top 10] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that only some commands need and that must not load at startup
+HEAVY_MODULES = ('flask', 'requests', 'pycountry', 'dotenv', 'numpy', 'aiohttp')
+
+
+def import_times(module='main'):
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str, optional): The module to import. Defaults to 'main'.
+
+    Returns:
+        list: (module name, nesting level, self time, cumulative time) tuples,
+              times in microseconds, in the order the imports finished.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), level, int(self_time), int(cumulative)))
+    return times
+
+
+def loaded_heavy_modules(module='main'):
+    """
+    Returns the HEAVY_MODULES that importing a module loads, in a fresh interpreter.
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+
+def help_wall_time(runs):
+    """
+    Times `python main.py --help` end to end.
+
+    Returns:
+        list: The wall-clock time of every run, in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py', '--help'],
+                       cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(runs=5, top=10):
+    """
+    Runs the startup benchmark.
+
+    Args:
+        runs (int, optional): How many fresh interpreters to measure. Defaults to 5.
+        top (int, optional): How many of the slowest imports to report. Defaults to 10.
+
+    Returns:
+        dict: 'import_main_ms' and 'help_ms' (medians), 'slowest_imports'
+              as (module, milliseconds) pairs, and 'heavy_modules_loaded'.
+    """
+    main_times = []
+    slowest = {}
+    for _ in range(runs):
+        times = import_times()
+        main_times.append(next(cumulative for name, level, _, cumulative in times
+                               if name == 'main' and level == 0))
+        # Direct imports of main, not the interpreter's site setup; a module's
+        # imports are reported before the module itself
+        children = []
+        for name, level, _, cumulative in times:
+            if level == 1:
+                children.append((name, cumulative))
+            elif level == 0:
+                if name == 'main':
+                    for child, child_time in children:
+                        slowest.setdefault(child, []).append(child_time)
+                children = []
+    ranked = sorted(((name, statistics.median(values) / 1000) for name, values in slowest.items()),
+                    key=lambda item: -item[1])
+    return {
+        'import_main_ms': round(statistics.median(main_times) / 1000, 2),
+        'help_ms': round(statistics.median(help_wall_time(runs)), 2),
+        'slowest_imports': [(name, round(ms, 2)) for name, ms in ranked[:top]],
+        'heavy_modules_loaded': loaded_heavy_modules(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the startup time of main.py')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to measure (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    report = run(runs=args.runs, top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import main:        {report['import_main_ms']:.1f} ms (median of {args.runs})")
+    print(f"main.py --help:     {report['help_ms']:.1f} ms wall clock")
+    print(f"heavy deps loaded:  {', '.join(report['heavy_modules_loaded']) or 'none'}")
+    print("\nSlowest imports (cumulative):")
+    for name, ms in report['slowest_imports']:
+        print(f"  {ms:8.2f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Benchmarks the storage backends and the MovieApp commands on synthetic catalogs.
+
+For every backend and catalog size, a catalog of generated movies is written
+once, then every operation runs `repeat` times on a fresh copy of that file
+with a fresh storage instance, so caches start cold like in a new process.
+Each operation is timed without tracing, then run once more under tracemalloc
+for its peak memory.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 10000 --output results.json
+    python -m benchmarks.suite --sizes 1000 10000 --compare results.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+from movie_app.movie_app import MovieApp
+from movie_app.website import WebsiteGenerator
+from storage.storage_binary import StorageBinary
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.storage_sqlite import StorageSqlite
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backend name -> (file extension, storage class); new backends only need an entry here
+BACKENDS = {
+    'json': ('.json', StorageJson),
+    'csv': ('.csv', StorageCsv),
+    'sqlite': ('.db', StorageSqlite),
+    'binary': ('.bin', StorageBinary),
+}
+
+DEFAULT_SIZES = (1000, 10000)
+
+# Slowdown over the baseline above which --compare reports a regression
+REGRESSION_THRESHOLD = 1.2
+
+WORDS = ('Dark', 'Night', 'Return', 'Lost', 'City', 'Star', 'Shadow', 'Last', 'Love',
+         'Blood', 'King', 'Secret', 'River', 'Dream', 'Iron', 'Ghost', 'Empire', 'Winter',
+         'Silent', 'Golden', 'Road', 'Storm', 'Queen', 'Fire', 'Garden', 'Machine', 'Ocean',
+         'Hunter', 'Island', 'Memory', 'Light', 'Wild', 'Red', 'Stranger', 'Train', 'Moon')
+LANGUAGES = ('English', 'French', 'Spanish', 'German', 'Japanese', 'Korean', 'Italian', 'Hindi')
+COUNTRIES = ('USA', 'UK', 'France', 'Germany', 'Japan', 'South Korea', 'Italy', 'India', 'Canada')
+
+
+def synthetic_catalog(size, seed=0):
+    """
+    Generates a reproducible catalog of movies in the format of IStorage.add_movies.
+
+    Titles are made of common words plus a running number, so they are unique
+    and share words like real titles do. About 3% of the movies have no rating.
+
+    Args:
+        size (int): The number of movies.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        list: Movie dictionaries with the keys of MOVIE_FIELDS.
+    """
+    rng = random.Random(seed)
+    movies = []
+    for number in range(size):
+        countries = rng.sample(COUNTRIES, 2 if rng.random() < 0.2 else 1)
+        movies.append({
+            'title': f"{' '.join(rng.sample(WORDS, rng.randint(1, 3)))} {number}",
+            'year': str(rng.randint(1920, 2024)),
+            'rating': 'N/A' if rng.random() < 0.03 else f"{rng.uniform(1.0, 10.0):.1f}",
+            'poster': f"https://example.com/posters/{number}.jpg",
+            'language': rng.choice(LANGUAGES),
+            'country': ', '.join(countries),
+            'awards': 'N/A' if rng.random() < 0.7 else f"Won {rng.randint(1, 5)} Oscars.",
+            'imdbID': f"tt{number:08d}",
+        })
+    return movies
+
+
+def _quiet(command, *inputs):
+    """
+    Runs a MovieApp command with the given answers to its prompts and its output discarded.
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            patch('builtins.input', side_effect=list(inputs)):
+        command()
+
+
+def _operations(catalog):
+    """
+    Returns the benchmarked operations, keyed by name.
+
+    Every operation is a function of a context dictionary holding the
+    'storage_class', the data file 'path', a 'work' directory and, unless
+    the operation opens the file itself, the 'storage' and the 'app'.
+    """
+    middle = catalog[len(catalog) // 2]
+    query = ' '.join(middle['title'].split()[:2])
+    new_movie = dict(catalog[0], title="Benchmark Movie", imdbID="tt99999999")
+
+    def generate_website(context):
+        generator = WebsiteGenerator(template_path=os.path.join(ROOT, 'static', 'index_template.html'),
+                                     output_path=os.path.join(context['work'], 'index.html'))
+        generator.generate(context['storage'].list_movies().items())
+
+    return {
+        'load': lambda context: context['storage_class'](context['path']).list_movies(),
+        'check_if_exists': lambda context: (context['storage'].check_if_exists(middle['title']),
+                                            context['storage'].check_if_exists("Missing Movie")),
+        'add': lambda context: context['storage'].add_movies([new_movie]),
+        'update': lambda context: context['storage'].update_movie(middle['title'], rating=9.9),
+        'delete': lambda context: context['storage'].delete_movie(middle['title']),
+        'list': lambda context: _quiet(context['app']._command_list_movies),
+        'search': lambda context: _quiet(context['app']._command_search_movie, query),
+        'filter': lambda context: _quiet(context['app']._command_filter_movies, '8'),
+        'sort': lambda context: _quiet(context['app']._command_sort_movies_by_rating),
+        'status': lambda context: _quiet(context['app']._command_status),
+        'website': generate_website,
+    }
+
+
+def _close(storage):
+    """
+    Closes a storage that holds a connection, like StorageSqlite.
+    """
+    if hasattr(storage, 'close'):
+        storage.close()
+
+
+def measure(operation, setup, repeat=3):
+    """
+    Times an operation and measures its peak memory.
+
+    Args:
+        operation (callable): The operation, called with the context setup returns.
+        setup (callable): Prepares a fresh context; it is not measured.
+        repeat (int, optional): How many timed runs to make. Defaults to 3.
+
+    Returns:
+        dict: 'seconds' (median), 'min_seconds' and 'peak_bytes' allocated by the operation.
+    """
+    timings = []
+    for _ in range(repeat):
+        context = setup()
+        try:
+            start = time.perf_counter()
+            operation(context)
+            timings.append(time.perf_counter() - start)
+        finally:
+            _close(context.get('storage'))
+
+    context = setup()
+    try:
+        tracemalloc.start()
+        operation(context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        _close(context.get('storage'))
+    return {'seconds': statistics.median(timings),
+            'min_seconds': min(timings),
+            'peak_bytes': peak}
+
+
+def run(backends=tuple(BACKENDS), sizes=DEFAULT_SIZES, operations=None, repeat=3, seed=0):
+    """
+    Runs the benchmarks.
+
+    Args:
+        backends (iterable, optional): Names out of BACKENDS. Defaults to all of them.
+        sizes (iterable, optional): Catalog sizes. Defaults to DEFAULT_SIZES.
+        operations (iterable, optional): Operation names, see _operations. Defaults to all.
+        repeat (int, optional): Timed runs per operation. Defaults to 3.
+        seed (int, optional): The seed of the synthetic catalogs. Defaults to 0.
+
+    Returns:
+        dict: 'meta' describing the run and 'results', one entry per
+              backend, size and operation.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            catalog = synthetic_catalog(size, seed)
+            available = _operations(catalog)
+            selected = list(operations) if operations else list(available)
+            unknown = set(selected) - set(available)
+            if unknown:
+                raise ValueError(f"Unknown operation(s): {', '.join(sorted(unknown))}")
+            for backend in backends:
+                extension, storage_class = BACKENDS[backend]
+                pristine = os.path.join(directory, f"catalog-{size}{extension}")
+                # Quietly, since file storages warn that the new file does not exist yet
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    storage = storage_class(pristine)
+                    storage.add_movies(catalog)
+                    _close(storage)
+
+                work = os.path.join(directory, 'work')
+
+                def setup(opens_file=False):
+                    shutil.rmtree(work, ignore_errors=True)
+                    os.makedirs(work)
+                    path = os.path.join(work, f"movies{extension}")
+                    shutil.copyfile(pristine, path)
+                    context = {'storage_class': storage_class, 'path': path, 'work': work}
+                    if not opens_file:
+                        context['storage'] = storage_class(path)
+                        context['app'] = MovieApp(context['storage'])
+                    return context
+
+                for name in selected:
+                    measured = measure(available[name],
+                                       lambda: setup(opens_file=name == 'load'),
+                                       repeat=repeat)
+                    results.append({'backend': backend, 'size': size, 'operation': name, **measured})
+    return {'meta': _meta(repeat, seed), 'results': results}
+
+
+def _meta(repeat, seed):
+    """
+    Describes the benchmark run: commit, interpreter, machine and settings.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+    }
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares two benchmark reports.
+
+    Args:
+        baseline (dict): The earlier report, as returned by run().
+        current (dict): The new report.
+        threshold (float, optional): The slowdown ratio counted as a regression.
+
+    Returns:
+        list: (backend, size, operation, time ratio, memory ratio, regressed) tuples
+              for the entries present in both reports. A ratio above 1 means slower
+              (or more memory) than the baseline.
+    """
+    earlier = {(entry['backend'], entry['size'], entry['operation']): entry
+               for entry in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        key = (entry['backend'], entry['size'], entry['operation'])
+        if key not in earlier:
+            continue
+        before = earlier[key]
+        time_ratio = entry['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        memory_ratio = entry['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else 1.0
+        rows.append((*key, round(time_ratio, 3), round(memory_ratio, 3),
+                     time_ratio > threshold or memory_ratio > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the storage backends and app commands')
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                        help='Backends to benchmark (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='Catalog sizes, e.g. 1000 10000 100000 1000000 (default: 1000 10000)')
+    parser.add_argument('--operations', nargs='+', help='Operations to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per operation (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic catalogs')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='Compare against an earlier JSON report; exits with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Slowdown ratio counted as a regression (default: {REGRESSION_THRESHOLD})')
+    args = parser.parse_args()
+
+    report = run(backends=args.backends, sizes=args.sizes, operations=args.operations,
+                 repeat=args.repeat, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    elif not args.compare:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        rows = compare(baseline, report, threshold=args.threshold)
+        for backend, size, operation, time_ratio, memory_ratio, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{backend:8} {size:>9} {operation:16} time x{time_ratio:<7} "
+                  f"memory x{memory_ratio:<7}{flag}")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
 import argparse
+import json
 import os
 from storage.storage_json import StorageJson
 from storage.storage_csv import StorageCsv
-from movie_app.movie_app import MovieApp
+from storage.storage_sqlite import StorageSqlite
+from storage.storage_binary import StorageBinary
+from movie_app.movie_app import MovieApp, load_environment
+from movie_app.omdb_cache import OmdbCache
+from movie_app.instrumentation import Metrics, profile_call
 
 def main():
     """
@@ -26,7 +31,110 @@ def main():
         type=str,
         nargs='?',
         default='data/data.json',  # Default file path if none provided
-        help='Path to the data file (must be a .csv or .json file)'
+        help='Path to the data file (must be a .csv, .json, .db, .sqlite or .bin file)'
+    )
+
+    # Optional non-interactive bulk import of a file of titles
+    parser.add_argument(
+        '--import-titles',
+        metavar='TITLES_FILE',
+        help='Import the movies listed in TITLES_FILE (one title per line) and exit'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of concurrent OMDb lookups for --import-titles (default: 8)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=5.0,
+        help='Maximum OMDb requests per second for --import-titles (default: 5)'
+    )
+
+    parser.add_argument(
+        '--engine',
+        choices=['threads', 'asyncio'],
+        default='threads',
+        help='Run the --import-titles lookups on a thread pool or on an asyncio event loop'
+    )
+    parser.add_argument(
+        '--omdb-cache',
+        metavar='CACHE_FILE',
+        default=None,
+        help='SQLite file caching OMDb responses between runs '
+             '(default: $OMDB_CACHE_PATH, no cache if unset)'
+    )
+
+    # Optional HTTP mode serving the movies as a JSON API
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Serve the movies as a JSON API instead of running the interactive menu'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Interface the --serve API listens on (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=5000,
+        help='Port the --serve API listens on (default: 5000)'
+    )
+
+    # Optional background refresh of the stored ratings
+    parser.add_argument(
+        '--refresh-interval',
+        type=float,
+        metavar='SECONDS',
+        help='Refresh the stalest movies from OMDb in the background every SECONDS '
+             'while the menu or the --serve API runs'
+    )
+    parser.add_argument(
+        '--refresh-batch',
+        type=int,
+        default=20,
+        help='Number of movies refreshed per --refresh-interval (default: 20)'
+    )
+
+    parser.add_argument(
+        '--remote-posters',
+        action='store_true',
+        help='Link the generated website to the poster URLs instead of '
+             'downloading the posters to static/posters'
+    )
+
+    parser.add_argument(
+        '--verify-stats',
+        action='store_true',
+        help='Recompute the status statistics from scratch and check them '
+             'against the incrementally maintained ones'
+    )
+
+    parser.add_argument(
+        '--columnar',
+        action='store_true',
+        help='Run the status, filter and sort commands as vectorized NumPy '
+             'operations on a columnar copy of the movies (for large catalogs)'
+    )
+
+    # Optional instrumentation
+    parser.add_argument(
+        '--metrics',
+        nargs='?',
+        const='-',
+        metavar='REPORT_FILE',
+        help='Time the commands, storage calls and OMDb requests and print a report at exit, '
+             'or write it as JSON to REPORT_FILE (the --serve API also gets /api/metrics)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='PROFILE_FILE',
+        help='Run under cProfile and write the profile to PROFILE_FILE '
+             '(read it with python -m pstats PROFILE_FILE)'
     )
 
     # Parse the arguments
@@ -71,8 +179,16 @@ def main():
                         file.write("Title,Year,Rating,Poster\n")
                     print(f"\nFile '{absolute_path}' created.")
                     print(f"\nYour data will be managed in the file '{absolute_path}'.")
+                elif absolute_path.endswith(('.db', '.sqlite')):
+                    StorageSqlite(absolute_path).close()
+                    print(f"\nFile '{absolute_path}' created.")
+                    print(f"\nYour data will be managed in the file '{absolute_path}'.")
+                elif absolute_path.endswith('.bin'):
+                    StorageBinary(absolute_path).initialize()
+                    print(f"\nFile '{absolute_path}' created.")
+                    print(f"\nYour data will be managed in the file '{absolute_path}'.")
                 else:
-                    print("\nUnsupported file format. Use .json or .csv")
+                    print("\nUnsupported file format. Use .json, .csv, .db, .sqlite or .bin")
                     return
             except Exception as e:
                 print(f"\nError creating file: {e}")
@@ -87,15 +203,100 @@ def main():
             storage = StorageJson(absolute_path)
         elif absolute_path.endswith('.csv'):
             storage = StorageCsv(absolute_path)
+        elif absolute_path.endswith(('.db', '.sqlite')):
+            storage = StorageSqlite(absolute_path)
+        elif absolute_path.endswith('.bin'):
+            storage = StorageBinary(absolute_path)
         else:
-            raise ValueError("\nUnsupported file format. Use .json or .csv")
+            raise ValueError("\nUnsupported file format. Use .json, .csv, .db, .sqlite or .bin")
     except Exception as e:
         print(f"Error: {e}")
         return
 
     # Initialize the MovieApp with the chosen storage and run the app
-    app = MovieApp(storage)
-    app.run()
+    omdb_cache_path = args.omdb_cache
+    if omdb_cache_path is None:
+        # The .env file is only worth importing dotenv for when there is one
+        app_directory = os.path.dirname(os.path.abspath(__file__))
+        if os.path.isfile('.env') or os.path.isfile(os.path.join(app_directory, '.env')):
+            load_environment()
+        omdb_cache_path = os.getenv('OMDB_CACHE_PATH')
+    try:
+        omdb_cache = OmdbCache(omdb_cache_path) if omdb_cache_path else None
+    except Exception as e:
+        print(f"Error opening OMDb cache: {e}")
+        return
+
+    metrics = Metrics() if args.metrics else None
+    app = MovieApp(storage, omdb_cache=omdb_cache, verify_stats=args.verify_stats, 
+                   columnar=args.columnar, metrics=metrics,
+                   poster_dir=None if args.remote_posters else os.path.join('static', 'posters'))
+    try:
+        if args.profile:
+            profile_call(args.profile, run_app, app, args)
+        else:
+            run_app(app, args)
+    finally:
+        if metrics is not None:
+            write_metrics(metrics, args.metrics)
+
+
+def run_app(app, args):
+    """
+    Runs the part of the application selected by the arguments: 
+    the bulk import, the JSON API or the interactive menu. The API and the menu 
+    run with the background refresh if --refresh-interval is given.
+
+    Parameters:
+    app (MovieApp): The application.
+    args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+    None
+    """
+    if args.import_titles:
+        try:
+            app.import_movies(args.import_titles, 
+                              workers=args.workers, 
+                              rate_limit=args.rate_limit,
+                              engine=args.engine)
+        except OSError as e:
+            print(f"\nError reading titles file: {e}")
+        return
+    scheduler = None
+    if args.refresh_interval:
+        scheduler = app.start_refresh(interval=args.refresh_interval, batch_size=args.refresh_batch)
+    try:
+        if args.serve:
+            app.serve(host=args.host, port=args.port)
+        else:
+            app.run()
+    finally:
+        if scheduler is not None:
+            scheduler.stop(timeout=10)
+
+
+def write_metrics(metrics, destination):
+    """
+    Prints the instrumentation report, or writes it as JSON to a file.
+
+    Parameters:
+    metrics (Metrics): The collected metrics.
+    destination (str): The report file, or '-' to print the report.
+
+    Returns:
+    None
+    """
+    if destination == '-':
+        print("\n********** Metrics **********\n")
+        print(metrics.format_report())
+        return
+    try:
+        with open(destination, 'w') as file:
+            json.dump(metrics.report(), file, indent=2)
+        print(f"\nMetrics written to {destination}")
+    except OSError as e:
+        print(f"\nError writing metrics: {e}")
 
 if __name__ == "__main__":
     main()
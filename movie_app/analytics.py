@@ -0,0 +1,248 @@
+from storage.query import parse_order_by, rating_of, year_of
+
+MISSING_YEAR = -1  # Stored in the int16 year column for movies without a numeric year
+
+
+def _numpy():
+    """
+    Imports NumPy, which only the columnar analytics need.
+
+    Raises:
+        ImportError: With installation instructions if NumPy is missing.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The columnar analytics need NumPy: pip install numpy")
+    return numpy
+
+
+def _split(value):
+    """
+    Splits an OMDb list field such as 'USA, UK' into its stripped, non-empty items.
+    """
+    if value in (None, '', 'N/A'):
+        return []
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
+
+def _rating(value):
+    """
+    Converts a float32 rating back to a short Python float, e.g. 8.4 rather than 8.3999996.
+    """
+    return round(float(value), 4)
+
+
+class MovieColumns:
+    def __init__(self, movies):
+        """
+        Loads movies into compact columnar arrays for vectorized analytics.
+
+        Every movie becomes one row: ratings are stored as float32 (NaN when
+        missing), years as int16 (MISSING_YEAR when missing), and languages and
+        countries are categorical-encoded. Since a movie can have several
+        countries or languages, each of those columns is a pair of int32 arrays
+        listing (row, category code) for every value a movie has, plus
+        the list of category names.
+
+        Parameters:
+        movies (dict): Title -> details, as returned by IStorage.list_movies.
+        """
+        np = _numpy()
+        self.titles = list(movies)
+        count = len(self.titles)
+        self.ratings = np.empty(count, dtype=np.float32)
+        self.years = np.empty(count, dtype=np.int16)
+        categories = {'language': ({}, [], []), 'country': ({}, [], [])}
+        for row, details in enumerate(movies.values()):
+            rating = rating_of(details)
+            self.ratings[row] = float('nan') if rating is None else rating
+            year = year_of(details)
+            self.years[row] = MISSING_YEAR if year is None else year
+            for field, (codes, rows, values) in categories.items():
+                for name in _split(details.get(field)):
+                    code = codes.setdefault(name, len(codes))
+                    rows.append(row)
+                    values.append(code)
+        self._categories = {}
+        for field, (codes, rows, values) in categories.items():
+            self._categories[field] = (list(codes),
+                                       np.array(rows, dtype=np.int32),
+                                       np.array(values, dtype=np.int32))
+
+
+    def __len__(self):
+        return len(self.titles)
+
+
+    def mask(self, min_rating=None, max_rating=None, min_year=None, max_year=None):
+        """
+        Returns the rows matching rating and year bounds, like IStorage.query's filter.
+
+        Movies without a numeric rating (or year) never satisfy a rating (or year) bound.
+
+        Returns:
+            numpy.ndarray: A boolean mask over the rows.
+        """
+        np = _numpy()
+        mask = np.ones(len(self), dtype=bool)
+        if min_rating is not None:
+            mask &= self.ratings >= np.float32(min_rating)
+        if max_rating is not None:
+            mask &= self.ratings <= np.float32(max_rating)
+        if min_year is not None:
+            mask &= (self.years != MISSING_YEAR) & (self.years >= min_year)
+        if max_year is not None:
+            mask &= (self.years != MISSING_YEAR) & (self.years <= max_year)
+        return mask
+
+
+    def select(self, mask=None, order_by=None):
+        """
+        Returns the row numbers matching a mask, in the requested order.
+
+        Ordering follows IStorage.query: missing years and ratings sort below
+        every real value, and ties keep the storage order.
+
+        Args:
+            mask (numpy.ndarray, optional): The rows to keep, see mask(). Defaults to all.
+            order_by (str, optional): 'title', 'year' or 'rating', '-' for descending.
+
+        Returns:
+            numpy.ndarray: The row numbers.
+        """
+        np = _numpy()
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        field, descending = parse_order_by(order_by)
+        if field is None:
+            return rows
+        if field == 'title':
+            order = sorted(range(len(rows)), key=lambda i: self.titles[rows[i]], reverse=descending)
+            return rows[np.array(order, dtype=np.intp)]
+        if field == 'rating':
+            keys = np.nan_to_num(self.ratings[rows].astype(np.float64), nan=-np.inf)
+        else:
+            keys = np.where(self.years[rows] == MISSING_YEAR, -np.inf, self.years[rows])
+        return rows[np.argsort(-keys if descending else keys, kind='stable')]
+
+
+    def rows(self, rows):
+        """
+        Yields (title, year, rating) for the given rows, with 'N/A' for missing values.
+        """
+        for row in rows:
+            year = int(self.years[row])
+            rating = self.ratings[row]
+            yield (self.titles[row],
+                   'N/A' if year == MISSING_YEAR else year,
+                   'N/A' if rating != rating else _rating(rating))
+
+
+    def rating_summary(self):
+        """
+        Computes the status statistics in the format of stats.rating_summary.
+
+        Returns:
+            dict: 'count', 'rated', 'average', 'median', 'best' and 'worst'.
+        """
+        np = _numpy()
+        rated = ~np.isnan(self.ratings)
+        ratings = self.ratings[rated]
+        summary = {'count': len(self), 'rated': int(ratings.size),
+                   'average': None, 'median': None, 'best': None, 'worst': None}
+        if not ratings.size:
+            return summary
+        summary['average'] = float(ratings.mean(dtype=np.float64))
+        summary['median'] = _rating(np.median(ratings))
+        for key, rating in (('best', ratings.max()), ('worst', ratings.min())):
+            rows = np.flatnonzero(self.ratings == rating)
+            summary[key] = {'rating': _rating(rating),
+                            'titles': [self.titles[row] for row in rows]}
+        return summary
+
+
+    def histogram(self, bins=10, low=0.0, high=10.0):
+        """
+        Counts the rated movies per rating range.
+
+        Args:
+            bins (int, optional): The number of equally wide ranges. Defaults to 10.
+            low (float, optional): The lower end of the first range. Defaults to 0.
+            high (float, optional): The upper end of the last range. Defaults to 10.
+
+        Returns:
+            list: (range start, range end, count) tuples.
+        """
+        np = _numpy()
+        ratings = self.ratings[~np.isnan(self.ratings)]
+        counts, edges = np.histogram(ratings, bins=bins, range=(low, high))
+        return [(_rating(edges[i]), _rating(edges[i + 1]), int(counts[i]))
+                for i in range(bins)]
+
+
+    def percentiles(self, percents=(10, 25, 50, 75, 90)):
+        """
+        Returns rating percentiles of the rated movies.
+
+        Args:
+            percents (iterable, optional): The percentiles to compute.
+
+        Returns:
+            dict: Percentile -> rating, empty if no movie is rated.
+        """
+        np = _numpy()
+        ratings = self.ratings[~np.isnan(self.ratings)]
+        if not ratings.size:
+            return {}
+        values = np.percentile(ratings.astype(np.float64), list(percents))
+        return {percent: _rating(value) for percent, value in zip(percents, values)}
+
+
+    def decade_averages(self):
+        """
+        Returns the number of rated movies and their average rating per decade.
+
+        Returns:
+            list: (decade, count, average) tuples, e.g. (1990, 12, 7.4), oldest first.
+        """
+        np = _numpy()
+        valid = ~np.isnan(self.ratings) & (self.years != MISSING_YEAR)
+        decades = (self.years[valid].astype(np.int32) // 10) * 10
+        return self._averages(decades, self.ratings[valid], key=int)
+
+
+    def group_averages(self, field, min_count=1):
+        """
+        Returns the number of rated movies and their average rating per country or language.
+
+        A movie with several countries (or languages) counts for each of them.
+
+        Args:
+            field (str): 'country' or 'language'.
+            min_count (int, optional): Leave out groups with fewer rated movies. Defaults to 1.
+
+        Returns:
+            list: (name, count, average) tuples, highest average first.
+        """
+        np = _numpy()
+        names, rows, codes = self._categories[field]
+        ratings = self.ratings[rows] if rows.size else np.empty(0, dtype=np.float32)
+        valid = ~np.isnan(ratings)
+        averages = self._averages(codes[valid], ratings[valid], key=lambda code: names[code])
+        averages = [group for group in averages if group[1] >= min_count]
+        return sorted(averages, key=lambda group: (-group[2], group[0]))
+
+
+    @staticmethod
+    def _averages(groups, ratings, key):
+        """
+        Averages ratings per group code with bincount, in ascending code order.
+        """
+        np = _numpy()
+        if not groups.size:
+            return []
+        values, inverse = np.unique(groups, return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=ratings.astype(np.float64))
+        return [(key(value), int(count), round(float(total / count), 2))
+                for value, count, total in zip(values, counts, sums)]
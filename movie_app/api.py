@@ -0,0 +1,264 @@
+import gzip
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from flask import g, jsonify, request
+from storage.istorage import IStorage
+from movie_app.stats import rating_summary
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+# Responses smaller than this are sent uncompressed, gzip would barely save anything
+GZIP_MIN_SIZE = 1024
+
+
+class ApiError(Exception):
+    """Raised for invalid API requests, answered with HTTP 400."""
+
+
+def _int_arg(name, default, minimum=None, maximum=None):
+    """
+    Reads an integer query parameter and keeps it within the given bounds.
+
+    Raises:
+        ApiError: If the parameter is not an integer.
+    """
+    value = request.args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(f"'{name}' must be an integer")
+    if minimum is not None:
+        value = max(value, minimum)
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def _float_arg(name):
+    """
+    Reads an optional float query parameter.
+
+    Raises:
+        ApiError: If the parameter is not a number.
+    """
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ApiError(f"'{name}' must be a number")
+
+
+def _query_filter():
+    """
+    Builds a storage query filter from the request's q, min_rating,
+    max_rating, min_year and max_year parameters.
+    """
+    query_filter = {}
+    if request.args.get('q'):
+        query_filter['title_contains'] = request.args['q']
+    for key in ('min_rating', 'max_rating'):
+        value = _float_arg(key)
+        if value is not None:
+            query_filter[key] = value
+    for key in ('min_year', 'max_year'):
+        value = _int_arg(key, None)
+        if value is not None:
+            query_filter[key] = value
+    return query_filter
+
+
+def _movie_list(movies):
+    """
+    Converts a title -> details dict into the list of movie objects sent to clients.
+    """
+    return [{'title': title, **details} for title, details in movies.items()]
+
+
+def _etag(storage):
+    """
+    Returns the ETag of the current request: a hash of the storage version
+    and the full request URL, so every page and filter has its own tag.
+    """
+    payload = f"{storage.version()}|{request.full_path}"
+    return '"' + hashlib.sha1(payload.encode('utf-8')).hexdigest() + '"'
+
+
+def _not_modified(etag, last_modified):
+    """
+    Tells whether the client's cached copy is still valid.
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 7232.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        # Clients echo the tag of the gzip-compressed representation too
+        return bool(tags & {'*', etag, etag[:-1] + '-gzip"'})
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a resolution of one second
+        return int(last_modified) <= since
+    return False
+
+
+def _cached(storage, build):
+    """
+    Answers a GET request with conditional caching headers.
+
+    The ETag and Last-Modified headers are computed from the storage version
+    alone, so a client holding a fresh copy gets a 304 without the storage
+    being queried at all. Otherwise build() produces the JSON body.
+
+    Args:
+        storage (IStorage): The storage the response is computed from.
+        build (callable): Returns the JSON-serializable response body.
+
+    Returns:
+        flask.Response: The 200 or 304 response.
+    """
+    etag = _etag(storage)
+    last_modified = storage.last_modified()
+    if _not_modified(etag, last_modified):
+        response = jsonify()
+        response.status_code = 304
+        response.set_data(b'')
+    else:
+        response = jsonify(build())
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+    # Clients may keep the response but have to revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _gzip_response(response):
+    """
+    Compresses large responses for clients that accept gzip.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    # The compressed body is a different representation, so it gets its own tag
+    etag = response.headers.get('ETag')
+    if etag and etag.endswith('"') and not etag.endswith('-gzip"'):
+        response.headers['ETag'] = etag[:-1] + '-gzip"'
+    return response
+
+
+def register_routes(app, storage: IStorage, summary=None, metrics=None):
+    """
+    Registers the JSON API on a Flask application.
+
+    Endpoints:
+        GET /api/movies         Lists movies. Supports page, per_page, sort
+                                ('title', 'year' or 'rating', '-' for descending),
+                                q, min_rating, max_rating, min_year and max_year.
+        GET /api/movies/search  Searches movie titles, the search text is given as q.
+        GET /api/movies/<title> Returns one movie.
+        GET /api/status         Returns the rating statistics.
+        GET /api/metrics        Returns the instrumentation report, if metrics are given.
+
+    Parameters:
+    app (Flask): The application the routes are added to.
+    storage (IStorage): The storage the API reads from.
+    summary (callable, optional): Returns the rating statistics for /api/status.
+                                  Defaults to computing them from all stored movies.
+    metrics (Metrics, optional): When given, every request is timed as 
+                                 'api.<endpoint>' and /api/metrics serves the report.
+                                 Defaults to None.
+
+    Returns:
+    None
+    """
+
+    def page_of(query_filter):
+        page = _int_arg('page', 1, minimum=1)
+        per_page = _int_arg('per_page', DEFAULT_PER_PAGE, minimum=1, maximum=MAX_PER_PAGE)
+        order_by = request.args.get('sort') or None
+        # One extra movie tells whether there is a next page without counting them all
+        try:
+            movies = storage.query(filter=query_filter, order_by=order_by,
+                                   limit=per_page + 1, offset=(page - 1) * per_page)
+        except ValueError as error:
+            raise ApiError(str(error))
+        items = _movie_list(movies)
+        return {'page': page,
+                'per_page': per_page,
+                'has_more': len(items) > per_page,
+                'movies': items[:per_page]}
+
+    @app.errorhandler(ApiError)
+    def handle_api_error(error):
+        response = jsonify({'error': str(error)})
+        response.status_code = 400
+        return response
+
+    @app.route('/api/movies')
+    def list_movies():
+        query_filter = _query_filter()
+        return _cached(storage, lambda: page_of(query_filter))
+
+    @app.route('/api/movies/search')
+    def search_movies():
+        if not request.args.get('q'):
+            raise ApiError("'q' is required")
+        query_filter = _query_filter()
+        return _cached(storage, lambda: page_of(query_filter))
+
+    @app.route('/api/movies/<path:title>')
+    def get_movie(title):
+        if not storage.check_if_exists(title):
+            response = jsonify({'error': f"Movie '{title}' not found"})
+            response.status_code = 404
+            return response
+        return _cached(storage, lambda: {'title': title, **storage.get_movie(title)})
+
+    @app.route('/api/status')
+    def status():
+        if summary is not None:
+            return _cached(storage, summary)
+        return _cached(storage, lambda: rating_summary(storage.list_movies()))
+
+    @app.after_request
+    def compress(response):
+        return _gzip_response(response)
+
+    if metrics is None:
+        return
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_time(response):
+        # Registered after compress, so Flask runs it first and the timing excludes gzip
+        start = g.get('request_start')
+        if start is not None:
+            metrics.observe(f"api.{request.endpoint}", time.perf_counter() - start)
+        return response
+
+    @app.route('/api/metrics')
+    def metrics_report():
+        response = jsonify(metrics.report())
+        response.headers['Cache-Control'] = 'no-store'
+        return response
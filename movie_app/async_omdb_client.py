@@ -0,0 +1,204 @@
+import asyncio
+import json
+import random
+import time
+import aiohttp
+from movie_app.omdb_client import OMDB_BASE_URL, is_not_found, parse_movie
+
+
+class RetryableError(Exception):
+    """Raised for OMDb responses worth retrying, such as HTTP 5xx."""
+
+
+class AsyncOmdbClient:
+    def __init__(self,
+                 api_key,
+                 base_url=OMDB_BASE_URL,
+                 concurrency=100,
+                 timeout=10,
+                 retries=3,
+                 backoff=0.5,
+                 cache=None,
+                 rate_limiter=None,
+                 metrics=None):
+        """
+        Initializes a new asyncio OMDb API client.
+
+        The client is used as an async context manager, which opens one
+        aiohttp session whose connections are reused by every lookup.
+        A semaphore keeps at most 'concurrency' requests in flight, so a
+        single event loop can drive hundreds of lookups without opening
+        hundreds of sockets.
+
+        Parameters:
+        api_key (str): The OMDb API key.
+        base_url (str, optional): The OMDb endpoint. Defaults to OMDB_BASE_URL.
+        concurrency (int, optional): The maximum number of requests in flight. Defaults to 100.
+        timeout (float, optional): The timeout of one attempt in seconds. Defaults to 10.
+        retries (int, optional): How often a request failing with a 5xx status,
+                                 a connection error or a timeout is retried. Defaults to 3.
+        backoff (float, optional): The base delay between retries in seconds; it doubles
+                                   with every attempt and is jittered. Defaults to 0.5.
+        cache (OmdbCache, optional): A persistent cache consulted before
+                                     every request. Defaults to None.
+        rate_limiter (RateLimiter, optional): Spaces out the requests sent to OMDb.
+                                              Defaults to None.
+        metrics (Metrics, optional): Records every attempt like OmdbClient does: its
+                                     round-trip time as 'omdb.request', the response
+                                     sizes as 'omdb.bytes_received' and connection
+                                     errors and timeouts as 'omdb.errors'. Defaults to None.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self._session = None
+        self._semaphore = None
+
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+
+    async def fetch(self, title):
+        """
+        Fetches movie data from OMDb API.
+
+        Args:
+            title (str): The title of the movie to fetch.
+
+        Returns:
+            dict: Movie data as returned by parse_movie if the movie is found.
+                  Returns None if the movie is not found or all attempts failed.
+        """
+        if self.cache is not None:
+            found, movie, error = self.cache.get_title(title)
+            if found:
+                if movie is None:
+                    print(f"\nError: {error}")
+                return movie
+        return await self._request({"t": title}, title=title)
+
+
+    async def fetch_by_id(self, imdb_id, use_cache=True):
+        """
+        Fetches movie data from OMDb API by IMDb ID.
+
+        Args:
+            imdb_id (str): The IMDb ID of the movie, e.g. 'tt1375666'.
+            use_cache (bool, optional): Whether a cached result may be returned.
+                                        Defaults to True.
+
+        Returns:
+            dict: Movie data as returned by parse_movie if the movie is found.
+                  Returns None if the movie is not found or all attempts failed.
+        """
+        if self.cache is not None and use_cache:
+            found, movie, error = self.cache.get_imdb_id(imdb_id)
+            if found:
+                if movie is None:
+                    print(f"\nError: {error}")
+                return movie
+        return await self._request({"i": imdb_id}, imdb_id=imdb_id)
+
+
+    async def fetch_many(self, titles):
+        """
+        Fetches several titles concurrently.
+
+        Args:
+            titles (iterable): The titles to fetch.
+
+        Returns:
+            list: The result of fetch for every title, in the same order.
+        """
+        return await asyncio.gather(*(self.fetch(title) for title in titles))
+
+
+    async def fetch_many_by_id(self, imdb_ids, use_cache=True):
+        """
+        Fetches several IMDb IDs concurrently.
+
+        Args:
+            imdb_ids (iterable): The IMDb IDs to fetch.
+            use_cache (bool, optional): Whether cached results may be returned.
+                                        Defaults to True.
+
+        Returns:
+            list: The result of fetch_by_id for every ID, in the same order.
+        """
+        return await asyncio.gather(*(self.fetch_by_id(imdb_id, use_cache=use_cache)
+                                      for imdb_id in imdb_ids))
+
+
+    def _retry_delay(self, attempt):
+        """
+        Returns the jittered exponential backoff delay before the given retry.
+        """
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+    async def _request(self, params, title=None, imdb_id=None):
+        """
+        Sends one request to OMDb, retrying server errors and timeouts,
+        and caches its outcome like OmdbClient._request.
+
+        Returns:
+            dict: Movie data as returned by parse_movie, or None.
+        """
+        # Unlike requests, aiohttp rejects None values, so a missing API key is left out
+        query = {key: value for key, value in {"apikey": self.api_key, **params}.items()
+                 if value is not None}
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.wait_async()
+                try:
+                    start = time.perf_counter()
+                    async with self._session.get(self.base_url, params=query) as response:
+                        body = await response.read()
+                        if self.metrics is not None:
+                            self.metrics.observe('omdb.request', time.perf_counter() - start)
+                            self.metrics.increment('omdb.bytes_received', len(body))
+                        if response.status >= 500:
+                            raise RetryableError(f"OMDb API returned HTTP {response.status}")
+                        if response.status != 200:
+                            print("\nError: Could not retrieve data from OMDb API.")
+                            return None
+                        data = json.loads(body)
+                except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if self.metrics is not None and not isinstance(e, RetryableError):
+                        self.metrics.increment('omdb.errors')
+                    if attempt == self.retries:
+                        print(f"Error: {str(e) or 'OMDb API request timed out'}")
+                        return None
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                except ValueError:
+                    # A 200 answer whose body is not JSON fails this lookup only
+                    print("\nError: OMDb API returned an invalid response.")
+                    return None
+
+                if data['Response'] == 'True':
+                    movie = parse_movie(data)
+                    if self.cache is not None:
+                        self.cache.put_movie(movie, requested_title=title)
+                    return movie
+                print(f"\nError: {data['Error']}")
+                if self.cache is not None and is_not_found(data['Error']):
+                    self.cache.put_not_found(data['Error'], title=title, imdb_id=imdb_id)
+                return None
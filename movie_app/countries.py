@@ -0,0 +1,121 @@
+import functools
+
+# Country names used by OMDb that pycountry does not know under that spelling
+OMDB_ALIASES = {
+    "UK": "GB",
+    "Russia": "RU",
+    "Turkey": "TR",
+    "Korea": "KR",
+    "West Germany": "DE",
+    "Macedonia": "MK",
+    "Ivory Coast": "CI",
+    "Palestine": "PS",
+    "Occupied Palestinian Territory": "PS",
+    "The Democratic Republic Of Congo": "CD",
+    "Brunei": "BN",
+    "Cape Verde": "CV",
+    "Swaziland": "SZ",
+    "Micronesia": "FM",
+    "Vatican": "VA",
+    "Burma": "MM",
+    "Kosovo": "XK",
+}
+
+GENERIC_FLAG = "🏳️"
+
+
+def _normalize(name):
+    """
+    Normalizes a country name for the index: case-folded and stripped.
+    """
+    return name.strip().casefold()
+
+
+@functools.lru_cache(maxsize=None)
+def _country_index():
+    """
+    Builds the index from normalized country names and codes to ISO alpha-2 codes.
+
+    The index is built once, on first use, from every pycountry entry's name
+    and alpha-2 code, then its official name, common name and alpha-3 code,
+    then the OMDb aliases. Earlier entries win, so a country's name is never
+    shadowed by another country's code.
+
+    Returns:
+        dict: Normalized name or code -> alpha-2 code.
+    """
+    import pycountry  # Loads pycountry's country database only when flags are needed
+
+    index = {}
+    countries = list(pycountry.countries)
+    for country in countries:
+        index.setdefault(_normalize(country.name), country.alpha_2)
+        index.setdefault(_normalize(country.alpha_2), country.alpha_2)
+    for country in countries:
+        for attribute in ('official_name', 'common_name', 'alpha_3'):
+            value = getattr(country, attribute, None)
+            if value:
+                index.setdefault(_normalize(value), country.alpha_2)
+    for alias, code in OMDB_ALIASES.items():
+        index.setdefault(_normalize(alias), code)
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def lookup_country_code(country_name):
+    """
+    Looks up the country code for a given country name.
+
+    Names and codes are resolved through the precomputed index; anything else
+    falls back to pycountry's own lookup once, and the result is memoized.
+
+    Args:
+        country_name (str): The name of the country.
+
+    Returns:
+        str: The country code (e.g., 'US' for United States).
+
+    Raises:
+        LookupError: If the country name cannot be found in the database.
+    """
+    code = _country_index().get(_normalize(country_name))
+    if code is not None:
+        return code
+    import pycountry
+    try:
+        return pycountry.countries.lookup(country_name.strip()).alpha_2
+    except LookupError:
+        raise LookupError(f"Could not find a record for {country_name!r}")
+
+
+def flag_emoji(country_code):
+    """
+    Converts an ISO alpha-2 country code to its flag emoji.
+    """
+    return ''.join(chr(ord(char) + 127397) for char in country_code)
+
+
+@functools.lru_cache(maxsize=4096)
+def countries_to_flags(country_name):
+    """
+    Converts a comma separated list of country names to flag emojis.
+
+    The result is memoized per input string, since the same country lists
+    repeat across a whole catalog.
+
+    Args:
+        country_name (str): The name of the country. Multiple country names can be separated by commas.
+
+    Returns:
+        str: The corresponding flag emoji(s) along with the country name(s). If a country is not found,
+            a generic flag emoji (🏳️) is used. If multiple countries are provided, the flag emojis
+            are separated by commas.
+    """
+    result = []
+    for name in country_name.split(','):
+        name = name.strip()
+        try:
+            result.append(f"{flag_emoji(lookup_country_code(name))} {name}")  # Format as "🇺🇸 United States"
+        except LookupError:
+            result.append(f"{GENERIC_FLAG} {name}")  # If country is not found, use a generic flag emoji
+    return ', '.join(result)
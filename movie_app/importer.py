@@ -0,0 +1,169 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from movie_app.omdb_client import RateLimiter
+from storage.istorage import IStorage
+from storage.normalize import normalize_title
+
+
+def read_titles(file_path):
+    """
+    Reads the movie titles to import from a text file.
+
+    The file holds one title per line. Blank lines and lines starting
+    with '#' are ignored, and repeated titles are only returned once.
+
+    Args:
+        file_path (str): The path to the titles file.
+
+    Returns:
+        list: The titles, in file order.
+    """
+    titles = []
+    seen = set()
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            title = line.strip()
+            if title and not title.startswith('#') and title not in seen:
+                seen.add(title)
+                titles.append(title)
+    return titles
+
+
+ENGINES = ('threads', 'asyncio')
+
+
+class BulkImporter:
+    def __init__(self, storage: IStorage, client, workers=8, rate_limit=5.0, engine='threads'):
+        """
+        Initializes a new importer that adds many movies from OMDb at once.
+
+        Parameters:
+        storage (IStorage): The storage the movies are added to.
+        client (OmdbClient): The OMDb client used for the lookups. Its pooled
+                             session is shared by all worker threads.
+        workers (int, optional): The number of concurrent lookups. Defaults to 8.
+        rate_limit (float, optional): The maximum number of OMDb requests per second.
+                                      None disables the limit. Defaults to 5.0.
+        engine (str, optional): 'threads' runs the lookups on a thread pool, 
+                                'asyncio' on one event loop with an AsyncOmdbClient 
+                                using the same API key, endpoint and cache. 
+                                Defaults to 'threads'.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown import engine {engine!r}, use one of {', '.join(ENGINES)}")
+        self._storage = storage
+        self._client = client
+        self.workers = workers
+        self.engine = engine
+        self._limiter = RateLimiter(rate_limit)
+
+
+    def _fetch(self, title):
+        """
+        Fetches one title from OMDb once the rate limiter allows it.
+        """
+        self._limiter.wait()
+        return self._client.fetch(title)
+
+
+    def _fetch_all(self, titles):
+        """
+        Fetches all titles with the configured engine.
+
+        Returns:
+            list: The movie data (or None) for every title, in the same order.
+        """
+        if self.engine == 'asyncio':
+            return asyncio.run(self._fetch_all_async(titles))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self._fetch, titles))
+
+
+    async def _fetch_all_async(self, titles):
+        """
+        Fetches all titles concurrently on the running event loop.
+        """
+        from movie_app.async_omdb_client import AsyncOmdbClient
+        async with AsyncOmdbClient(self._client.api_key,
+                                   base_url=self._client.base_url,
+                                   concurrency=self.workers,
+                                   timeout=self._client.timeout,
+                                   cache=self._client.cache,
+                                   rate_limiter=self._limiter,
+                                   metrics=self._client.metrics) as client:
+            return await client.fetch_many(titles)
+
+
+    def import_titles(self, titles):
+        """
+        Looks up the given titles concurrently and adds the ones found to the storage.
+
+        Titles already in the storage, or given twice, are skipped without 
+        a lookup; titles are compared normalized (see storage.normalize), and 
+        found movies whose imdbID is already stored or imported are skipped too.
+        The lookups run on a bounded pool of worker threads (or coroutines
+        with the 'asyncio' engine), and every movie that was found 
+        is written with a single add_movies call at the end.
+
+        Args:
+            titles (iterable): The titles to import.
+
+        Returns:
+            dict: 'added', 'skipped' and 'not_found' lists of titles.
+                  'added' holds OMDb's canonical titles, the others the titles as given.
+        """
+        report = {'added': [], 'skipped': [], 'not_found': []}
+        pending = []
+        requested = set()
+        for title in titles:
+            key = normalize_title(title)
+            if key in requested or self._storage.find_title(title) is not None:
+                report['skipped'].append(title)
+            else:
+                requested.add(key)
+                pending.append(title)
+
+        movies = {}
+        imdb_ids = set()
+        for title, data in zip(pending, self._fetch_all(pending)):
+            if data is None:
+                report['not_found'].append(title)
+            elif (data["Title"] in movies or data.get("imdbID") in imdb_ids
+                  or self._storage.find_imdb_id(data.get("imdbID")) is not None
+                  or self._storage.find_title(data["Title"]) is not None):
+                report['skipped'].append(title)
+            else:
+                if data.get("imdbID"):
+                    imdb_ids.add(data["imdbID"])
+                movies[data["Title"]] = {
+                    "title": data["Title"],
+                    "year": data["Year"],
+                    "rating": data["imdbRating"],
+                    "poster": data["Poster"],
+                    "language": data["Language"],
+                    "country": data["Country"],
+                    "awards": data["Awards"],
+                    "imdbID": data["imdbID"],
+                    "fetched_at": time.time(),
+                }
+
+        if movies:
+            results = self._storage.add_movies(movies.values())
+            report['added'] = [title for title, added in results.items() if added]
+            # Stored meanwhile under another title, so the storage refused the imdbID
+            report['skipped'] += [title for title, added in results.items() if not added]
+        return report
+
+
+    def import_file(self, file_path):
+        """
+        Imports every title listed in a text file, see read_titles for the format.
+
+        Args:
+            file_path (str): The path to the titles file.
+
+        Returns:
+            dict: The report returned by import_titles.
+        """
+        return self.import_titles(read_titles(file_path))
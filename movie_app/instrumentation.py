@@ -0,0 +1,280 @@
+import bisect
+import contextlib
+import threading
+import time
+from storage.istorage import IStorage
+
+# Upper bounds of the latency histogram buckets, in seconds; the last bucket is open-ended
+BUCKET_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        """
+        Initializes an empty latency histogram.
+
+        Observations are counted in fixed, roughly logarithmic buckets, so
+        the histogram takes the same memory however long the app runs;
+        percentiles are interpolated within their bucket.
+
+        Parameters:
+        bounds (tuple, optional): The ascending bucket upper bounds, in seconds.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+
+    def observe(self, seconds):
+        """
+        Records one duration, in seconds.
+        """
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+
+    def percentile(self, percent):
+        """
+        Estimates a percentile of the recorded durations.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The estimated duration in seconds, or None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[index - 1] if index > 0 else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = low + (high - low) * (rank - seen) / count
+                return min(max(estimate, self.min), self.max)
+            seen += count
+        return self.max
+
+
+    def summary(self):
+        """
+        Summarizes the histogram.
+
+        Returns:
+            dict: 'count', 'total', 'mean', 'min', 'max', 'p50', 'p95' and 'p99'
+                  (in seconds), and the non-empty 'buckets' as {upper bound: count}.
+        """
+        buckets = {}
+        for index, count in enumerate(self.counts):
+            if count:
+                bound = str(self.bounds[index]) if index < len(self.bounds) else 'inf'
+                buckets[bound] = count
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': buckets,
+        }
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Initializes an empty metrics registry.
+
+        The registry holds named latency histograms (e.g. 'command.status',
+        'storage.list_movies', 'omdb.request') and named counters
+        (e.g. 'storage.bytes_read'). It is safe to share between threads.
+        """
+        self._timings = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+
+    def observe(self, name, seconds):
+        """
+        Records a duration, in seconds, in the histogram of the given name.
+        """
+        with self._lock:
+            histogram = self._timings.get(name)
+            if histogram is None:
+                histogram = self._timings[name] = Histogram()
+            histogram.observe(seconds)
+
+
+    def increment(self, name, amount=1):
+        """
+        Adds an amount to the counter of the given name.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """
+        Times the body of a with statement into the histogram of the given name,
+        also when the body raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+
+    def report(self):
+        """
+        Returns everything recorded so far.
+
+        Returns:
+            dict: 'timings' (name -> Histogram.summary) and 'counters' (name -> value).
+        """
+        with self._lock:
+            return {'timings': {name: histogram.summary()
+                                for name, histogram in sorted(self._timings.items())},
+                    'counters': dict(sorted(self._counters.items()))}
+
+
+    def format_report(self):
+        """
+        Formats the report as a text table, durations in milliseconds.
+        """
+        report = self.report()
+        lines = [f"{'timing':32} {'count':>7} {'total':>10} {'mean':>9} "
+                 f"{'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+        for name, timing in report['timings'].items():
+            values = [timing[key] * 1000 for key in ('total', 'mean', 'p50', 'p95', 'p99', 'max')]
+            lines.append(f"{name:32} {timing['count']:>7} {values[0]:>10.2f} "
+                         + ' '.join(f"{value:>9.2f}" for value in values[1:]))
+        if report['counters']:
+            lines.append("")
+            lines.extend(f"{name:32} {value:>12}" for name, value in report['counters'].items())
+        return '\n'.join(lines)
+
+
+class InstrumentedStorage(IStorage):
+    def __init__(self, storage: IStorage, metrics: Metrics):
+        """
+        Wraps a storage to record the latency of every IStorage call.
+
+        Every call is timed into 'storage.<method>'. If the storage counts
+        its file I/O (see IStorage.io_stats), the bytes each call read and
+        wrote are added to the 'storage.bytes_read' and 'storage.bytes_written'
+        counters. Other attributes, like StorageSqlite.close, are passed through.
+
+        Parameters:
+        storage (IStorage): The storage to wrap.
+        metrics (Metrics): The registry the measurements go to.
+        """
+        self._storage = storage
+        self._metrics = metrics
+
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+    def _call(self, method, *args, **kwargs):
+        """
+        Calls a storage method, recording its latency and I/O.
+        """
+        before = self._storage.io_stats()
+        try:
+            with self._metrics.timer(f"storage.{method}"):
+                return getattr(self._storage, method)(*args, **kwargs)
+        finally:
+            after = self._storage.io_stats()
+            if before is not None and after is not None:
+                for key in ('bytes_read', 'bytes_written'):
+                    if after[key] > before[key]:
+                        self._metrics.increment(f"storage.{key}", after[key] - before[key])
+
+
+    def check_if_exists(self, title):
+        return self._call('check_if_exists', title)
+
+    def get_movie(self, title):
+        return self._call('get_movie', title)
+
+    def find_title(self, title):
+        return self._call('find_title', title)
+
+    def find_imdb_id(self, imdb_id):
+        return self._call('find_imdb_id', imdb_id)
+
+    def list_movies(self):
+        return self._call('list_movies')
+
+    def stale_movies(self, limit):
+        return self._call('stale_movies', limit)
+
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        return self._call('query', filter=filter, order_by=order_by, limit=limit, offset=offset)
+
+    def add_movie(self, *args, **kwargs):
+        return self._call('add_movie', *args, **kwargs)
+
+    def delete_movie(self, title):
+        return self._call('delete_movie', title)
+
+    def update_movie(self, *args, **kwargs):
+        return self._call('update_movie', *args, **kwargs)
+
+    def add_movies(self, movies):
+        return self._call('add_movies', movies)
+
+    def update_movies(self, updates):
+        return self._call('update_movies', updates)
+
+    def delete_movies(self, titles):
+        return self._call('delete_movies', titles)
+
+    def version(self):
+        return self._call('version')
+
+    def last_modified(self):
+        return self._call('last_modified')
+
+    def io_stats(self):
+        return self._storage.io_stats()
+
+
+def profile_call(path, function, *args, **kwargs):
+    """
+    Runs a function under cProfile and dumps the profile to a file.
+
+    The file can be read with pstats (python -m pstats FILE) or viewers
+    such as snakeviz. A summary of the slowest functions is printed as well.
+    The profile is dumped also when the function raises.
+
+    Args:
+        path (str): The file the profile is written to.
+        function (callable): The function to profile.
+
+    Returns:
+        The return value of the function.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
+        print(f"\nProfile written to {path}, the 15 slowest functions (cumulative):")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
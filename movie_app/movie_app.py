@@ -1,29 +1,126 @@
-import requests
+import functools
 import os
 import random
-import pycountry #import countries  # Importing pycountry to convert country names to country codes
-from flask import Flask, render_template
+import threading
+import time
 from storage.istorage import IStorage
-from dotenv import load_dotenv
+from movie_app.analytics import MovieColumns
+from movie_app.countries import countries_to_flags, lookup_country_code
+from movie_app.instrumentation import InstrumentedStorage
+from movie_app.search import SearchIndex
+from movie_app.stats import RatingStats
+from movie_app.website import WebsiteGenerator
 
-load_dotenv()
+# Flask, requests and dotenv are imported by the commands that need them,
+# so that listing or sorting movies does not pay for loading them at startup.
 
-OMDB_API_KEY = os.getenv('OMDB_API_KEY')
+
+@functools.lru_cache(maxsize=None)
+def load_environment():
+    """
+    Loads the variables of the .env file into the environment, once.
+
+    Called before the first OMDb lookup rather than at import time,
+    so that commands that never reach OMDb do not import dotenv.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def omdb_api_key():
+    """
+    Returns the OMDb API key from the environment or the .env file.
+
+    Returns:
+        str: The key, or None if it is not configured.
+    """
+    load_environment()
+    return os.getenv('OMDB_API_KEY')
 
 class MovieApp:
-    def __init__(self, storage: IStorage):
+    def __init__(self, 
+                 storage: IStorage, 
+                 omdb_cache=None, 
+                 search_fields=('title',), 
+                 verify_stats=False, 
+                 columnar=False, 
+                 metrics=None,
+                 poster_dir=os.path.join('static', 'posters')):
         """
         Initializes a new instance of MovieApp.
 
         Parameters:
         storage (IStorage): An instance of a class that implements the IStorage interface.
                             This class is responsible for storing and retrieving movie data.
+        omdb_cache (OmdbCache, optional): A persistent cache of OMDb responses
+                                          consulted before every lookup. Defaults to None.
+        search_fields (tuple, optional): The movie fields the search command looks at,
+                                         see SearchIndex. Defaults to ('title',).
+        verify_stats (bool, optional): When True, the status command recomputes the
+                                       statistics from scratch and reports any difference
+                                       from the running ones. Defaults to False.
+        columnar (bool, optional): When True, the status, filter and sort commands run
+                                   as vectorized NumPy operations on a columnar copy 
+                                   of the movies, see MovieColumns. Defaults to False.
+        metrics (Metrics, optional): When given, the storage calls, menu commands, 
+                                     OMDb requests and API requests are timed into it,
+                                     see movie_app.instrumentation. Defaults to None.
+        poster_dir (str, optional): Where the website command keeps local copies of the
+                                    posters, see movie_app.posters. None links the
+                                    website to the poster URLs instead.
+                                    Defaults to 'static/posters'.
 
         Returns:
         None
         """
+        if metrics is not None:
+            storage = InstrumentedStorage(storage, metrics)
         self._storage = storage
-        self._app = Flask(__name__)
+        self.metrics = metrics
+        self._omdb_cache = omdb_cache
+        self._omdb_client = None
+        self._flask_app = None
+        self._search_fields = search_fields
+        self._search_index = None
+        self._search_version = None
+        self._stats = None
+        self._stats_version = None
+        self._stats_lock = threading.Lock()
+        self.verify_stats = verify_stats
+        self.columnar = columnar
+        self.poster_dir = poster_dir
+        self._columns = None
+        self._columns_version = None
+
+
+    @property
+    def _omdb(self):
+        """
+        The OmdbClient used for lookups, created (and requests imported) on first use.
+        """
+        if self._omdb_client is None:
+            from movie_app.omdb_client import OmdbClient
+
+            self._omdb_client = OmdbClient(omdb_api_key(), cache=self._omdb_cache, 
+                                           metrics=self.metrics)
+        return self._omdb_client
+
+
+    @property
+    def _app(self):
+        """
+        The Flask application serving the JSON API, created (and Flask imported) on first use.
+        """
+        if self._flask_app is None:
+            from flask import Flask
+            from movie_app.api import register_routes
+
+            self._flask_app = Flask(__name__)
+            register_routes(self._flask_app, self._storage, 
+                            summary=lambda: self._rating_stats().summary(),
+                            metrics=self.metrics)
+        return self._flask_app
 
 
     def _command_list_movies(self): 
@@ -49,8 +146,9 @@ class MovieApp:
         Adds a new movie to the storage.
 
         This function prompts the user to enter a new movie name. 
-        It then checks if the movie already exists in the storage.
-        If the movie does not exist, it fetches the movie data from 
+        It then checks if the movie already exists in the storage, comparing
+        normalized titles so 'inception' or 'Amelie' match 'Inception' and 'Amélie'
+        without an OMDb request. If the movie does not exist, it fetches the movie data from 
         the OMDb API using the `_fetch_movie_data` method.
         If the movie data is successfully retrieved, it adds the movie to 
         the storage using the `_storage.add_movie` method.
@@ -64,11 +162,19 @@ class MovieApp:
         None
         """
         title = input("\nEnter new movie name: ")
-        if self._storage.check_if_exists(title):
-            print(f"\nMovie {title} already exists")
+        existing = self._storage.find_title(title)
+        if existing is not None:
+            print(f"\nMovie {existing} already exists")
             return
         data = self._fetch_movie_data(title)
         if data:
+            # OMDb may resolve the title to a movie stored under another spelling
+            existing = (self._storage.find_imdb_id(data.get("imdbID"))
+                        or self._storage.find_title(data["Title"]))
+            if existing is not None:
+                print(f"\nMovie {existing} already exists")
+                return
+            version = self._storage.version()
             self._storage.add_movie(data["Title"],
                                     data["Year"],
                                     data["imdbRating"],
@@ -76,15 +182,23 @@ class MovieApp:
                                     data["Language"], 
                                     data["Country"], 
                                     data["Awards"],
-                                    data["imdbID"])  # Add IMDB ID
+                                    data["imdbID"],  # Add IMDB ID
+                                    fetched_at=time.time())
+            self._apply_change(version, changed={data["Title"]: {
+                "rating": data["imdbRating"],
+                "language": data["Language"], 
+                "country": data["Country"], 
+                "awards": data["Awards"]}})
             print(f"\nMovie {title} added successfully.")
         else:
             print(f"\nMovie {title} not found.")
 
-    @staticmethod
-    def _fetch_movie_data(title):
+    def _fetch_movie_data(self, title):
         """
         Fetches movie data from OMDb API.
+
+        The request goes through the app's OmdbClient, 
+        which keeps the connection to OMDb alive between lookups.
         
         Args:
             title (str): The title of the movie to fetch. 
@@ -94,34 +208,83 @@ class MovieApp:
                 Returns a dictionary containing the movie details if the movie is found.
                 Returns None if the movie is not found or an error occurs during the API request.
         """
+        return self._omdb.fetch(title)
+
+
+    def import_movies(self, file_path, workers=8, rate_limit=5.0, engine='threads'):
+        """
+        Imports the movies listed in a text file, one title per line.
+
+        The titles are looked up concurrently on OMDb and all movies found
+        are written to the storage in a single batch.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+        file_path (str): The path to the titles file.
+        workers (int, optional): The number of concurrent lookups. Defaults to 8.
+        rate_limit (float, optional): The maximum number of OMDb requests per second.
+                                      Defaults to 5.0.
+        engine (str, optional): 'threads' or 'asyncio', see BulkImporter. 
+                                Defaults to 'threads'.
+
+        Returns:
+        dict: The import report with 'added', 'skipped' and 'not_found' titles.
+        """
+        from movie_app.importer import BulkImporter
+
+        importer = BulkImporter(self._storage, self._omdb, 
+                                workers=workers, rate_limit=rate_limit, engine=engine)
+        report = importer.import_file(file_path)
+        print(f"\nImported {len(report['added'])} movie(s), "
+              f"skipped {len(report['skipped'])} existing, "
+              f"{len(report['not_found'])} not found.")
+        for title in report['not_found']:
+            print(f"\nMovie {title} not found.")
+        if self._omdb.cache is not None:
+            stats = self._omdb.cache.stats()
+            print(f"\nOMDb cache: {stats['hits']} hit(s), "
+                  f"{stats['negative_hits']} cached not-found, {stats['misses']} miss(es).")
+        return report
+
+
+    def start_refresh(self, interval=3600.0, batch_size=20, max_age=7 * 24 * 3600,
+                      workers=4, rate_limit=1.0):
+        """
+        Starts refreshing the stalest movies from OMDb in a background thread.
+
+        The refresh runs next to the menu or the JSON API without blocking them;
+        see movie_app.refresh.RefreshScheduler for the parameters.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+
+        Returns:
+        RefreshScheduler: The running scheduler; call its stop method to end it.
+        """
+        from movie_app.refresh import RefreshScheduler
+
+        scheduler = RefreshScheduler(self._storage, self._omdb, batch_size=batch_size,
+                                     interval=interval, max_age=max_age,
+                                     workers=workers, rate_limit=rate_limit)
+        scheduler.start()
+        return scheduler
+
+
+    def _command_import_movies(self):
+        """
+        Prompts for a titles file and imports the movies listed in it.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+
+        Returns:
+        None
+        """
+        file_path = input("\nEnter path of the titles file: ")
         try:
-            response = requests.get(f"http://www.omdbapi.com/?"
-                                    f"apikey={OMDB_API_KEY}&"
-                                    f"t={title}")
-
-            if response.status_code == 200:
-                data = response.json()
-                if data['Response'] == 'True':
-                    year = data["Year"]
-                    if "-" in year:
-                        year = year.split("-")[0]
-                    return {
-                        "Title": data["Title"],
-                        "Year": year,
-                        "imdbRating": data["imdbRating"],
-                        "Poster": data["Poster"],
-                        "Language": data["Language"],
-                        "Country": data["Country"],
-                        "Awards": data["Awards"],
-                        "imdbID": data["imdbID"]  # Add IMDB ID
-                    }
-                else:
-                    print(f"\nError: {data['Error']}")
-            else:
-                print("\nError: Could not retrieve data from OMDb API.")
-        except requests.RequestException as e:
-            print(f"Error: {e}")
-        return None
+            self.import_movies(file_path)
+        except OSError as e:
+            print(f"\nError reading titles file: {e}")
 
 
     def _command_delete_movie(self):
@@ -138,7 +301,9 @@ class MovieApp:
         """
         title = input("\nEnter movie title to delete: ")
         if self._storage.check_if_exists(title):
+            version = self._storage.version()
             self._storage.delete_movie(title)
+            self._apply_change(version, removed=[title])
             print(f"\nMovie {title} deleted successfully.")
         else:
             print(f"\nMovie {title} doesn't exist.")
@@ -173,6 +338,7 @@ class MovieApp:
             awards = awards if awards else None 
             note = note if note else None 
 
+            version = self._storage.version()
             self._storage.update_movie(title, 
                                        year=year, 
                                        rating=rating, 
@@ -180,6 +346,11 @@ class MovieApp:
                                        country=country, 
                                        awards=awards, 
                                        note=note)
+            self._apply_change(version, changed={title: {
+                "rating": rating,
+                "language": language, 
+                "country": country, 
+                "awards": awards}})
             print(f"\nMovie '{title}' updated.")
         else:
             print(f"\nMovie {title} doesn't exist.")
@@ -198,57 +369,84 @@ class MovieApp:
         Returns:
         None: This function does not return any value. It prints statistical information.
         """
-        try:
-            movies = self._storage.list_movies()
-            ratings = []
-
-            # Extract and convert ratings
-            for details in movies.values():
-                try:
-                    rating = float(details['rating'])
-                    ratings.append(rating)
-                except ValueError:
-                    print(f"\nSkipping invalid rating: {details['rating']}")
-
-            if not ratings:
-                print("\nNo valid ratings found to compute statistics.")
-                return
+        if self.columnar:
+            summary = self._movie_columns().rating_summary()
+        else:
+            summary = self._rating_stats().summary()
+        if self.verify_stats and not self.columnar:
+            differences = self._stats.verify(self._storage.list_movies())
+            if differences:
+                print(f"\nWarning: running statistics were inconsistent ({', '.join(differences)}), "
+                      "recomputed them from scratch.")
+                self._stats = None
+                summary = self._rating_stats().summary()
+        if summary['count'] > summary['rated']:
+            print(f"\nSkipping {summary['count'] - summary['rated']} movie(s) without a valid rating.")
+
+        if not summary['rated']:
+            print("\nNo valid ratings found to compute statistics.")
+            return
 
-            avg_rating = sum(ratings) / len(ratings)
-            print(f"\nAverage rating: {avg_rating:.1f}")
+        print(f"\nAverage rating: {summary['average']:.1f}")
+        print(f"\nMedian rating: {summary['median']:.1f}")
 
-            sorted_ratings = sorted(ratings)
-            mid = len(sorted_ratings) // 2
-            median_rating = (sorted_ratings[mid - 1] + sorted_ratings[mid]) / 2 if len(sorted_ratings) % 2 == 0 else sorted_ratings[mid]
-            print(f"\nMedian rating: {median_rating:.1f}")
+        # Print best and worst movies
+        for label, key in (("Best", 'best'), ("Worst", 'worst')):
+            print(f"\n{label} movie(s) by rating:")
+            for movie in summary[key]['titles']:
+                print(f"\n{movie} ({summary[key]['rating']})")
 
-            best_rating = max(ratings)
-            worst_rating = min(ratings)
 
-            # Find best and worst movies
-            best_movies = [title for title, details in movies.items()
-                        if abs(float(details['rating']) - best_rating) < 0.0001]
-            worst_movies = [title for title, details in movies.items()
-                            if abs(float(details['rating']) - worst_rating) < 0.0001]
+    def _rating_stats(self):
+        """
+        Returns the running rating statistics, built from the storage on first use
+        and rebuilt whenever the storage version shows an outside change.
 
-            # Print best movies
-            print("\nBest movie(s) by rating:")
-            if best_movies:
-                for movie in best_movies:
-                    print(f"\n{movie} ({best_rating})")
-            else:
-                print("\nNo movies found with the best rating.")
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
 
-            # Print worst movies
-            print("\nWorst movie(s) by rating:")
-            if worst_movies:
-                for movie in worst_movies:
-                    print(f"\n{movie} ({worst_rating})")
-            else:
-                print("\nNo movies found with the worst rating.")
+        Returns:
+        RatingStats: The statistics of the stored movies.
+        """
+        # Concurrent API requests after a change wait for one rebuild instead of each doing it
+        with self._stats_lock:
+            version = self._storage.version()
+            if self._stats is None or version != self._stats_version:
+                self._stats = RatingStats.build(self._storage.list_movies())
+                self._stats_version = version
+            return self._stats
+
+
+    def _movie_columns(self):
+        """
+        Returns the columnar copy of the movies, built from the storage on first use
+        and rebuilt whenever the storage version changes.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
 
-        except ValueError as error:
-            print("\nAn error occurred:", error)
+        Returns:
+        MovieColumns: The movies as NumPy arrays.
+        """
+        version = self._storage.version()
+        if self._columns is None or version != self._columns_version:
+            self._columns = MovieColumns(self._storage.list_movies())
+            self._columns_version = version
+        return self._columns
+
+
+    def _print_columns(self, order_by=None, min_rating=None):
+        """
+        Prints the movies of the columnar copy matching a minimum rating, in the given order.
+
+        Returns:
+        int: The number of movies printed.
+        """
+        columns = self._movie_columns()
+        rows = columns.select(columns.mask(min_rating=min_rating), order_by=order_by)
+        for title, year, rating in columns.rows(rows):
+            print(f"\n{title} ({year}): {rating}")
+        return len(rows)
 
 
     def _command_random_movie(self):
@@ -279,11 +477,10 @@ class MovieApp:
         Searches for movies in the storage based on a given search query.
 
         This function prompts the user to enter a search query. 
-        It then retrieves a list of all movies from the storage.
-        The function searches for movies whose titles contain the   
-        search query (case-insensitive).
-        If matching movies are found, the function prints their 
-        titles, years of release, and ratings.
+        It then looks the query up in the search index, which ranks the 
+        titles by the words they share with the query and tolerates typos.
+        If matching movies are found, the function prints the 20 best 
+        matches with their years of release and ratings.
         If no matching movies are found, the function prints a message 
         indicating that no movies were found.
 
@@ -296,30 +493,96 @@ class MovieApp:
         """
 
         query = input("\nEnter search query: ")
-        movies = self._storage.list_movies()
-        results = {title: details 
-                   for title, details in movies.items() 
-                        if query.lower() in title.lower()}
-        if results:
-            for title, details in results.items():
-                print(f"\n{title} ({details['year']}): {details['rating']}")
-        else:
+        found = False
+        for title, _ in self._search(query, limit=20):
+            # Point reads: the results are a handful of titles out of the whole catalog
+            details = self._storage.get_movie(title)
+            if details is None:
+                continue  # Deleted since the index was last updated
+            print(f"\n{title} ({details['year']}): {details['rating']}")
+            found = True
+        if not found:
             print("\nNo matching movies found.")
-    
-    
+
+
+    def _search(self, query, limit=10):
+        """
+        Searches the movie titles through the search index.
+
+        The index is built on first use and rebuilt whenever the storage 
+        version shows that the movies were changed by someone else 
+        (another process, or a direct storage call). Changes made through 
+        the app's own commands are applied to it incrementally.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+        query (str): The search text.
+        limit (int, optional): The maximum number of results. Defaults to 10.
+
+        Returns:
+        list: (title, score) tuples, best match first, see SearchIndex.search.
+        """
+        version = self._storage.version()
+        if self._search_index is None or version != self._search_version:
+            self._search_index = SearchIndex.build(self._storage.list_movies(), 
+                                                   fields=self._search_fields)
+            self._search_version = version
+        return self._search_index.search(query, limit=limit)
+
+
+    def _apply_change(self, version, changed=None, removed=()):
+        """
+        Applies a change made by one of the app's commands to the search index
+        and the rating statistics.
+
+        Each of them is updated in place if it was up to date before the change;
+        otherwise it is dropped and rebuilt the next time it is needed.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+        version (str): The storage version read right before the change.
+        changed (dict, optional): Title -> the changed details of added or updated movies.
+                                  Details set to None are unchanged.
+        removed (iterable, optional): The titles of deleted movies.
+
+        Returns:
+        None
+        """
+        changed = changed or {}
+        new_version = self._storage.version()
+        if self._search_index is not None:
+            if version == self._search_version:
+                for title, details in changed.items():
+                    self._search_index.update(title, details)
+                for title in removed:
+                    self._search_index.remove(title)
+                self._search_version = new_version
+            else:
+                self._search_index = None
+        if self._stats is not None:
+            if version == self._stats_version:
+                for title, details in changed.items():
+                    if details.get("rating") is not None:
+                        self._stats.set(title, details["rating"])
+                for title in removed:
+                    self._stats.remove(title)
+                self._stats_version = new_version
+            else:
+                self._stats = None
+        # The arrays are cheaper to rebuild than to patch
+        self._columns = None
+
+
     def _command_sort_movies_by_rating(self):
         """
         Sorts and prints the movies in the storage based on their ratings in descending order.
 
-        This function retrieves a list of all movies from 
-        the storage using the `_storage.list_movies()` method.
-        It then sorts the movies based on their ratings in 
-        descending order using the `sorted()` function.
-        The `key` parameter of the `sorted()` function is set to a lambda function 
-        that extracts the rating from each movie's details.
-        The `reverse=True` parameter ensures that the movies are sorted in descending order.
+        This function asks the storage for all movies ordered by rating 
+        in descending order using the `_storage.query()` method, 
+        so backends with an index on rating can do the sorting themselves.
+        Movies without a numeric rating are listed last.
 
-        After sorting the movies, the function iterates over the sorted list and 
+        The function then iterates over the sorted movies and 
         prints each movie's title, year of release, and rating.
 
         Parameters:
@@ -328,10 +591,11 @@ class MovieApp:
         Returns:
         None: This function does not return any value. It prints the sorted list of movies.
         """
-        movies = sorted(self._storage.list_movies().items(), 
-                        key=lambda x: x[1]['rating'], 
-                        reverse=True)
-        for title, details in movies:
+        if self.columnar:
+            self._print_columns(order_by='-rating')
+            return
+        movies = self._storage.query(order_by='-rating')
+        for title, details in movies.items():
             print(f"\n{title} ({details['year']}): {details['rating']}")
     
     
@@ -340,15 +604,13 @@ class MovieApp:
         Sorts and prints the movies in the storage based on 
         their release years in descending order.
 
-        This function retrieves a list of all movies from the storage using 
-        the `_storage.list_movies()` method.
-        It then sorts the movies based on their release years in 
-        descending order using the `sorted()` function.
-        The `key` parameter of the `sorted()` function is set to a lambda function 
-        that extracts the release year from each movie's details.
-        The `reverse=True` parameter ensures that the movies are sorted in descending order.
+        This function asks the storage for all movies ordered by release year 
+        in descending order using the `_storage.query()` method, 
+        so backends with an index on year can do the sorting themselves.
+        Year ranges are ordered by their first year, 
+        and movies without a numeric year are listed last.
 
-        After sorting the movies, the function iterates over the sorted list and 
+        The function then iterates over the sorted movies and 
         prints each movie's title, year of release, and rating.
 
         Parameters:
@@ -357,19 +619,11 @@ class MovieApp:
         Returns:
         None: This function does not return any value. It prints the sorted list of movies.
         """
-        
-        # Adjust the sorting to handle year ranges
-        def extract_year(movie):
-            try:
-                return int(movie[1]['year'])
-            except ValueError:
-                # Handle any non-numeric year cases
-                return 0
-        
-        movies = sorted(self._storage.list_movies().items(), 
-                        key=extract_year, 
-                        reverse=True)
-        for title, details in movies:
+        if self.columnar:
+            self._print_columns(order_by='-year')
+            return
+        movies = self._storage.query(order_by='-year')
+        for title, details in movies.items():
             print(f"\n{title} ({details['year']}): {details['rating']}")
     
     
@@ -378,9 +632,8 @@ class MovieApp:
         Filters and prints movies from the storage based on a minimum rating.
 
         This function prompts the user to enter a minimum rating. 
-        It then retrieves a list of all movies from the storage.
-        The function filters the movies based on their ratings, 
-        keeping only those movies with a rating greater than or equal to the minimum rating.
+        It then asks the storage for the movies with a numeric rating 
+        greater than or equal to the minimum rating.
         If matching movies are found, the function prints their titles, 
         years of release, and ratings.
         If no matching movies are found, the function prints a message indicating 
@@ -399,13 +652,13 @@ class MovieApp:
             print("\nInvalid input. Please enter a numeric value for the rating.")
             return
 
+        if self.columnar:
+            if not self._print_columns(min_rating=min_rating):
+                print("\nNo movies found with the specified rating.")
+            return
+
         # Filter movies based on rating
-        movies = {
-            title: details
-            for title, details in self._storage.list_movies().items()
-            if details['rating'].replace('.', '', 1).isdigit() 
-                        and float(details['rating']) >= min_rating
-        }
+        movies = self._storage.query(filter={'min_rating': min_rating})
 
         if movies:
             for title, details in movies.items():
@@ -414,10 +667,56 @@ class MovieApp:
             print("\nNo movies found with the specified rating.")
 
 
+    def _command_ratings_report(self):
+        """
+        Prints aggregate rating reports: a histogram of the ratings, rating percentiles,
+        and the average rating per decade and per country.
+
+        The reports are computed with vectorized NumPy operations on 
+        the columnar copy of the movies.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+
+        Returns:
+        None: This function does not return any value. It prints the reports.
+        """
+        try:
+            columns = self._movie_columns()
+        except ImportError as e:
+            print(f"\nError: {e}")
+            return
+        if not columns.rating_summary()['rated']:
+            print("\nNo valid ratings found to compute statistics.")
+            return
+
+        print("\nRating histogram:")
+        histogram = columns.histogram()
+        widest = max(count for _, _, count in histogram) or 1
+        for low, high, count in histogram:
+            bar = '#' * round(40 * count / widest)
+            print(f"{low:4.1f} - {high:4.1f} | {bar} {count}")
+
+        print("\nRating percentiles:")
+        for percent, rating in columns.percentiles().items():
+            print(f"{percent:3d}%: {rating:.1f}")
+
+        print("\nAverage rating per decade:")
+        for decade, count, average in columns.decade_averages():
+            print(f"{decade}s: {average:.2f} ({count} movie(s))")
+
+        print("\nAverage rating per country (top 10):")
+        for country, count, average in columns.group_averages('country')[:10]:
+            print(f"{country}: {average:.2f} ({count} movie(s))")
+
+
     def _country_to_flag_emoji(self, country_name):
         """
         Converts a country name to a flag emoji.
 
+        Uses the precomputed country index in movie_app.countries, 
+        so repeated country lists cost a dictionary lookup.
+
         Args:
             country_name (str): The name of the country. Multiple country names can be separated by commas.
 
@@ -426,19 +725,7 @@ class MovieApp:
                 a generic flag emoji (🏳️) is used. If multiple countries are provided, the flag emojis 
                 are separated by commas.
         """
-        result = []
-        country_names = country_name.split(',')  # Split the country names if multiple countries are listed
-        for name in country_names:
-            name = name.strip()
-            # Attempt to get the country code from the country name
-            try:
-                country_code = self._lookup_country_code(name)
-                flag_emoji = ''.join([chr(ord(char) + 127397) 
-                                    for char in country_code])
-                result.append(f"{flag_emoji} {name}")  # Format as "🇺🇸 United States"
-            except LookupError:
-                result.append(f"🏳️ {name}")  # If country is not found, use a generic flag emoji
-        return ', '.join(result)  # Join the formatted strings with commas
+        return countries_to_flags(country_name)
 
     
     def _lookup_country_code(self, country_name):
@@ -454,64 +741,94 @@ class MovieApp:
         Raises:
             LookupError: If the country name cannot be found in the database.
         """
-        # Normalize country name for lookup
-        country_name = country_name.title()  # Capitalize each word in the country name
-        for country in pycountry.countries:
-            if country_name in [country.name, country.alpha_2]:
-                return country.alpha_2
-        # If exact match not found, try other variations
-        try:
-            return pycountry.countries.lookup(country_name).alpha_2
-        except LookupError:
-            raise LookupError(f"Could not find a record for {country_name!r}")
+        return lookup_country_code(country_name)
 
 
     def _command_generate_website(self):
         """
         Generates a static HTML website displaying movie information.
 
+        The movie cards are streamed into static/index.html, and cards of
+        movies that did not change since the last run are reused from the cache.
+        The posters are downloaded to the poster directory (see PosterCache) and
+        the cards show the local copies.
+        For large collections the user can choose a page size, which splits the
+        grid into linked pages (optionally also per year or per country) 
+        rendered in parallel, rewriting only the pages that changed.
+
         Parameters:
         self (MovieApp): The instance of the MovieApp class.
 
         Returns:
         None: This function does not return any value. It generates a static HTML website.
         """
-        movies = self._storage.list_movies()
-        movie_grid = ""
-        for title, details in movies.items():
-            note = details.get('note', 'No notes available')
-            flag_country = self._country_to_flag_emoji(details.get('country', 'Unknown'))
-            awards = details.get('awards', 'N/A')
-            imdb_id = details.get('imdbID', '')  # Get IMDB ID
-
-            # Build the awards section only if the value is not "N/A"
-            awards_section = f"<div class='movie-awards'>Awards: {awards}</div>\n" if awards != "N/A" else ""
-
-            movie_grid += (
-                f"<li class='movie'>\n"
-                f"<a href='https://www.imdb.com/title/{imdb_id}' target='_blank'>\n"  # Link to IMDB page
-                f"<img src='{details.get('poster', 'default_poster_url')}' alt='{title} poster' "
-                f"class='movie-poster' title='{note}'>\n"
-                f"</a>\n"
-                f"<div class='movie-info'>\n"
-                f"<div class='movie-title'>{title}</div>\n"
-                f"<div class='movie-year'>{details.get('year', 'Unknown')}</div>\n"
-                f"<div class='movie-language'>{details.get('language', 'Unknown')}</div>\n"
-                f"<div class='movie-country'>{flag_country}</div>\n"
-                f"{awards_section}"  # Add awards section only if applicable
-                "</div>\n"
-                "</li>\n"
-            )
-        
-        with open('static/index.html', 'w') as file:
-            with open('static/index_template.html', 'r') as template:
-                content = template.read()
-                content = content.replace('__TEMPLATE_TITLE__', 'My Movie Collection')
-                content = content.replace('__TEMPLATE_MOVIE_GRID__', movie_grid)
-                file.write(content)
-        print("\nWebsite was generated successfully: Name is `index.html`")
+        page_size = input("\nEnter movies per page (or leave blank for a single page): ")
+        group_by = None
+        if page_size:
+            try:
+                page_size = int(page_size)
+                if page_size < 1:
+                    raise ValueError
+            except ValueError:
+                print("\nInvalid input. Please enter a positive number of movies per page.")
+                return
+            group_by = input("\nAlso generate pages by 'year' or 'country'? "
+                             "(or leave blank to skip): ").strip().lower() or None
+            if group_by not in (None, 'year', 'country'):
+                print("\nInvalid input. Please enter 'year', 'country' or leave it blank.")
+                return
+
+        posters = None
+        if self.poster_dir is not None:
+            from movie_app.posters import PosterCache
+
+            posters = PosterCache(self.poster_dir)
+        generator = WebsiteGenerator(posters=posters)
+        movies = self._storage.list_movies().items()
+        try:
+            if not page_size:
+                generator.generate(movies)
+                print("\nWebsite was generated successfully: Name is `index.html`")
+            else:
+                report = generator.generate_pages(movies, page_size=page_size, group_by=group_by)
+                print(f"\nWebsite was generated successfully: {len(report['written'])} page(s) written, "
+                      f"{len(report['unchanged'])} unchanged. Start page is `index.html`")
+        finally:
+            if posters is not None:
+                posters.close()
+        print(f"\n{generator.rendered} card(s) rendered, {generator.reused} reused.")
+        if posters is not None:
+            print(f"\nPosters: {posters.stats['downloaded']} downloaded, "
+                  f"{posters.stats['not_modified']} unchanged, {posters.stats['failed']} failed, "
+                  f"{posters.stats['thumbnails']} thumbnail(s) made.")
+        if self.metrics is not None:
+            self.metrics.increment('website.cards_rendered', generator.rendered)
+            self.metrics.increment('website.cards_reused', generator.reused)
+            if posters is not None:
+                for key, value in posters.stats.items():
+                    self.metrics.increment(f'website.posters_{key}', value)
 
     
+    def serve(self, host='127.0.0.1', port=5000):
+        """
+        Serves the movies as a JSON API instead of running the interactive menu.
+
+        See movie_app.api.register_routes for the endpoints. Requests are handled
+        in parallel threads: the API only reads, and every storage serializes
+        its own access (file locks for the file storages, a connection lock
+        for SQLite).
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+        host (str, optional): The interface to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): The port to listen on. Defaults to 5000.
+
+        Returns:
+        None
+        """
+        self._app.run(host=host, port=port, threaded=True)
+
+
     def run(self):
         """
         This function runs the main menu loop of the MovieApp.
@@ -524,6 +841,21 @@ class MovieApp:
         Returns:
         None: This function does not return any value.
         """
+        commands = {
+            '1': self._command_list_movies,
+            '2': self._command_add_movie,
+            '3': self._command_delete_movie,
+            '4': self._command_update_movie,
+            '5': self._command_status,
+            '6': self._command_random_movie,
+            '7': self._command_search_movie,
+            '8': self._command_sort_movies_by_rating,
+            '9': self._command_sort_movies_by_year,
+            '10': self._command_filter_movies,
+            '11': self._command_generate_website,
+            '12': self._command_import_movies,
+            '13': self._command_ratings_report,
+        }
         while True:
             print("\n********** My Movies Database **********\n")
             print("Menu:")
@@ -539,33 +871,34 @@ class MovieApp:
             print("9. Movies sorted by year")
             print("10. Filter movies")
             print("11. Generate movies website")
-            print("Enter choice (0-11): ", end="")
+            print("12. Import movies from file")
+            print("13. Ratings report")
+            print("Enter choice (0-13): ", end="")
 
             choice = input()
 
             if choice == '0':
                 break
-            elif choice == '1':
-                self._command_list_movies()
-            elif choice == '2':
-                self._command_add_movie()
-            elif choice == '3':
-                self._command_delete_movie()
-            elif choice == '4':
-                self._command_update_movie()
-            elif choice == '5':
-                self._command_status()
-            elif choice == '6':
-                self._command_random_movie()
-            elif choice == '7':
-                self._command_search_movie()
-            elif choice == '8':
-                self._command_sort_movies_by_rating()
-            elif choice == '9':
-                self._command_sort_movies_by_year()
-            elif choice == '10':
-                self._command_filter_movies()
-            elif choice == '11':
-                self._command_generate_website()
-            else:
-                print("\nInvalid choice. Please enter a number between 0 and 11.\n")
\ No newline at end of file
+            command = commands.get(choice)
+            if command is None:
+                print("\nInvalid choice. Please enter a number between 0 and 13.\n")
+                continue
+            self._run_command(command)
+
+
+    def _run_command(self, command):
+        """
+        Runs a menu command, timing it as 'command.<name>' when metrics are collected.
+
+        Parameters:
+        self (MovieApp): The instance of the MovieApp class.
+        command (callable): The bound _command_* method.
+
+        Returns:
+        None
+        """
+        if self.metrics is None:
+            command()
+            return
+        with self.metrics.timer(f"command.{command.__name__.replace('_command_', '', 1)}"):
+            command()
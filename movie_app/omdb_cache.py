@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+from storage.normalize import normalize_title
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    movie TEXT,
+    error TEXT,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+class OmdbCache:
+    def __init__(self,
+                 file_path,
+                 ttl=7 * 24 * 3600,
+                 negative_ttl=24 * 3600,
+                 max_entries=10000):
+        """
+        Initializes a persistent cache of OMDb lookups stored in an SQLite file.
+
+        Found movies are stored under their normalized requested title,
+        their normalized canonical title and their imdbID. Titles OMDb does
+        not know are stored as negative entries with a shorter lifetime.
+        When the cache holds more than max_entries entries,
+        the least recently used ones are evicted.
+
+        Parameters:
+        file_path (str): The path to the SQLite cache file.
+        ttl (float, optional): Lifetime of found movies in seconds. Defaults to 7 days.
+        negative_ttl (float, optional): Lifetime of 'not found' results in seconds.
+                                        Defaults to 1 day.
+        max_entries (int, optional): The maximum number of cached keys. Defaults to 10000.
+        """
+        self.file_path = file_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        self._conn.close()
+
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of this cache instance.
+
+        Returns:
+        dict: 'hits' (found movies served from the cache), 'negative_hits'
+              ('not found' results served from the cache), 'misses' and 'entries'.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'entries': entries}
+
+
+    def _get(self, key):
+        """
+        Looks up a cache key, counting the hit or miss.
+
+        Returns:
+        tuple: (found, movie, error). found is False on a miss or an expired entry;
+               for a negative entry movie is None and error holds OMDb's message.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT movie, error, expires_at FROM responses WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None or row[2] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return False, None, None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            if row[0] is None:
+                self.negative_hits += 1
+                return True, None, row[1]
+            self.hits += 1
+            return True, json.loads(row[0]), None
+
+
+    def get_title(self, title):
+        """
+        Looks up a cached result by movie title.
+
+        Returns:
+        tuple: (found, movie, error), see _get.
+        """
+        return self._get('t:' + normalize_title(title))
+
+
+    def get_imdb_id(self, imdb_id):
+        """
+        Looks up a cached movie by imdbID.
+
+        Returns:
+        tuple: (found, movie, error), see _get.
+        """
+        return self._get('i:' + imdb_id)
+
+
+    def _put(self, keys, movie, error, ttl):
+        """
+        Stores one result under several keys and evicts the least recently used
+        entries beyond max_entries.
+        """
+        now = time.time()
+        body = json.dumps(movie) if movie is not None else None
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, movie, error, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, body, error, now + ttl, now) for key in keys])
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+
+    def put_movie(self, movie, requested_title=None):
+        """
+        Caches a found movie under its canonical title, its imdbID and,
+        if given, the title it was requested by.
+
+        Parameters:
+        movie (dict): The movie data as returned by omdb_client.parse_movie.
+        requested_title (str, optional): The title used for the lookup.
+        """
+        keys = {'t:' + normalize_title(movie["Title"])}
+        if requested_title:
+            keys.add('t:' + normalize_title(requested_title))
+        if movie.get("imdbID"):
+            keys.add('i:' + movie["imdbID"])
+        self._put(sorted(keys), movie, None, self.ttl)
+
+
+    def put_not_found(self, error, title=None, imdb_id=None):
+        """
+        Caches a 'not found' result for a title or an imdbID,
+        with the shorter negative_ttl lifetime.
+
+        Parameters:
+        error (str): OMDb's error message, e.g. 'Movie not found!'.
+        title (str, optional): The title that was looked up.
+        imdb_id (str, optional): The imdbID that was looked up.
+        """
+        keys = []
+        if title:
+            keys.append('t:' + normalize_title(title))
+        if imdb_id:
+            keys.append('i:' + imdb_id)
+        self._put(keys, None, error, self.negative_ttl)
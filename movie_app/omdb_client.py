@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+OMDB_BASE_URL = "http://www.omdbapi.com/"
+
+
+def parse_movie(data):
+    """
+    Converts a successful OMDb API response into the movie data used by the app.
+
+    Args:
+        data (dict): The decoded JSON body of an OMDb response with Response == 'True'.
+
+    Returns:
+        dict: The movie's Title, Year, imdbRating, Poster, Language, Country,
+              Awards and imdbID. Year ranges such as '2010–2013' are cut
+              down to their first year.
+    """
+    year = data["Year"]
+    for separator in ("-", "–"):
+        if separator in year:
+            year = year.split(separator)[0]
+    return {
+        "Title": data["Title"],
+        "Year": year,
+        "imdbRating": data["imdbRating"],
+        "Poster": data["Poster"],
+        "Language": data["Language"],
+        "Country": data["Country"],
+        "Awards": data["Awards"],
+        "imdbID": data["imdbID"]  # Add IMDB ID
+    }
+
+
+def is_not_found(error):
+    """
+    Tells whether an OMDb error message means the movie does not exist
+    ('Movie not found!', 'Incorrect IMDb ID.'), as opposed to a failure
+    such as an invalid API key or an exceeded request limit.
+    """
+    return error in ("Movie not found!", "Incorrect IMDb ID.")
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        """
+        Initializes a thread-safe limiter that spaces out calls to wait().
+
+        Parameters:
+        rate (float): The maximum number of calls per second.
+                      None or 0 disables the limit.
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+
+    def wait(self):
+        """
+        Blocks until the caller may make its next call.
+
+        Each caller reserves the next free time slot under the lock and then
+        sleeps outside of it, so concurrent workers are spread evenly
+        over time instead of bursting.
+
+        Returns:
+        None
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+    async def wait_async(self):
+        """
+        Waits without blocking the event loop until the caller may make its next call.
+
+        Returns:
+        None
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+    def _reserve(self):
+        """
+        Reserves the next free time slot.
+
+        Returns:
+        float: The number of seconds to wait before the reserved slot.
+        """
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+
+class OmdbClient:
+    def __init__(self, 
+                 api_key, 
+                 base_url=OMDB_BASE_URL, 
+                 pool_size=10, 
+                 timeout=10, 
+                 cache=None, 
+                 metrics=None):
+        """
+        Initializes a new OMDb API client.
+
+        All requests go through one requests.Session, so connections to OMDb
+        are kept alive and reused instead of paying a new TCP/DNS setup
+        for every lookup. The session is safe to share between worker threads.
+
+        Parameters:
+        api_key (str): The OMDb API key.
+        base_url (str, optional): The OMDb endpoint. Defaults to OMDB_BASE_URL.
+        pool_size (int, optional): The number of connections kept open for
+                                   concurrent requests. Defaults to 10.
+        timeout (float, optional): The request timeout in seconds. Defaults to 10.
+        cache (OmdbCache, optional): A persistent cache consulted before 
+                                     every request. Defaults to None.
+        metrics (Metrics, optional): Records the round-trip time of every request
+                                     as 'omdb.request' and the response sizes as
+                                     'omdb.bytes_received'. Defaults to None.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.metrics = metrics
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+    def close(self):
+        """
+        Closes the pooled connections of the client.
+        """
+        self.session.close()
+
+
+    def fetch(self, title):
+        """
+        Fetches movie data from OMDb API.
+
+        Args:
+            title (str): The title of the movie to fetch.
+
+        Returns:
+            dict: Movie data as returned by parse_movie if the movie is found.
+                  Returns None if the movie is not found or an error occurs
+                  during the API request.
+        """
+        if self.cache is not None:
+            found, movie, error = self.cache.get_title(title)
+            if found:
+                if movie is None:
+                    print(f"\nError: {error}")
+                return movie
+        return self._request({"t": title}, title=title)
+
+
+    def fetch_by_id(self, imdb_id, use_cache=True):
+        """
+        Fetches movie data from OMDb API by IMDb ID.
+
+        Args:
+            imdb_id (str): The IMDb ID of the movie, e.g. 'tt1375666'.
+            use_cache (bool, optional): Whether a cached result may be returned.
+                                        The fresh result is cached either way.
+                                        Defaults to True.
+
+        Returns:
+            dict: Movie data as returned by parse_movie if the movie is found.
+                  Returns None if the movie is not found or an error occurs
+                  during the API request.
+        """
+        if self.cache is not None and use_cache:
+            found, movie, error = self.cache.get_imdb_id(imdb_id)
+            if found:
+                if movie is None:
+                    print(f"\nError: {error}")
+                return movie
+        return self._request({"i": imdb_id}, imdb_id=imdb_id)
+
+
+    def _request(self, params, title=None, imdb_id=None):
+        """
+        Sends one request to OMDb and caches its outcome.
+
+        Found movies are cached under every key they can be looked up by;
+        'not found' answers are cached for the requested title or imdbID only.
+        Other errors (HTTP failures, an invalid API key) are never cached.
+
+        Returns:
+            dict: Movie data as returned by parse_movie, or None.
+        """
+        try:
+            start = time.perf_counter()
+            response = self.session.get(self.base_url,
+                                        params={"apikey": self.api_key, **params},
+                                        timeout=self.timeout)
+            if self.metrics is not None:
+                self.metrics.observe('omdb.request', time.perf_counter() - start)
+                self.metrics.increment('omdb.bytes_received', len(response.content))
+
+            if response.status_code == 200:
+                data = response.json()
+                if data['Response'] == 'True':
+                    movie = parse_movie(data)
+                    if self.cache is not None:
+                        self.cache.put_movie(movie, requested_title=title)
+                    return movie
+                else:
+                    print(f"\nError: {data['Error']}")
+                    if self.cache is not None and is_not_found(data['Error']):
+                        self.cache.put_not_found(data['Error'], title=title, imdb_id=imdb_id)
+            else:
+                print("\nError: Could not retrieve data from OMDb API.")
+        except requests.RequestException as e:
+            if self.metrics is not None:
+                self.metrics.increment('omdb.errors')
+            print(f"Error: {e}")
+        return None
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from storage.locking import atomic_write
+
+# Bounding box of the thumbnails shown in the website grid, in pixels
+THUMBNAIL_SIZE = (240, 356)
+
+# File extension of the downloaded posters by Content-Type
+EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'image/gif': '.gif'}
+
+
+def _pillow():
+    """
+    Imports Pillow, which only the thumbnails need.
+
+    Returns:
+        module: PIL.Image, or None if Pillow is not installed; the
+                website then shows the downloaded posters unresized.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def make_thumbnail(source, destination, size):
+    """
+    Writes a JPEG thumbnail of an image. Runs in a worker process.
+
+    Args:
+        source (str): The path of the downloaded poster.
+        destination (str): The path of the thumbnail.
+        size (tuple): The (width, height) box the thumbnail must fit in.
+
+    Returns:
+        bool: True if the thumbnail was written, False if the image could not be read.
+    """
+    Image = _pillow()
+    try:
+        with Image.open(source) as image:
+            image.thumbnail(size)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            with atomic_write(destination, binary=True) as file:
+                image.save(file, 'JPEG', quality=85, optimize=True)
+    except OSError:
+        return False
+    return True
+
+
+def is_remote(url):
+    """
+    Tells whether a poster value is an http(s) URL worth downloading (OMDb uses 'N/A' for none).
+    """
+    return isinstance(url, str) and urlparse(url).scheme in ('http', 'https')
+
+
+class PosterCache:
+    def __init__(self,
+                 directory='static/posters',
+                 workers=8,
+                 timeout=10,
+                 thumbnail_size=THUMBNAIL_SIZE,
+                 thumbnail_workers=None):
+        """
+        Initializes a local, content-addressed cache of poster images.
+
+        Posters are downloaded concurrently on a bounded pool of threads
+        sharing one pooled HTTP session, and stored under the SHA-256 of
+        their content ('ab/ab12...ef.jpg'), so posters with the same image
+        are stored once. A manifest remembers the file, ETag and
+        Last-Modified of every URL; later runs send them as If-None-Match
+        and If-Modified-Since, so unchanged posters cost a 304 instead of
+        a download. If Pillow is installed, a JPEG thumbnail is made of
+        every new poster in a pool of worker processes.
+
+        Parameters:
+        directory (str, optional): Where the posters, thumbnails and manifest are kept.
+                                   Defaults to 'static/posters'.
+        workers (int, optional): The number of concurrent downloads. Defaults to 8.
+        timeout (float, optional): The request timeout in seconds. Defaults to 10.
+        thumbnail_size (tuple, optional): The box the thumbnails fit in.
+                                          Defaults to THUMBNAIL_SIZE.
+        thumbnail_workers (int, optional): The number of thumbnail processes. Defaults
+                                           to the number of CPUs; 1 works in this process.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.workers = workers
+        self.timeout = timeout
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.thumbnail_workers = thumbnail_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'failed': 0, 'thumbnails': 0}
+
+
+    def close(self):
+        """
+        Closes the pooled connections of the cache.
+        """
+        self.session.close()
+
+
+    def _path(self, name):
+        """
+        Returns the path of a file of the cache, given its name relative to the directory.
+        """
+        return os.path.join(self.directory, *name.split('/'))
+
+
+    def _load_manifest(self):
+        """
+        Loads the URL -> entry manifest. A missing or unreadable one means every poster is downloaded.
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+    def _download(self, url, entry):
+        """
+        Downloads one poster unless the server reports it unchanged. Runs in a worker thread.
+
+        Args:
+            url (str): The poster URL.
+            entry (dict): The manifest entry of the previous download, or None.
+
+        Returns:
+            tuple: (entry, status): the manifest entry to keep (None if there is
+                   no usable file) and 'downloaded', 'not_modified' or 'failed'.
+        """
+        import requests
+
+        if entry is not None and not os.path.exists(self._path(entry['file'])):
+            entry = None
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"\nError downloading poster {url}: {e}")
+            return entry, 'failed'
+        if response.status_code == 304 and entry is not None:
+            return entry, 'not_modified'
+        if response.status_code != 200:
+            print(f"\nError downloading poster {url}: HTTP {response.status_code}")
+            return entry, 'failed'
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        extension = (EXTENSIONS.get(content_type)
+                     or os.path.splitext(urlparse(url).path)[1].lower()
+                     or '.img')
+        name = f"{digest[:2]}/{digest}{extension}"
+        path = self._path(name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_write(path, binary=True) as file:
+                file.write(content)
+        return {'file': name,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')}, 'downloaded'
+
+
+    def _thumbnail_name(self, entry):
+        """
+        Returns the name of the thumbnail of a manifest entry: the digest of the poster plus the size.
+        """
+        digest = os.path.splitext(entry['file'].split('/')[-1])[0]
+        width, height = self.thumbnail_size
+        return f"thumbs/{digest}-{width}x{height}.jpg"
+
+
+    def _make_thumbnails(self, entries):
+        """
+        Makes the missing thumbnails of the given manifest entries, if Pillow is installed.
+        """
+        if _pillow() is None:
+            if entries:
+                print("\nPillow is not installed: the website shows full-size posters "
+                      "(pip install Pillow for thumbnails).")
+            return
+        jobs = {}
+        for entry in entries:
+            destination = self._path(self._thumbnail_name(entry))
+            if not os.path.exists(destination):
+                jobs[destination] = self._path(entry['file'])
+        if not jobs:
+            return
+        os.makedirs(os.path.join(self.directory, 'thumbs'), exist_ok=True)
+        destinations = list(jobs)
+        sources = [jobs[destination] for destination in destinations]
+        sizes = [self.thumbnail_size] * len(jobs)
+        if self.thumbnail_workers == 1 or len(jobs) == 1:
+            results = list(map(make_thumbnail, sources, destinations, sizes))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.thumbnail_workers) as executor:
+                results = list(executor.map(make_thumbnail, sources, destinations, sizes))
+        self.stats['thumbnails'] += sum(results)
+
+
+    def fetch(self, urls):
+        """
+        Brings the posters of the given URLs up to date in the cache.
+
+        Args:
+            urls (iterable): Poster URLs; values that are not http(s) URLs, like 'N/A', are ignored.
+
+        Returns:
+            dict: URL -> path of the local file to show, the thumbnail if there
+                  is one. URLs that could not be downloaded are left out.
+        """
+        urls = list(dict.fromkeys(url for url in urls if is_remote(url)))
+        manifest = self._load_manifest()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._download, urls, [manifest.get(url) for url in urls]))
+
+        for url, (entry, status) in zip(urls, results):
+            self.stats[status] += 1
+            if entry is None:
+                manifest.pop(url, None)
+            else:
+                manifest[url] = entry
+        available = {url: manifest[url] for url in urls if url in manifest}
+        self._make_thumbnails(available.values())
+
+        os.makedirs(self.directory, exist_ok=True)
+        with atomic_write(self.manifest_path) as file:
+            json.dump(manifest, file)
+
+        assets = {}
+        for url, entry in available.items():
+            thumbnail = self._path(self._thumbnail_name(entry))
+            assets[url] = thumbnail if os.path.exists(thumbnail) else self._path(entry['file'])
+        return assets
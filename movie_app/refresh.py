@@ -0,0 +1,166 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from movie_app.omdb_client import RateLimiter
+from storage.istorage import IStorage
+from storage.movie import Movie
+
+# Fields of a stored movie that a refresh compares with OMDb and updates
+REFRESH_FIELDS = ('year', 'rating', 'poster', 'language', 'country', 'awards')
+
+
+def changed_fields(details, data):
+    """
+    Compares stored movie details with fresh movie data from OMDb.
+
+    Both sides are normalized like Movie records, so '8.8' and 8.8 are equal.
+
+    Args:
+        details (Mapping): The stored movie details.
+        data (dict): The movie data as returned by parse_movie.
+
+    Returns:
+        dict: The REFRESH_FIELDS whose value changed, mapped to the new value
+              in the form update_movies accepts (a missing rating as 'N/A').
+    """
+    stored = Movie.from_dict(details)
+    fresh = Movie(data["Year"], data["imdbRating"], data["Poster"],
+                  data["Language"], data["Country"], data["Awards"])
+    return {field: fresh[field] for field in REFRESH_FIELDS
+            if getattr(fresh, field) != getattr(stored, field)}
+
+
+class RefreshScheduler:
+    def __init__(self,
+                 storage: IStorage,
+                 client,
+                 batch_size=20,
+                 interval=3600.0,
+                 max_age=7 * 24 * 3600,
+                 workers=4,
+                 rate_limit=1.0):
+        """
+        Initializes a scheduler that keeps the stored ratings up to date.
+
+        Every run takes the batch_size movies fetched from OMDb the longest
+        time ago (see IStorage.stale_movies), looks them up again by imdbID,
+        and writes the changed fields and a new fetched_at timestamp with
+        a single update_movies call. Movies that cannot be refreshed (no
+        imdbID, or the lookup failed) get a new timestamp too, so they go
+        to the back of the queue instead of blocking it on every run.
+
+        Parameters:
+        storage (IStorage): The storage holding the movies.
+        client (OmdbClient): The OMDb client used for the lookups.
+        batch_size (int, optional): The number of movies refreshed per run. Defaults to 20.
+        interval (float, optional): The seconds between two runs of the background
+                                    worker. Defaults to one hour.
+        max_age (float, optional): Movies fetched less than max_age seconds ago are
+                                   left alone. Defaults to one week.
+        workers (int, optional): The number of concurrent lookups. Defaults to 4.
+        rate_limit (float, optional): The maximum number of OMDb requests per second.
+                                      None disables the limit. Defaults to 1.0.
+        """
+        self._storage = storage
+        self._client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_age = max_age
+        self.workers = workers
+        self._limiter = RateLimiter(rate_limit)
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_report = None
+
+
+    def _fetch(self, imdb_id):
+        """
+        Fetches one movie by imdbID, bypassing the OMDb cache, once the rate limiter allows it.
+        """
+        if not imdb_id:
+            return None
+        self._limiter.wait()
+        return self._client.fetch_by_id(imdb_id, use_cache=False)
+
+
+    def refresh_once(self, now=None):
+        """
+        Refreshes the stalest movies once.
+
+        Args:
+            now (float, optional): The current POSIX time. Defaults to time.time().
+
+        Returns:
+            dict: 'refreshed' (titles looked up successfully), 'changed'
+                  (title -> names of the changed fields) and 'failed'
+                  (titles without an imdbID or not found on OMDb).
+        """
+        now = time.time() if now is None else now
+        due = [(title, details) for title, details in self._storage.stale_movies(self.batch_size)
+               if details.get('fetched_at') is None or now - details['fetched_at'] >= self.max_age]
+        report = {'refreshed': [], 'changed': {}, 'failed': []}
+        if not due:
+            return report
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._fetch, [details.get('imdbID') for _, details in due]))
+
+        updates = []
+        for (title, details), data in zip(due, results):
+            if data is None:
+                report['failed'].append(title)
+                updates.append({'title': title, 'fetched_at': now})
+                continue
+            changes = changed_fields(details, data)
+            report['refreshed'].append(title)
+            if changes:
+                report['changed'][title] = list(changes)
+            updates.append({'title': title, **changes, 'fetched_at': now})
+        self._storage.update_movies(updates)
+        return report
+
+
+    def start(self):
+        """
+        Starts refreshing in a background thread, once right away and then
+        every interval seconds, until stop() is called.
+
+        The thread is a daemon, so it never keeps the application from exiting.
+        Errors of a run are printed and the next run happens as scheduled.
+
+        Returns:
+        None
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='movie-refresh', daemon=True)
+        self._thread.start()
+
+
+    def _run(self):
+        """
+        The loop of the background thread.
+        """
+        while not self._stop.is_set():
+            try:
+                self.last_report = self.refresh_once()
+            except Exception as e:
+                print(f"\nError refreshing movies: {e}")
+            self._stop.wait(self.interval)
+
+
+    def stop(self, timeout=None):
+        """
+        Stops the background thread, waiting for a running refresh to finish.
+
+        Parameters:
+        timeout (float, optional): The maximum number of seconds to wait. Defaults to None.
+
+        Returns:
+        None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,315 @@
+import heapq
+import re
+import unicodedata
+
+# Fields that can be indexed, with the weight a match in them contributes
+FIELD_WEIGHTS = {
+    'title': 1.0,
+    'language': 0.3,
+    'country': 0.3,
+    'awards': 0.2,
+}
+
+# Minimum trigram similarity for a misspelled query token to match an indexed one
+MIN_SIMILARITY = 0.45
+
+# Score added when the query matches the whole title
+EXACT_TITLE_BONUS = 1.0
+
+# Query words found in more titles than this only refine the matches of rarer words
+COMMON_POSTINGS = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """
+    Case-folds a text and strips its accents, so 'Amélie' matches 'amelie'.
+    """
+    decomposed = unicodedata.normalize('NFKD', str(text).casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Splits a text into its normalized words.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: The words, in order, with repetitions.
+    """
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(token):
+    """
+    Returns the character trigrams of a token, padded with one space on
+    each side so that short tokens and word starts get trigrams too.
+    """
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, fields=('title',)):
+        """
+        Initializes an empty search index over movie titles.
+
+        Two inverted indexes are kept: one from every word of the indexed
+        fields to the titles containing it, and one from every character
+        trigram to the words containing it. A query word that is not
+        in the index is matched to similar indexed words through their
+        shared trigrams, which makes the search tolerant to typos and
+        lets word prefixes match, while only ever touching the vocabulary
+        and the postings of the words involved, never every title.
+
+        Parameters:
+        fields (iterable, optional): The movie fields to index, out of 'title',
+                                     'language', 'country' and 'awards'.
+                                     Defaults to ('title',).
+        """
+        unknown = set(fields) - set(FIELD_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Cannot index field(s): {', '.join(sorted(unknown))}")
+        self.fields = tuple(fields)
+        self._postings = {}   # word -> {title: weight}
+        self._trigrams = {}   # trigram -> set of words
+        self._documents = {}  # title -> ({word: weight}, {field: text})
+        self._titles = {}     # title words joined by spaces -> set of titles
+        self._ranked_cache = {}  # word -> [(title, weight)], best first
+
+
+    def __len__(self):
+        return len(self._documents)
+
+
+    def __contains__(self, title):
+        return title in self._documents
+
+
+    @classmethod
+    def build(cls, movies, fields=('title',)):
+        """
+        Builds an index over a whole collection.
+
+        Args:
+            movies (dict): Title -> details, as returned by IStorage.list_movies.
+            fields (iterable, optional): The fields to index, see __init__.
+
+        Returns:
+            SearchIndex: The populated index.
+        """
+        index = cls(fields)
+        for title, details in movies.items():
+            index.add(title, details)
+        return index
+
+
+    def add(self, title, details=None):
+        """
+        Indexes a movie, replacing any previous entry for the same title.
+
+        Args:
+            title (str): The title of the movie.
+            details (dict, optional): The movie details; only the indexed
+                                      fields other than the title are read.
+        """
+        if title in self._documents:
+            self.remove(title)
+        texts = {'title': title}
+        for field in self.fields:
+            if field != 'title' and details and details.get(field) not in (None, '', 'N/A'):
+                texts[field] = str(details[field])
+
+        words = {}
+        for field, text in texts.items():
+            if field not in self.fields:
+                continue
+            weight = FIELD_WEIGHTS[field]
+            for word in tokenize(text):
+                if weight > words.get(word, 0.0):
+                    words[word] = weight
+        for word, weight in words.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                for trigram in trigrams(word):
+                    self._trigrams.setdefault(trigram, set()).add(word)
+            postings[title] = weight
+            self._ranked_cache.pop(word, None)
+        self._documents[title] = (words, texts)
+        self._titles.setdefault(' '.join(tokenize(title)), set()).add(title)
+
+
+    def update(self, title, details):
+        """
+        Re-indexes a movie after some of its fields changed.
+
+        Fields missing from details, or set to None, keep their indexed value.
+
+        Args:
+            title (str): The title of the movie.
+            details (dict): The changed movie details.
+        """
+        previous = self._documents[title][1] if title in self._documents else {}
+        merged = dict(previous)
+        merged.update((field, value) for field, value in details.items() if value is not None)
+        self.add(title, merged)
+
+
+    def remove(self, title):
+        """
+        Removes a movie from the index. Unknown titles are ignored.
+
+        Args:
+            title (str): The title of the movie.
+        """
+        document = self._documents.pop(title, None)
+        if document is None:
+            return
+        for word in document[0]:
+            postings = self._postings[word]
+            del postings[title]
+            self._ranked_cache.pop(word, None)
+            if not postings:
+                # The word is gone from the vocabulary, and from the trigram index
+                del self._postings[word]
+                for trigram in trigrams(word):
+                    words = self._trigrams[trigram]
+                    words.discard(word)
+                    if not words:
+                        del self._trigrams[trigram]
+        key = ' '.join(tokenize(title))
+        self._titles[key].discard(title)
+        if not self._titles[key]:
+            del self._titles[key]
+
+
+    def _similar_words(self, word):
+        """
+        Finds the indexed words similar to a query word that is not indexed itself.
+
+        Candidates are the words sharing at least one trigram with the query word.
+        Their similarity is the Dice coefficient of the two trigram sets;
+        a candidate that starts with the query word (a prefix the user
+        has not finished typing) is accepted as well. If nothing matches,
+        the vocabulary is scanned for words containing the query word, so
+        a piece from the middle of a word ('ncep') still finds it.
+
+        Returns:
+            dict: Word -> similarity between 0 and 1.
+        """
+        query_trigrams = trigrams(word)
+        shared = {}
+        for trigram in query_trigrams:
+            for candidate in self._trigrams.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = 2.0 * count / (len(query_trigrams) + len(trigrams(candidate)))
+            if candidate.startswith(word):
+                similarity = max(similarity, 0.5 + 0.4 * len(word) / len(candidate))
+            if similarity >= MIN_SIMILARITY:
+                similar[candidate] = similarity
+        if not similar:
+            for candidate in self._postings:
+                if word in candidate:
+                    similar[candidate] = MIN_SIMILARITY + 0.4 * len(word) / len(candidate)
+        return similar
+
+
+    def _ranked(self, word):
+        """
+        Returns the titles containing a word, best first, cached until
+        the word's postings change.
+        """
+        ranked = self._ranked_cache.get(word)
+        if ranked is None:
+            ranked = sorted(self._postings[word].items(),
+                            key=lambda item: (-item[1], len(item[0]), item[0]))
+            self._ranked_cache[word] = ranked
+        return ranked
+
+
+    def search(self, query, limit=10):
+        """
+        Returns the movies best matching a query, best first.
+
+        Every query word contributes the weight of the field it matched in,
+        scaled down by the similarity of the indexed word for fuzzy matches.
+        A title matched by more query words ranks higher, and a query equal
+        to the whole title ranks highest. Ties go to the shorter title.
+
+        Like stop words in a search engine, a query word found in more than
+        COMMON_POSTINGS titles only adds to the score of titles matched by a
+        rarer query word, instead of bringing in thousands of candidates.
+        The rarest word of the query always brings in its titles, and
+        a single-word query is answered from a cached ranking of its titles.
+
+        Args:
+            query (str): The search text.
+            limit (int, optional): The maximum number of results. Defaults to 10.
+
+        Returns:
+            list: (title, score) tuples, best match first.
+        """
+        words = set(tokenize(query))
+        exact_titles = self._titles.get(' '.join(tokenize(query)), ())
+        if len(words) == 1 and next(iter(words)) in self._postings:
+            return self._search_word(next(iter(words)), exact_titles, limit)
+
+        groups = []
+        for word in words:
+            matches = self._similar_words(word) if word not in self._postings else {word: 1.0}
+            if matches:
+                groups.append([(self._postings[match], similarity)
+                               for match, similarity in matches.items()])
+        groups.sort(key=lambda group: sum(len(postings) for postings, _ in group))
+
+        scores = {}
+        for position, group in enumerate(groups):
+            if position == 0 and len(group) == 1 and group[0][1] == 1.0:
+                scores = dict(group[0][0])
+            elif position == 0 or sum(len(postings) for postings, _ in group) <= COMMON_POSTINGS:
+                best = {}
+                for postings, similarity in group:
+                    for title, weight in postings.items():
+                        score = weight * similarity
+                        if score > best.get(title, 0.0):
+                            best[title] = score
+                for title, score in best.items():
+                    scores[title] = scores.get(title, 0.0) + score
+            elif len(group) == 1:
+                postings, similarity = group[0]
+                for title in scores.keys() & postings.keys():
+                    scores[title] += postings[title] * similarity
+            else:
+                for title in scores:
+                    scores[title] += max(postings.get(title, 0.0) * similarity
+                                         for postings, similarity in group)
+
+        for title in exact_titles:
+            scores[title] = scores.get(title, 0.0) + EXACT_TITLE_BONUS
+        if not scores:
+            return []
+        ranked = heapq.nsmallest(limit, scores.items(),
+                                 key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [(title, round(score, 3)) for title, score in ranked]
+
+
+    def _search_word(self, word, exact_titles, limit):
+        """
+        Answers a query of one indexed word from the word's cached ranking.
+        """
+        postings = self._postings[word]
+        results = [(title, round(postings[title] + EXACT_TITLE_BONUS, 3))
+                   for title in sorted(exact_titles, key=lambda title: (len(title), title))]
+        for title, weight in self._ranked(word):
+            if len(results) >= limit:
+                break
+            if title not in exact_titles:
+                results.append((title, round(weight, 3)))
+        return results[:limit]
@@ -0,0 +1,230 @@
+import bisect
+import math
+from storage.query import numeric_rating, rating_of
+
+
+def rating_summary(movies):
+    """
+    Computes the rating statistics shown by the status command.
+
+    Movies without a numeric rating are counted but left out of the statistics.
+
+    Args:
+        movies (dict): Title -> details, as returned by IStorage.list_movies.
+
+    Returns:
+        dict: 'count', 'rated', 'average', 'median', 'best' and 'worst'.
+              'best' and 'worst' hold a 'rating' and the matching 'titles'.
+              The statistics are None if no movie has a rating.
+    """
+    ratings = {}
+    for title, details in movies.items():
+        rating = rating_of(details)
+        if rating is not None:
+            ratings[title] = rating
+    summary = {'count': len(movies), 'rated': len(ratings),
+               'average': None, 'median': None, 'best': None, 'worst': None}
+    if not ratings:
+        return summary
+
+    values = sorted(ratings.values())
+    mid = len(values) // 2
+    summary['average'] = sum(values) / len(values)
+    summary['median'] = (values[mid - 1] + values[mid]) / 2 if len(values) % 2 == 0 else values[mid]
+    for key, rating in (('best', values[-1]), ('worst', values[0])):
+        summary[key] = {'rating': rating,
+                        'titles': [title for title, value in ratings.items() if value == rating]}
+    return summary
+
+
+class RatingStats:
+    def __init__(self):
+        """
+        Initializes empty running rating statistics.
+
+        Instead of re-reading and sorting every rating for each status request,
+        the statistics are kept up to date one movie at a time:
+
+        - the number of movies and of rated movies, and the sum of the ratings;
+        - the distinct ratings in sorted order, each with the titles rated so,
+          which gives the best and worst movies with all their ties;
+        - a cursor on the lower median, which moves by at most one rating per
+          change, since a change shifts the median rank by at most one.
+
+        A change costs a dictionary update, a binary search among the distinct 
+        ratings and a constant number of cursor steps. Reading the summary
+        costs nothing but copying the best and worst titles.
+        """
+        self._ratings = {}          # title -> rating, or None if unrated
+        self._titles = {}           # rating -> {title: None}, in insertion order
+        self._values = []           # distinct ratings, ascending
+        self._rated = 0
+        self._sum = 0.0
+        self._cursor = None         # the distinct rating holding the lower median
+        self._below = 0             # the number of ratings below the cursor
+
+
+    def __len__(self):
+        return len(self._ratings)
+
+
+    @classmethod
+    def build(cls, movies):
+        """
+        Computes the statistics of a whole collection.
+
+        Args:
+            movies (dict): Title -> details, as returned by IStorage.list_movies.
+
+        Returns:
+            RatingStats: The statistics.
+        """
+        stats = cls()
+        for title, details in movies.items():
+            stats.set(title, rating_of(details))
+        return stats
+
+
+    def set(self, title, rating):
+        """
+        Records a movie's rating, replacing any previous one.
+
+        Args:
+            title (str): The title of the movie.
+            rating: The rating as stored; values that are not numeric, 
+                    such as 'N/A', count the movie as unrated.
+        """
+        if title in self._ratings:
+            self.remove(title)
+        rating = numeric_rating(rating)
+        self._ratings[title] = rating
+        if rating is None:
+            return
+        titles = self._titles.get(rating)
+        if titles is None:
+            titles = self._titles[rating] = {}
+            bisect.insort(self._values, rating)
+        titles[title] = None
+        self._rated += 1
+        self._sum += rating
+        if self._cursor is None:
+            self._cursor = rating
+        elif rating < self._cursor:
+            self._below += 1
+        self._move_cursor()
+
+
+    def remove(self, title):
+        """
+        Forgets a movie. Unknown titles are ignored.
+
+        Args:
+            title (str): The title of the movie.
+        """
+        if title not in self._ratings:
+            return
+        rating = self._ratings.pop(title)
+        if rating is None:
+            return
+        titles = self._titles[rating]
+        del titles[title]
+        self._rated -= 1
+        self._sum -= rating
+        if rating < self._cursor:
+            self._below -= 1
+        if not titles:
+            del self._titles[rating]
+            position = bisect.bisect_left(self._values, rating)
+            del self._values[position]
+            if rating == self._cursor:
+                # The cursor's rating is gone: continue from the next one up,
+                # or the next one down if it was the highest
+                if position < len(self._values):
+                    self._cursor = self._values[position]
+                elif self._values:
+                    self._cursor = self._values[-1]
+                    self._below -= len(self._titles[self._cursor])
+                else:
+                    self._cursor = None
+                    self._below = 0
+        if self._sum and not self._rated:
+            self._sum = 0.0  # Drop the rounding residue of an emptied sum
+        self._move_cursor()
+
+
+    def _move_cursor(self):
+        """
+        Steps the median cursor to the rating holding rank (rated - 1) // 2.
+        """
+        if self._cursor is None:
+            return
+        rank = (self._rated - 1) // 2
+        while rank < self._below:
+            position = bisect.bisect_left(self._values, self._cursor)
+            self._cursor = self._values[position - 1]
+            self._below -= len(self._titles[self._cursor])
+        while rank >= self._below + len(self._titles[self._cursor]):
+            self._below += len(self._titles[self._cursor])
+            position = bisect.bisect_right(self._values, self._cursor)
+            self._cursor = self._values[position]
+
+
+    def _median(self):
+        """
+        Returns the median rating: the cursor's rating, or for an even number 
+        of ratings its mean with the next rating in order.
+        """
+        if self._rated % 2:
+            return self._cursor
+        upper_rank = self._rated // 2
+        if upper_rank < self._below + len(self._titles[self._cursor]):
+            return self._cursor
+        upper = self._values[bisect.bisect_right(self._values, self._cursor)]
+        return (self._cursor + upper) / 2
+
+
+    def summary(self):
+        """
+        Returns the statistics in the format of rating_summary.
+
+        Returns:
+            dict: 'count', 'rated', 'average', 'median', 'best' and 'worst'.
+        """
+        summary = {'count': len(self._ratings), 'rated': self._rated,
+                   'average': None, 'median': None, 'best': None, 'worst': None}
+        if not self._rated:
+            return summary
+        summary['average'] = self._sum / self._rated
+        summary['median'] = self._median()
+        for key, rating in (('best', self._values[-1]), ('worst', self._values[0])):
+            summary[key] = {'rating': rating, 'titles': list(self._titles[rating])}
+        return summary
+
+
+    def verify(self, movies):
+        """
+        Recomputes the statistics from scratch and compares them with the running ones.
+
+        Args:
+            movies (dict): Title -> details, as returned by IStorage.list_movies.
+
+        Returns:
+            list: The names of the statistics that differ; empty if all agree.
+        """
+        expected = rating_summary(movies)
+        actual = self.summary()
+        differences = []
+        for key in ('count', 'rated', 'median'):
+            if expected[key] != actual[key]:
+                differences.append(key)
+        if (expected['average'] is None) != (actual['average'] is None) or (
+                expected['average'] is not None
+                and not math.isclose(expected['average'], actual['average'], rel_tol=1e-9)):
+            differences.append('average')
+        for key in ('best', 'worst'):
+            if (expected[key] is None) != (actual[key] is None) or (
+                    expected[key] is not None
+                    and (expected[key]['rating'] != actual[key]['rating']
+                         or sorted(expected[key]['titles']) != sorted(actual[key]['titles']))):
+                differences.append(key)
+        return differences
@@ -0,0 +1,460 @@
+import hashlib
+import json
+import os
+import re
+from movie_app.countries import countries_to_flags
+from storage.query import year_of
+
+TEMPLATE_TITLE = '__TEMPLATE_TITLE__'
+TEMPLATE_MOVIE_GRID = '__TEMPLATE_MOVIE_GRID__'
+TEMPLATE_PAGINATION = '__TEMPLATE_PAGINATION__'
+
+GROUP_BY = ('year', 'country')
+
+# Below this many cards to render, generate_pages renders in this process by
+# default, which is faster than starting worker processes
+PARALLEL_MIN_CARDS = 2000
+
+
+def render_card(title, details):
+    """
+    Renders the HTML list item of one movie in the website grid.
+
+    Args:
+        title (str): The title of the movie.
+        details (dict): The movie details.
+
+    Returns:
+        str: The rendered <li> element.
+    """
+    note = details.get('note', 'No notes available')
+    flag_country = countries_to_flags(details.get('country', 'Unknown'))
+    awards = details.get('awards', 'N/A')
+    imdb_id = details.get('imdbID', '')  # Get IMDB ID
+
+    # Build the awards section only if the value is not "N/A"
+    awards_section = f"<div class='movie-awards'>Awards: {awards}</div>\n" if awards != "N/A" else ""
+
+    return (
+        f"<li class='movie'>\n"
+        f"<a href='https://www.imdb.com/title/{imdb_id}' target='_blank'>\n"  # Link to IMDB page
+        f"<img src='{details.get('poster', 'default_poster_url')}' alt='{title} poster' "
+        f"class='movie-poster' title='{note}'>\n"
+        f"</a>\n"
+        f"<div class='movie-info'>\n"
+        f"<div class='movie-title'>{title}</div>\n"
+        f"<div class='movie-year'>{details.get('year', 'Unknown')}</div>\n"
+        f"<div class='movie-language'>{details.get('language', 'Unknown')}</div>\n"
+        f"<div class='movie-country'>{flag_country}</div>\n"
+        f"{awards_section}"  # Add awards section only if applicable
+        "</div>\n"
+        "</li>\n"
+    )
+
+
+def record_hash(title, details):
+    """
+    Returns a stable hash of a movie record, used as the key of its rendered card.
+    The fetched_at timestamp is left out, since the card does not show it.
+    """
+    fields = {field: value for field, value in details.items() if field != 'fetched_at'}
+    payload = json.dumps([title, fields], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def slugify(name):
+    """
+    Turns a group name such as 'United States' into a file name part ('united-states').
+    """
+    return re.sub(r'[^a-z0-9]+', '-', name.casefold()).strip('-') or 'unknown'
+
+
+def group_movies(movies, group_by):
+    """
+    Groups movies by release year or by country.
+
+    A movie produced in several countries appears in the group of each of them.
+
+    Args:
+        movies (list): (title, details) pairs.
+        group_by (str): 'year' or 'country'.
+
+    Returns:
+        dict: Group name -> list of (title, details) pairs, with the groups sorted
+              (newest year first, countries alphabetically).
+    """
+    if group_by not in GROUP_BY:
+        raise ValueError(f"Cannot group movies by {group_by!r}")
+    groups = {}
+    for title, details in movies:
+        if group_by == 'year':
+            year = year_of(details)
+            names = [str(year) if year is not None else 'Unknown']
+        else:
+            names = [name.strip() for name in str(details.get('country') or 'Unknown').split(',')]
+        for name in names:
+            groups.setdefault(name, []).append((title, details))
+    return dict(sorted(groups.items(), reverse=(group_by == 'year')))
+
+
+def page_file_name(prefix, number):
+    """
+    Returns the file name of a page of a shard: 'index.html', 'index-2.html', ...
+    """
+    return f"{prefix}.html" if number == 1 else f"{prefix}-{number}.html"
+
+
+def render_pagination(prefix, number, page_count, links=None):
+    """
+    Renders the navigation links of one page.
+
+    Only the first and last page and a window of three pages around the
+    current one are linked, so the navigation stays small for thousands of pages.
+
+    Args:
+        prefix (str): The file name prefix of the shard.
+        number (int): The number of the current page, starting at 1.
+        page_count (int): The number of pages in the shard.
+        links (list, optional): Extra (label, href) links, e.g. to the index pages.
+
+    Returns:
+        str: The <nav> element, or '' if there is nothing to link to.
+    """
+    items = [f"<a href='{href}'>{label}</a>" for label, href in links or []]
+    if page_count > 1:
+        if number > 1:
+            items.append(f"<a href='{page_file_name(prefix, number - 1)}' rel='prev'>&laquo; Previous</a>")
+        shown = sorted({1, page_count, *range(max(1, number - 3), min(page_count, number + 3) + 1)})
+        previous = 0
+        for page in shown:
+            if page > previous + 1:
+                items.append("<span class='gap'>&hellip;</span>")
+            if page == number:
+                items.append(f"<span class='current'>{page}</span>")
+            else:
+                items.append(f"<a href='{page_file_name(prefix, page)}'>{page}</a>")
+            previous = page
+        if number < page_count:
+            items.append(f"<a href='{page_file_name(prefix, number + 1)}' rel='next'>Next &raquo;</a>")
+    if not items:
+        return ""
+    return "<nav class='pagination'>\n" + "\n".join(items) + "\n</nav>\n"
+
+
+def render_page(head, tail, movies, keys, cached_cards, pagination, grid=None):
+    """
+    Renders one complete page. Runs in a worker process during generate_pages.
+
+    Args:
+        head (str): The template up to the movie grid.
+        tail (str): The template after the movie grid.
+        movies (list): The (title, details) pairs shown on the page.
+        keys (list): The record_hash of each movie, in the same order.
+        cached_cards (dict): Record hash -> previously rendered card.
+        pagination (str): The rendered navigation of the page.
+        grid (str, optional): Ready-made grid content used instead of movie cards.
+
+    Returns:
+        tuple: (content, cards, rendered): the page HTML, the record hash -> card
+               of every card on the page, and how many cards had to be rendered.
+    """
+    cards = {}
+    rendered = 0
+    if grid is None:
+        parts = []
+        for (title, details), key in zip(movies, keys):
+            card = cached_cards.get(key)
+            if card is None:
+                card = render_card(title, details)
+                rendered += 1
+            cards[key] = card
+            parts.append(card)
+        grid = ''.join(parts)
+    content = head + grid + tail.replace(TEMPLATE_PAGINATION, pagination)
+    return content, cards, rendered
+
+
+class WebsiteGenerator:
+    def __init__(self,
+                 template_path='static/index_template.html',
+                 output_path='static/index.html',
+                 cache_path=None,
+                 title='My Movie Collection',
+                 posters=None):
+        """
+        Initializes a new static website generator.
+
+        Parameters:
+        template_path (str, optional): The HTML template with the __TEMPLATE_TITLE__
+                                       and __TEMPLATE_MOVIE_GRID__ placeholders.
+        output_path (str, optional): The HTML file to generate.
+        cache_path (str, optional): The JSON file caching rendered cards between runs.
+                                    Defaults to '.card_cache.json' next to the output.
+        title (str, optional): The page title. Defaults to 'My Movie Collection'.
+        posters (PosterCache, optional): When given, the posters are downloaded into
+                                         it and the cards show the local copies
+                                         instead of hotlinking the poster URLs.
+                                         Defaults to None.
+        """
+        self.template_path = template_path
+        self.output_path = output_path
+        self.cache_path = cache_path or os.path.join(os.path.dirname(output_path), '.card_cache.json')
+        self.title = title
+        self.posters = posters
+        self.rendered = 0
+        self.reused = 0
+
+
+    def _load_cache(self):
+        """
+        Loads the rendered cards of the previous run, keyed by record hash.
+        A missing or unreadable cache file just means every card is rendered.
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+    def _localize_posters(self, movies):
+        """
+        Points the posters of the movies to their local copies in the poster cache.
+
+        Movies whose poster could not be downloaded keep the original URL.
+        The stored details are not modified; the movies get copies.
+
+        Args:
+            movies (iterable): (title, details) pairs.
+
+        Returns:
+            iterable: (title, details) pairs with the poster as a path relative to the output.
+        """
+        if self.posters is None:
+            return movies
+        movies = list(movies)
+        assets = self.posters.fetch(details.get('poster') for _, details in movies)
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        localized = []
+        for title, details in movies:
+            asset = assets.get(details.get('poster'))
+            if asset is not None:
+                details = details.copy()
+                details['poster'] = os.path.relpath(os.path.abspath(asset), output_dir).replace(os.sep, '/')
+            localized.append((title, details))
+        return localized
+
+
+    def _read_template(self, title=None):
+        """
+        Splits the template around the movie grid placeholder.
+
+        Args:
+            title (str, optional): The page title. Defaults to the generator's title.
+
+        Returns:
+            tuple: (head, tail), with the title placeholder already filled in.
+        """
+        with open(self.template_path, 'r') as template:
+            content = template.read().replace(TEMPLATE_TITLE, title or self.title)
+        head, _, tail = content.partition(TEMPLATE_MOVIE_GRID)
+        return head, tail
+
+
+    def iter_cards(self, movies, cache, used):
+        """
+        Yields the rendered card of every movie, reusing cached fragments.
+
+        A card is only rendered when no fragment is cached for the hash of
+        its record, so after editing one movie only that card is re-rendered.
+
+        Args:
+            movies (iterable): (title, details) pairs.
+            cache (dict): Record hash -> rendered card from the previous run.
+            used (dict): Receives the record hash -> card of every yielded card.
+
+        Yields:
+            str: The rendered <li> element of each movie.
+        """
+        for title, details in movies:
+            key = record_hash(title, details)
+            card = cache.get(key)
+            if card is None:
+                card = render_card(title, details)
+                self.rendered += 1
+            else:
+                self.reused += 1
+            used[key] = card
+            yield card
+
+
+    def generate(self, movies):
+        """
+        Writes the website, streaming the movie cards straight into the output file.
+
+        The cache file is rewritten afterwards with the cards of this run only,
+        so cards of deleted or changed movies don't accumulate. With a poster
+        cache, the posters are brought up to date first.
+
+        Args:
+            movies (iterable): (title, details) pairs, e.g. list_movies().items().
+
+        Returns:
+            None
+        """
+        self.rendered = self.reused = 0
+        movies = self._localize_posters(movies)
+        head, tail = self._read_template()
+        cache = self._load_cache()
+        used = {}
+        with open(self.output_path, 'w') as file:
+            file.write(head)
+            file.writelines(self.iter_cards(movies, cache, used))
+            file.write(tail.replace(TEMPLATE_PAGINATION, ''))
+        with open(self.cache_path, 'w', encoding='utf-8') as file:
+            json.dump(used, file)
+
+
+    def _plan_shard(self, jobs, prefix, movies, page_size, title, links):
+        """
+        Splits one list of movies into pages and adds a render job for each page.
+
+        Returns:
+            str: The file name of the shard's first page.
+        """
+        page_count = max(1, -(-len(movies) // page_size))
+        head, tail = self._read_template(title)
+        for number in range(1, page_count + 1):
+            jobs.append((page_file_name(prefix, number),
+                         head, 
+                         tail,
+                         movies[(number - 1) * page_size:number * page_size],
+                         render_pagination(prefix, number, page_count, links),
+                         None))
+        return page_file_name(prefix, 1)
+
+
+    def generate_pages(self, movies, page_size=100, group_by=None, workers=None):
+        """
+        Writes the website as a set of fixed-size pages with navigation links.
+
+        The first page is written to output_path, the following ones next to it
+        ('index-2.html', ...). With group_by, every year or country additionally
+        gets its own paginated pages, plus an overview page ('by-year.html') 
+        linking to them. The pages are rendered in parallel worker processes
+        (in this process if fewer than PARALLEL_MIN_CARDS cards need rendering),
+        reusing cached cards, and a page file is only rewritten when its content
+        changed; pages left over from a previous, larger run are removed.
+
+        Args:
+            movies (iterable): (title, details) pairs, e.g. list_movies().items().
+            page_size (int, optional): The number of movies per page. Defaults to 100.
+            group_by (str, optional): 'year' or 'country'. Defaults to None.
+            workers (int, optional): The number of worker processes. Defaults to
+                                     the number of CPUs for large sites; 1 renders
+                                     in this process.
+
+        Returns:
+            dict: 'written' and 'unchanged' lists of page file names.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        movies = list(self._localize_posters(movies))
+        self.rendered = self.reused = 0
+        output_dir = os.path.dirname(self.output_path)
+        prefix = os.path.splitext(os.path.basename(self.output_path))[0]
+        cache = self._load_cache()
+
+        jobs = []
+        links = []
+        if group_by is not None:
+            groups = group_movies(movies, group_by)
+            overview = f"by-{group_by}"
+            links = [("All movies", page_file_name(prefix, 1)),
+                     (f"By {group_by}", page_file_name(overview, 1))]
+            entries = []
+            for name, group in groups.items():
+                first_page = self._plan_shard(jobs, f"{group_by}-{slugify(name)}", group, page_size,
+                                              f"{self.title}: {name}", links)
+                entries.append(f"<li class='group'><a href='{first_page}'>{name} ({len(group)})</a></li>\n")
+            head, tail = self._read_template(f"{self.title} by {group_by}")
+            jobs.append((page_file_name(overview, 1), head, tail, [],
+                         render_pagination(overview, 1, 1, links), ''.join(entries)))
+        self._plan_shard(jobs, prefix, movies, page_size, self.title, links)
+
+        names = [job[0] for job in jobs]
+        # Hashed once per movie, though grouped sites show it on several pages
+        hashes = {title: record_hash(title, details) for title, details in movies}
+        arguments = []
+        for _, head, tail, page_movies, pagination, grid in jobs:
+            keys = [hashes[title] for title, _ in page_movies]
+            arguments.append((head, tail, page_movies, keys, self._cached_cards(cache, keys),
+                              pagination, grid))
+        uncached = sum(key not in cache for key in hashes.values())
+        if (workers == 1 or len(arguments) == 1
+                or (workers is None and uncached < PARALLEL_MIN_CARDS)):
+            results = [render_page(*args) for args in arguments]
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # Only paginated sites need it
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(render_page, *zip(*arguments)))
+
+        manifest_path = os.path.join(output_dir, '.pages.json')
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+
+        report = {'written': [], 'unchanged': []}
+        used = {}
+        pages = {}
+        for name, (content, cards, rendered) in zip(names, results):
+            used.update(cards)
+            self.rendered += rendered
+            self.reused += len(cards) - rendered
+            digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            path = os.path.join(output_dir, name)
+            # A page is skipped only if its content is unchanged and the file is
+            # still the one written last time (it may have been overwritten since).
+            entry = manifest.get(name)
+            if entry and entry[0] == digest and entry[1:] == self._file_stat(path):
+                pages[name] = entry
+                report['unchanged'].append(name)
+                continue
+            with open(path, 'w') as file:
+                file.write(content)
+            pages[name] = [digest, *self._file_stat(path)]
+            report['written'].append(name)
+
+        for name in set(manifest) - set(pages):
+            path = os.path.join(output_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        with open(manifest_path, 'w', encoding='utf-8') as file:
+            json.dump(pages, file)
+        with open(self.cache_path, 'w', encoding='utf-8') as file:
+            json.dump(used, file)
+        return report
+
+
+    @staticmethod
+    def _cached_cards(cache, keys):
+        """
+        Picks the cached cards of the given record hashes, so a worker process
+        only receives the part of the cache it needs.
+        """
+        return {key: cache[key] for key in keys if key in cache}
+
+
+    @staticmethod
+    def _file_stat(path):
+        """
+        Returns [mtime_ns, size] of a file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
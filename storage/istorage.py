@@ -1,4 +1,70 @@
+import hashlib
+import heapq
+import json
 from abc import ABC, abstractmethod
+from storage.movie import Movie
+from storage.normalize import TitleIndex
+from storage.query import apply_query
+
+# Keys of a movie dictionary passed to IStorage.add_movies
+MOVIE_FIELDS = ('title', 
+                'year', 
+                'rating', 
+                'poster', 
+                'language', 
+                'country', 
+                'awards', 
+                'imdbID', 
+                'note',
+                'fetched_at')
+
+# Keys of MOVIE_FIELDS that may be left out
+OPTIONAL_FIELDS = ('note', 'fetched_at')
+
+# Keys of an update dictionary passed to IStorage.update_movies, besides 'title'
+UPDATE_FIELDS = ('year', 'rating', 'poster', 'language', 'country', 'awards', 'note', 'fetched_at')
+
+
+def movie_details(movie):
+    """
+    Builds the stored details of a movie passed to IStorage.add_movies.
+
+    Parameters:
+    movie (dict): The movie, with the keys of MOVIE_FIELDS (those in OPTIONAL_FIELDS may be missing).
+
+    Returns:
+    Movie: The movie details, without the title.
+
+    Raises:
+    KeyError: If a required field is missing.
+    """
+    return Movie(*(movie[field] if field not in OPTIONAL_FIELDS else movie.get(field)
+                   for field in MOVIE_FIELDS[1:]))
+
+
+def _staleness(item):
+    """
+    Sort key of a (title, details) pair putting missing fetched_at timestamps first.
+    """
+    fetched_at = item[1]['fetched_at']
+    return (fetched_at is not None, fetched_at or 0.0)
+
+
+def apply_update(details, update):
+    """
+    Applies the non-None fields of an update dictionary to stored movie details.
+
+    Parameters:
+    details (Movie): The stored movie details, modified in place.
+    update (dict): The new values, keyed by the names in UPDATE_FIELDS.
+
+    Returns:
+    None
+    """
+    for field in UPDATE_FIELDS:
+        if update.get(field) is not None:
+            details[field] = update[field]
+
 
 class IStorage(ABC):
     @abstractmethod
@@ -14,6 +80,27 @@ class IStorage(ABC):
         pass
         raise NotImplementedError
 
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        """
+        Returns the movies matching a filter, optionally ordered and paginated.
+
+        The default implementation filters list_movies() in Python; 
+        backends with indexes should override it and push the work down.
+
+        Parameters:
+        filter (dict, optional): Conditions to match. Supported keys are 
+            'title_contains' (case-insensitive substring), 'min_rating', 
+            'max_rating', 'min_year' and 'max_year'. Defaults to None (all movies).
+        order_by (str, optional): 'title', 'year' or 'rating', prefixed with '-' 
+            for descending order. Defaults to None (storage order).
+        limit (int, optional): Maximum number of movies to return. Defaults to None.
+        offset (int, optional): Number of matching movies to skip. Defaults to 0.
+
+        Returns:
+        dict: The matching movies in the requested order, keyed by title.
+        """
+        return apply_query(self.list_movies().items(), filter, order_by, limit, offset)
+
     @abstractmethod
     def add_movie(self, 
                   title, 
@@ -23,7 +110,7 @@ class IStorage(ABC):
                   language, 
                   country, 
                   awards, 
-                  imdbID, note=None):
+                  imdbID, note=None, fetched_at=None):
         """
         Adds a movie to the storage.
 
@@ -37,6 +124,8 @@ class IStorage(ABC):
         awards (str): The awards received by the movie.
         imdbID (str): The unique identifier for the movie on IMDb.
         note (str, optional): Additional notes about the movie. Defaults to None.
+        fetched_at (float, optional): When the details were fetched from OMDb,
+            as a POSIX timestamp. Defaults to None (unknown).
 
         Returns:
         None
@@ -58,7 +147,9 @@ class IStorage(ABC):
                      language=None, 
                      country=None, 
                      awards=None, 
-                     note=None):
+                     note=None,
+                     poster=None,
+                     fetched_at=None):
         """
         Updates a movie's information in the storage.
 
@@ -70,9 +161,182 @@ class IStorage(ABC):
         country (str, optional): The new country where the movie was produced. Defaults to None.
         awards (str, optional): The new awards received by the movie. Defaults to None.
         note (str, optional): The new additional notes about the movie. Defaults to None.
+        poster (str, optional): The new URL of the poster. Defaults to None.
+        fetched_at (float, optional): When the details were last fetched from OMDb. Defaults to None.
 
         Returns:
         None
         """
         pass
         raise NotImplementedError
+
+    def add_movies(self, movies):
+        """
+        Adds several movies to the storage.
+
+        The default implementation calls add_movie once per movie; 
+        file based storages override it to load and write the data only once.
+
+        Parameters:
+        movies (iterable): Dictionaries with the keys of MOVIE_FIELDS 
+            (those in OPTIONAL_FIELDS may be missing).
+
+        Returns:
+        dict: Maps each title to True if the movie was added,
+              or False if it was rejected (e.g. a required field is missing).
+        """
+        results = {}
+        for movie in movies:
+            try:
+                details = movie_details(movie)
+                self.add_movie(movie['title'], **details)
+                results[movie['title']] = True
+            except KeyError:
+                results[movie.get('title')] = False
+        return results
+
+    def update_movies(self, updates):
+        """
+        Updates several movies in the storage.
+
+        The default implementation calls update_movie once per movie with the
+        fields that are set; file based storages override it to load and 
+        write the data only once.
+
+        Parameters:
+        updates (iterable): Dictionaries with the 'title' of the movie 
+            and the new values for any of UPDATE_FIELDS.
+
+        Returns:
+        dict: Maps each title to True if the movie was updated,
+              or False if it does not exist.
+        """
+        results = {}
+        for update in updates:
+            title = update.get('title')
+            if title is not None and self.check_if_exists(title):
+                self.update_movie(title, **{field: update[field] for field in UPDATE_FIELDS
+                                            if update.get(field) is not None})
+                results[title] = True
+            else:
+                results[title] = False
+        return results
+
+    def delete_movies(self, titles):
+        """
+        Deletes several movies from the storage.
+
+        The default implementation calls delete_movie once per title;
+        file based storages override it to load and write the data only once.
+
+        Parameters:
+        titles (iterable): The titles of the movies to delete.
+
+        Returns:
+        dict: Maps each title to True if the movie was deleted,
+              or False if it does not exist.
+        """
+        results = {}
+        for title in titles:
+            results[title] = self.check_if_exists(title)
+            if results[title]:
+                self.delete_movie(title)
+        return results
+
+    def version(self):
+        """
+        Returns a token that changes whenever the stored movies change.
+
+        Used to validate caches such as HTTP ETags. The default implementation
+        hashes the whole catalog; storages override it with something cheaper,
+        like the data file's modification time and size.
+
+        Returns:
+        str: The version token.
+        """
+        movies = {title: dict(details) for title, details in self.list_movies().items()}
+        payload = json.dumps(movies, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def last_modified(self):
+        """
+        Returns the time of the last change to the stored movies.
+
+        Returns:
+        float: A POSIX timestamp, or None if the storage cannot tell.
+        """
+        return None
+
+    def get_movie(self, title):
+        """
+        Returns the details of one movie.
+
+        The default implementation looks the title up in list_movies;
+        storages with a title index override it to read only that movie.
+
+        Parameters:
+        title (str): The title of the movie.
+
+        Returns:
+        Movie: The movie details, or None if there is no movie with that title.
+        """
+        return self.list_movies().get(title)
+
+    def find_title(self, title):
+        """
+        Finds a stored movie whose title matches a title once both are normalized
+        (see storage.normalize.normalize_title), e.g. 'inception' for 'Inception'.
+
+        Unlike check_if_exists, which compares titles exactly, this is meant
+        for duplicate detection. The default implementation scans list_movies;
+        storages override it with a maintained index.
+
+        Parameters:
+        title (str): The title to look for.
+
+        Returns:
+        str: The stored title, or None if no stored title matches.
+        """
+        return TitleIndex(self.list_movies()).find_title(title)
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Finds the stored movie with an imdbID.
+
+        The default implementation scans list_movies; storages override it with an index.
+
+        Parameters:
+        imdb_id (str): The IMDb ID, e.g. 'tt1375666'.
+
+        Returns:
+        str: The stored title, or None if no stored movie has that imdbID.
+        """
+        return TitleIndex(self.list_movies()).find_imdb_id(imdb_id)
+
+    def stale_movies(self, limit):
+        """
+        Returns the movies whose details were fetched from OMDb the longest time ago.
+
+        Movies without a fetched_at timestamp (added before it was recorded)
+        come first. The default implementation selects them from list_movies;
+        storages with an index on fetched_at override it.
+
+        Parameters:
+        limit (int): The maximum number of movies to return.
+
+        Returns:
+        list: (title, details) pairs, the stalest first.
+        """
+        return heapq.nsmallest(limit, self.list_movies().items(), key=_staleness)
+
+    def io_stats(self):
+        """
+        Returns how many bytes the storage has read from and written to its files.
+
+        The counters only grow; callers take differences to measure one operation.
+        The default implementation returns None, for storages that do not count their I/O.
+
+        Returns:
+        dict: 'bytes_read' and 'bytes_written', or None.
+        """
+        return None
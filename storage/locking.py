@@ -0,0 +1,152 @@
+import contextlib
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are kept apart
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+
+
+class FileLock:
+    def __init__(self, path):
+        """
+        Initializes a lock guarding read-modify-write cycles on one data file.
+
+        The lock combines a re-entrant thread lock, which keeps the threads of
+        a server apart, with an advisory fcntl lock on '<path>.lock', which
+        keeps other processes (for example the CLI and a server sharing the
+        data file) apart. The lock file is separate from the data file because
+        the data file is replaced on every write.
+
+        Use file_lock() rather than this constructor, so every storage
+        working on the same file in this process shares one lock.
+
+        Parameters:
+        path (str): The path of the data file to guard.
+        """
+        self.path = path + LOCK_SUFFIX
+        self.mutex = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+
+    def __enter__(self):
+        self.mutex.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, 'a')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self.mutex.release()
+                raise
+        self._depth += 1
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            # Closing the file releases the fcntl lock
+            self._file.close()
+            self._file = None
+        self.mutex.release()
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path):
+    """
+    Returns the lock guarding the given data file.
+
+    fcntl locks belong to a process rather than to a file handle, so two
+    handles of the same process would not exclude each other. All storages
+    of a process opening the same file therefore share one FileLock.
+
+    Args:
+        path (str): The path of the data file.
+
+    Returns:
+        FileLock: The lock for the file.
+    """
+    key = os.path.realpath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = FileLock(path)
+        return lock
+
+
+@contextlib.contextmanager
+def atomic_write(path, newline=None, binary=False):
+    """
+    Replaces a file's content without ever leaving it half-written.
+
+    The caller writes to a temporary file in the same directory. When the
+    block ends, the file is flushed to disk with fsync and renamed over the
+    target with os.replace, so readers and a crash at any point see either
+    the old or the new file. If the block raises, the target is left untouched.
+
+    Args:
+        path (str): The file to write.
+        newline (str, optional): Passed to open(), e.g. '' for CSV files.
+        binary (bool, optional): Open the temporary file for writing bytes
+                                 instead of UTF-8 text. Defaults to False.
+
+    Yields:
+        file: The temporary file, opened for writing.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp', dir=directory)
+    try:
+        file = os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8', newline=newline)
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _file_mode(path):
+    """
+    Returns the permissions the replaced file should keep: those of the
+    existing file, or 0644 for a new one (mkstemp creates files as 0600).
+    """
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        return 0o644
+
+
+def _fsync_directory(directory):
+    """
+    Flushes a directory entry change (such as a rename) to disk where supported.
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,138 @@
+import sys
+from collections.abc import Mapping
+from storage.query import numeric_rating, numeric_year
+
+MISSING = 'N/A'  # How a missing year or rating reads through the mapping interface
+
+# Fields whose values repeat across a catalog and are interned to share one string
+INTERNED_FIELDS = ('language', 'country', 'awards')
+
+
+def _intern(value):
+    """
+    Interns a string value so every movie with the same value shares one object.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+class Movie(Mapping):
+    """
+    The details of one movie: everything but its title, which the storages
+    use as the key.
+
+    A Movie is a slotted record rather than a dict: it has no per-instance
+    dictionary, the year is stored as an int and the rating as a float
+    (None when missing), and repeated strings such as countries and
+    languages are interned. Reading movie.rating or movie.year needs
+    no parsing.
+
+    It also behaves like the dict the storages used to return,
+    so details['rating'], details.get('year'), dict(details) and
+    {**details} keep working; through that interface a missing year or
+    rating reads as 'N/A', the way OMDb reports it, while details.get()
+    returns its default for the other missing fields, as it did for the
+    records that had no such key. Assigning through
+    details['rating'] = ... normalizes the value like the constructor.
+    """
+
+    __slots__ = ('year', 'rating', 'poster', 'language', 'country', 'awards', 'imdbID', 'note',
+                 'fetched_at')
+
+    def __init__(self,
+                 year=None,
+                 rating=None,
+                 poster=None,
+                 language=None,
+                 country=None,
+                 awards=None,
+                 imdbID=None,
+                 note=None,
+                 fetched_at=None):
+        """
+        Initializes a movie record.
+
+        Parameters:
+        year (int or str, optional): The release year; '2010' and '2010–2013' become 2010.
+        rating (float or str, optional): The rating; '8.8' becomes 8.8.
+                                         Values that are not numeric, like 'N/A', become None.
+        poster (str, optional): The URL of the poster.
+        language (str, optional): The languages, comma separated.
+        country (str, optional): The countries, comma separated.
+        awards (str, optional): The awards.
+        imdbID (str, optional): The IMDb ID.
+        note (str, optional): The user's note.
+        fetched_at (float or str, optional): When the details were last fetched
+                                             from OMDb, as a POSIX timestamp.
+        """
+        self.year = numeric_year(year)
+        self.rating = numeric_rating(rating)
+        self.poster = poster
+        self.language = _intern(language)
+        self.country = _intern(country)
+        self.awards = _intern(awards)
+        self.imdbID = imdbID
+        self.note = note
+        self.fetched_at = None if fetched_at in (None, '') else float(fetched_at)
+
+
+    @classmethod
+    def from_dict(cls, details):
+        """
+        Builds a movie record from a details dictionary; unknown keys are ignored.
+        """
+        return cls(**{field: details.get(field) for field in cls.__slots__})
+
+
+    def copy(self):
+        """
+        Returns an independent copy of the record.
+        """
+        movie = Movie.__new__(Movie)
+        for field in self.__slots__:
+            setattr(movie, field, getattr(self, field))
+        return movie
+
+
+    def __getitem__(self, field):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        value = getattr(self, field)
+        if value is None and field in ('year', 'rating'):
+            return MISSING
+        return value
+
+
+    def get(self, field, default=None):
+        if field not in self.__slots__:
+            return default
+        if getattr(self, field) is None and field not in ('year', 'rating'):
+            return default
+        return self[field]
+
+
+    def __setitem__(self, field, value):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        if field == 'year':
+            value = numeric_year(value)
+        elif field == 'rating':
+            value = numeric_rating(value)
+        elif field in INTERNED_FIELDS:
+            value = _intern(value)
+        elif field == 'fetched_at' and value is not None:
+            value = float(value)
+        setattr(self, field, value)
+
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+
+    def __len__(self):
+        return len(self.__slots__)
+
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"Movie({fields})"
+
@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+_NOT_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_title(title):
+    """
+    Normalizes a movie title for duplicate detection.
+
+    The title is Unicode-normalized (NFKD) with its accents dropped,
+    case-folded, and every run of punctuation and whitespace becomes a
+    single space, so 'Amélie', 'amelie' and 'AMÉLIE!' all normalize to 'amelie',
+    and 'Spider-Man: No Way Home' to 'spider man no way home'.
+
+    Args:
+        title (str): The title.
+
+    Returns:
+        str: The normalized title.
+    """
+    decomposed = unicodedata.normalize('NFKD', str(title))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _NOT_WORD.sub(' ', stripped.casefold()).strip()
+
+
+class TitleIndex:
+    def __init__(self, movies=None):
+        """
+        Initializes a secondary index of stored movies by normalized title and by imdbID.
+
+        Storages keep one next to their data and update it on every add
+        and delete, so finding a duplicate is a dictionary lookup instead
+        of a scan. Several stored titles may share a normalized title
+        (e.g. duplicates added before the index existed), and so may several
+        titles share an imdbID; lookups return the one stored first.
+
+        Parameters:
+        movies (dict, optional): Title -> details to index.
+        """
+        self._titles = {}    # normalized title -> [stored titles]
+        self._imdb_ids = {}  # imdbID -> [stored titles]
+        for title, details in (movies or {}).items():
+            self.add(title, details)
+
+
+    def add(self, title, details):
+        """
+        Indexes a stored movie.
+        """
+        titles = self._titles.setdefault(normalize_title(title), [])
+        if title not in titles:
+            titles.append(title)
+        imdb_id = details.get('imdbID')
+        if imdb_id:
+            titles = self._imdb_ids.setdefault(imdb_id, [])
+            if title not in titles:
+                titles.append(title)
+
+
+    def remove(self, title, details):
+        """
+        Removes a movie from the index; its details are needed to find its imdbID.
+        """
+        key = normalize_title(title)
+        titles = self._titles.get(key, [])
+        if title in titles:
+            titles.remove(title)
+            if not titles:
+                del self._titles[key]
+        imdb_id = details.get('imdbID')
+        titles = self._imdb_ids.get(imdb_id, []) if imdb_id else []
+        if title in titles:
+            # Other titles with the same imdbID keep it findable
+            titles.remove(title)
+            if not titles:
+                del self._imdb_ids[imdb_id]
+
+
+    def replace(self, title, old_details, new_details):
+        """
+        Re-indexes a movie stored again under the same title, e.g. with another imdbID.
+        """
+        if old_details is not None:
+            self.remove(title, old_details)
+        self.add(title, new_details)
+
+
+    def find_title(self, title):
+        """
+        Returns the stored title matching a title once both are normalized, or None.
+        """
+        titles = self._titles.get(normalize_title(title))
+        return titles[0] if titles else None
+
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Returns the stored title of the movie with an imdbID, or None.
+        """
+        titles = self._imdb_ids.get(imdb_id) if imdb_id else None
+        return titles[0] if titles else None
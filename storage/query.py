@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import re
+
+# Supported keys of the 'filter' argument of IStorage.query
+FILTER_KEYS = ('title_contains', 'min_rating', 'max_rating', 'min_year', 'max_year')
+
+# Fields that IStorage.query can order by; prefix with '-' for descending order
+ORDER_FIELDS = ('title', 'year', 'rating')
+
+MISSING = float('-inf')  # Sort value for missing years and ratings
+
+
+def numeric_rating(value):
+    """
+    Converts a stored rating to a float.
+
+    Args:
+        value: The rating as stored, e.g. 8.8, '8.8' or 'N/A'.
+
+    Returns:
+        float: The rating, or None if it is missing or not numeric.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def numeric_year(value):
+    """
+    Converts a stored release year to an int.
+
+    Args:
+        value: The year as stored, e.g. 2010, '2010' or '2010–2013'.
+
+    Returns:
+        int: The (first) year, or None if it is missing or not numeric.
+    """
+    if value is None:
+        return None
+    if type(value) is int:  # Already numeric, e.g. read back from a Movie record
+        return value
+    match = re.match(r'\s*(\d{4})', str(value))
+    return int(match.group(1)) if match else None
+
+
+def rating_of(details):
+    """
+    Returns the numeric rating of stored movie details, or None.
+
+    Movie records carry the parsed rating; plain dictionaries 
+    (such as raw CSV rows) are parsed with numeric_rating.
+    """
+    if isinstance(details, dict):
+        return numeric_rating(details.get('rating'))
+    return details.rating
+
+
+def year_of(details):
+    """
+    Returns the numeric year of stored movie details, or None.
+
+    Movie records carry the parsed year; plain dictionaries 
+    (such as raw CSV rows) are parsed with numeric_year.
+    """
+    if isinstance(details, dict):
+        return numeric_year(details.get('year'))
+    return details.year
+
+
+def validate_filter(filter):
+    """
+    Checks that a query filter only uses supported keys.
+
+    Raises:
+        ValueError: If the filter contains an unknown key.
+    """
+    unknown = set(filter or {}) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unsupported filter key(s): {', '.join(sorted(unknown))}")
+
+
+def parse_order_by(order_by):
+    """
+    Splits an order_by value such as '-rating' into its field and direction.
+
+    Args:
+        order_by (str): A field from ORDER_FIELDS, optionally prefixed with '-'.
+
+    Returns:
+        tuple: (field, descending), or (None, False) if order_by is None.
+
+    Raises:
+        ValueError: If the field cannot be ordered by.
+    """
+    if order_by is None:
+        return None, False
+    descending = order_by.startswith('-')
+    field = order_by.lstrip('-')
+    if field not in ORDER_FIELDS:
+        raise ValueError(f"Cannot order movies by {field!r}")
+    return field, descending
+
+
+def matches(title, details, filter):
+    """
+    Checks whether a movie satisfies every condition of a query filter.
+
+    Movies without a numeric rating (or year) never satisfy a rating (or year) bound.
+
+    Args:
+        title (str): The title of the movie.
+        details (dict): The movie details.
+        filter (dict): The query filter, see FILTER_KEYS.
+
+    Returns:
+        bool: True if the movie matches the filter.
+    """
+    if not filter:
+        return True
+    contains = filter.get('title_contains')
+    if contains is not None and contains.lower() not in title.lower():
+        return False
+    if filter.get('min_rating') is not None or filter.get('max_rating') is not None:
+        rating = rating_of(details)
+        if rating is None:
+            return False
+        if filter.get('min_rating') is not None and rating < filter['min_rating']:
+            return False
+        if filter.get('max_rating') is not None and rating > filter['max_rating']:
+            return False
+    if filter.get('min_year') is not None or filter.get('max_year') is not None:
+        year = year_of(details)
+        if year is None:
+            return False
+        if filter.get('min_year') is not None and year < filter['min_year']:
+            return False
+        if filter.get('max_year') is not None and year > filter['max_year']:
+            return False
+    return True
+
+
+def sort_key(field):
+    """
+    Returns a key function that sorts (title, details) pairs by the given field.
+    Missing years and ratings sort below every real value.
+    """
+    if field == 'title':
+        return lambda item: item[0]
+    convert = rating_of if field == 'rating' else year_of
+
+    def key(item):
+        value = convert(item[1])
+        return MISSING if value is None else value
+    return key
+
+
+def apply_query(items, filter=None, order_by=None, limit=None, offset=0):
+    """
+    Filters, orders and paginates an iterable of (title, details) pairs.
+
+    This is the generic implementation behind IStorage.query. Filtering is lazy,
+    so an unordered query stops reading as soon as it has 'limit' rows,
+    and an ordered query with a limit keeps only the top offset + limit rows
+    in a heap instead of sorting everything.
+
+    Args:
+        items (iterable): (title, details) pairs, e.g. list_movies().items().
+        filter (dict, optional): Conditions to match, see FILTER_KEYS.
+        order_by (str, optional): Field to order by, see parse_order_by.
+        limit (int, optional): Maximum number of movies to return.
+        offset (int, optional): Number of matching movies to skip.
+
+    Returns:
+        dict: The matching movies, in order, keyed by title.
+    """
+    validate_filter(filter)
+    field, descending = parse_order_by(order_by)
+    rows = (item for item in items if matches(item[0], item[1], filter))
+    if field is not None:
+        key = sort_key(field)
+        if limit is None:
+            rows = iter(sorted(rows, key=key, reverse=descending))
+        else:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            rows = iter(select(offset + limit, rows, key=key))
+    stop = None if limit is None else offset + limit
+    return dict(itertools.islice(rows, offset, stop))
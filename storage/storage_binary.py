@@ -0,0 +1,711 @@
+import mmap
+import os
+import struct
+import zlib
+from storage.istorage import IStorage, apply_update, movie_details
+from storage.locking import atomic_write, file_lock
+from storage.movie import Movie
+from storage.normalize import TitleIndex
+from storage.query import apply_query
+
+MAGIC = b'MVBN'
+FORMAT_VERSION = 2
+
+# magic, format version, reserved, record count, hash buckets, records offset, heap offset
+HEADER = struct.Struct('<4sHHIIQQ')
+
+# One slot of the title hash index: the record number plus one, 0 for an empty slot
+SLOT = struct.Struct('<I')
+
+# title (heap offset, length), year, rating, then (heap offset, length) of
+# poster, language, country, awards, imdbID and note, then fetched_at;
+# version 1 files, which are still read, lack fetched_at
+RECORDS = {1: struct.Struct('<IIid12I'), 2: struct.Struct('<IIid12Id')}
+RECORD = RECORDS[FORMAT_VERSION]
+
+STRING_FIELDS = ('poster', 'language', 'country', 'awards', 'imdbID', 'note')
+
+NO_STRING = 0xFFFFFFFF  # The length stored for a None string
+NO_YEAR = -2 ** 31      # The year stored for a missing year
+
+
+def _title_hash(encoded_title):
+    """
+    Hashes a UTF-8 encoded title for the hash index.
+
+    CRC-32 is used rather than hash(), which differs between processes.
+    """
+    return zlib.crc32(encoded_title)
+
+
+def _bucket_count(record_count):
+    """
+    Returns the number of hash index slots for a record count: a power
+    of two at least twice the count, so linear probing stays short.
+    """
+    buckets = 8
+    while buckets < 2 * record_count:
+        buckets *= 2
+    return buckets
+
+
+def encode(movies):
+    """
+    Serializes movies into the binary file layout.
+
+    The layout is a fixed-size header, an open-addressing hash index from
+    title to record number, a table of fixed-width records and a heap of
+    UTF-8 strings. The records hold the year and rating as numbers and
+    (offset, length) references into the heap for every string; equal
+    strings, like repeated countries, are stored once.
+
+    Args:
+        movies (dict): Title -> Movie record.
+
+    Returns:
+        bytes: The file content.
+    """
+    count = len(movies)
+    buckets = _bucket_count(count)
+    index_offset = HEADER.size
+    records_offset = index_offset + buckets * SLOT.size
+    heap_offset = records_offset + count * RECORD.size
+
+    heap = bytearray()
+    offsets = {}
+
+    def add_string(value):
+        if value is None:
+            return 0, NO_STRING
+        encoded = str(value).encode('utf-8')
+        offset = offsets.get(encoded)
+        if offset is None:
+            offset = offsets[encoded] = len(heap)
+            heap.extend(encoded)
+        return offset, len(encoded)
+
+    slots = [0] * buckets
+    records = bytearray(count * RECORD.size)
+    for number, (title, details) in enumerate(movies.items()):
+        encoded_title = title.encode('utf-8')
+        slot = _title_hash(encoded_title) & (buckets - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (buckets - 1)
+        slots[slot] = number + 1
+
+        year = details.year
+        rating = details.rating
+        fields = [*add_string(title),
+                  NO_YEAR if year is None else year,
+                  float('nan') if rating is None else rating]
+        for field in STRING_FIELDS:
+            fields.extend(add_string(getattr(details, field)))
+        fields.append(float('nan') if details.fetched_at is None else details.fetched_at)
+        RECORD.pack_into(records, number * RECORD.size, *fields)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, buckets, records_offset, heap_offset)
+    index = struct.pack(f'<{buckets}I', *slots)
+    return b''.join((header, index, bytes(records), bytes(heap)))
+
+
+class StorageBinary(IStorage):
+    def __init__(self, file_path, cached=True):
+        """
+        Initializes a new instance of StorageBinary class.
+
+        The movies are stored in a compact binary file (see encode) that is
+        memory-mapped for reading. check_if_exists and get_movie hash the title,
+        probe the index and decode a single record, so they only touch the
+        few pages holding those bytes instead of parsing the whole catalog;
+        find_title and find_imdb_id use a TitleIndex built from the titles
+        and imdbIDs alone.
+        Operations that need every movie decode the file once and, like
+        StorageJson, keep the result until the file changes on disk.
+
+        Writes hold the file's lock (see storage.locking) and replace the file
+        atomically, so readers always map a complete file.
+
+        :param file_path: A string representing the path to the binary file.
+        :param cached: When True (the default), the decoded movies are kept
+        in memory and only decoded again when the file changes on disk.
+        """
+        self.file_path = file_path
+        self.cached = cached
+        self._cache = None
+        self._cache_signature = None
+        self._map = None
+        self._map_signature = None
+        self._lock = file_lock(file_path)
+        self._io = {'bytes_read': 0, 'bytes_written': 0}
+        self._index = None
+        self._index_signature = None
+
+
+    def close(self):
+        """
+        Releases the memory mapping of the file.
+        """
+        with self._lock.mutex:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self._map_signature = None
+
+
+    def _file_signature(self):
+        """
+        Returns (mtime_ns, size, inode) of the binary file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+    def _mapping(self):
+        """
+        Returns the memory mapping and header of the current file.
+
+        The file is mapped again whenever its signature changes, since writes
+        replace it with a new file. Callers hold the mutex.
+
+        Returns:
+        tuple: (mmap, header tuple), or (None, None) for a missing or empty file.
+
+        Raises:
+        ValueError: If the file is not a movie binary file.
+        """
+        signature = self._file_signature()
+        if signature != self._map_signature:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self._map_signature = signature
+            if signature is not None and signature[1] > 0:
+                with open(self.file_path, 'rb') as file:
+                    self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version = (HEADER.unpack_from(self._map)[:2]
+                                  if len(self._map) >= HEADER.size else (None, None))
+                if magic != MAGIC or version not in RECORDS:
+                    self._map.close()
+                    self._map = None
+                    self._map_signature = None
+                    raise ValueError(f"{self.file_path} is not a movie binary file "
+                                     f"(format versions {', '.join(map(str, RECORDS))})")
+        if self._map is None:
+            return None, None
+        return self._map, HEADER.unpack_from(self._map)
+
+
+    def _find_record(self, title):
+        """
+        Finds the record of a title through the hash index.
+
+        Returns:
+        int: The byte offset of the record in the file, or None if the title is not stored.
+        """
+        data, header = self._mapping()
+        if data is None:
+            return None
+        _, version, _, count, buckets, records_offset, heap_offset = header
+        record_size = RECORDS[version].size
+        self._io['bytes_read'] += HEADER.size
+        encoded_title = title.encode('utf-8')
+        slot = _title_hash(encoded_title) & (buckets - 1)
+        while True:
+            self._io['bytes_read'] += SLOT.size
+            number = SLOT.unpack_from(data, HEADER.size + slot * SLOT.size)[0]
+            if not number:
+                return None
+            record = records_offset + (number - 1) * record_size
+            offset, length = struct.unpack_from('<II', data, record)
+            self._io['bytes_read'] += 8 + length
+            start = heap_offset + offset
+            if length == len(encoded_title) and data[start:start + length] == encoded_title:
+                return record
+            slot = (slot + 1) & (buckets - 1)
+
+
+    def _decode_record(self, data, record, header):
+        """
+        Decodes the record at a byte offset into its title and Movie.
+        """
+        heap_offset = header[6]
+        fields = RECORDS[header[1]].unpack_from(data, record)
+
+        def string(offset, length):
+            if length == NO_STRING:
+                return None
+            start = heap_offset + offset
+            return data[start:start + length].decode('utf-8')
+
+        year = fields[2]
+        rating = fields[3]
+        fetched_at = fields[16] if len(fields) > 16 else None
+        return string(*fields[0:2]), Movie(None if year == NO_YEAR else year,
+                                           None if rating != rating else rating,
+                                           *(string(*fields[i:i + 2]) for i in range(4, 16, 2)),
+                                           None if fetched_at != fetched_at else fetched_at)
+
+
+    def _read_file(self):
+        """
+        Decodes every movie of the binary file.
+
+        The record table is unpacked in one pass, and each distinct heap
+        string is decoded once and shared by every record referencing it.
+
+        Returns:
+        dict: Title -> Movie record, empty if the file does not exist.
+        """
+        data, header = self._mapping()
+        if data is None:
+            return {}
+        _, version, _, count, _, records_offset, heap_offset = header
+        self._io['bytes_read'] += len(data)
+        heap = data[heap_offset:]
+        strings = {}
+
+        def string(offset, length):
+            if length == NO_STRING:
+                return None
+            value = strings.get((offset, length))
+            if value is None:
+                value = strings[(offset, length)] = heap[offset:offset + length].decode('utf-8')
+            return value
+
+        movies = {}
+        for fields in RECORDS[version].iter_unpack(data[records_offset:heap_offset]):
+            title = heap[fields[0]:fields[0] + fields[1]].decode('utf-8')
+            year = fields[2]
+            rating = fields[3]
+            fetched_at = fields[16] if version > 1 else None
+            movies[title] = Movie(None if year == NO_YEAR else year,
+                                  None if rating != rating else rating,
+                                  string(fields[4], fields[5]),
+                                  string(fields[6], fields[7]),
+                                  string(fields[8], fields[9]),
+                                  string(fields[10], fields[11]),
+                                  string(fields[12], fields[13]),
+                                  string(fields[14], fields[15]),
+                                  None if fetched_at != fetched_at else fetched_at)
+        return movies
+
+
+    def _read_keys(self):
+        """
+        Decodes the title and imdbID of every record, leaving the other fields alone.
+
+        Returns:
+        dict: Title -> {'imdbID': imdbID}, empty if the file does not exist.
+        """
+        data, header = self._mapping()
+        if data is None:
+            return {}
+        _, version, _, count, _, records_offset, heap_offset = header
+        self._io['bytes_read'] += heap_offset - records_offset
+        keys = {}
+        for fields in RECORDS[version].iter_unpack(data[records_offset:heap_offset]):
+            title_start = heap_offset + fields[0]
+            title = data[title_start:title_start + fields[1]].decode('utf-8')
+            imdb_id = None
+            if fields[13] != NO_STRING:
+                imdb_start = heap_offset + fields[12]
+                imdb_id = data[imdb_start:imdb_start + fields[13]].decode('utf-8')
+                self._io['bytes_read'] += fields[13]
+            self._io['bytes_read'] += fields[1]
+            keys[title] = {'imdbID': imdb_id}
+        return keys
+
+
+    def _title_index(self):
+        """
+        Returns the normalized title and imdbID index of the file.
+
+        The index is built on first use, from the decoded movies if they are
+        cached and otherwise from the titles and imdbIDs alone (see _read_keys),
+        and then kept up to date by the mutators for as long as nobody else
+        writes the file, so duplicate lookups are dictionary lookups.
+        Callers hold the mutex.
+        """
+        signature = self._file_signature()
+        if self._index is None or self._index_signature != signature:
+            if self._cache is not None and self._cache_signature == signature:
+                self._index = TitleIndex(self._cache)
+            else:
+                self._index = TitleIndex(self._read_keys())
+            self._index_signature = signature
+        return self._index
+
+
+    def _update_index(self, added=(), removed=()):
+        """
+        Applies committed mutations to the title index, if _save_data kept it current.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        added (iterable): (title, previous details or None, new details) tuples.
+        removed (iterable): (title, details) tuples.
+
+        Returns:
+        None
+        """
+        if self._index is None or self._index_signature != self._file_signature():
+            return
+        for title, previous, details in added:
+            self._index.replace(title, previous, details)
+        for title, details in removed:
+            self._index.remove(title, details)
+
+
+    def find_title(self, title):
+        """
+        Finds the stored title matching a title once both are normalized.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        title (str): The title to look for.
+
+        Returns:
+        str: The stored title, or None.
+        """
+        with self._lock.mutex:
+            return self._title_index().find_title(title)
+
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Finds the stored title of the movie with an imdbID.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        imdb_id (str): The IMDb ID.
+
+        Returns:
+        str: The stored title, or None.
+        """
+        with self._lock.mutex:
+            return self._title_index().find_imdb_id(imdb_id)
+
+
+    def _load_data(self):
+        """
+        Returns the movie data, served from the in-memory cache when possible.
+
+        The returned dictionary is the cache itself, so callers that hand data
+        out of the storage must copy it first. Callers hold the mutex.
+        """
+        if not self.cached:
+            return self._read_file()
+        signature = self._file_signature()
+        if self._cache is None or signature != self._cache_signature:
+            self._cache = self._read_file()
+            self._cache_signature = signature
+        return self._cache
+
+
+    def _save_data(self, data):
+        """
+        Writes the movie data to the binary file, replacing it atomically.
+        Callers hold the file lock.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        data (dict): Title -> Movie record.
+
+        Returns:
+        None
+        """
+        content = encode(data)
+        index_current = self._index is not None and self._index_signature == self._file_signature()
+        try:
+            with atomic_write(self.file_path, binary=True) as file:
+                file.write(content)
+        except Exception:
+            # The cache may already hold the unsaved change
+            self._cache = None
+            self._index = None
+            raise
+        self._io['bytes_written'] += len(content)
+        signature = self._file_signature()
+        if self.cached:
+            self._cache = data
+            self._cache_signature = signature
+        # The callers apply their changes of titles and imdbIDs with _update_index
+        self._index_signature = signature if index_current else None
+
+
+    def initialize(self):
+        """
+        Writes an empty catalog if the file does not exist or is empty.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if signature is None or signature[1] == 0:
+                self._save_data({})
+
+
+    def check_if_exists(self, title):
+        """
+        Checks if the Movie name exists in the storage.
+
+        Answered from the decoded movies if they are cached and current,
+        otherwise with a lookup in the file's hash index.
+
+        :param title: Title of the movie to check.
+        :return: True if the movie exists, False otherwise.
+        """
+        with self._lock.mutex:
+            if self._cache is not None and self._cache_signature == self._file_signature():
+                return title in self._cache
+            return self._find_record(title) is not None
+
+
+    def get_movie(self, title):
+        """
+        Returns the details of one movie, decoding only its record.
+
+        :param title: Title of the movie.
+        :return: The Movie record, or None if there is no movie with that title.
+        """
+        with self._lock.mutex:
+            if self._cache is not None and self._cache_signature == self._file_signature():
+                movie = self._cache.get(title)
+                return None if movie is None else movie.copy()
+            record = self._find_record(title)
+            if record is None:
+                return None
+            data, header = self._mapping()
+            self._io['bytes_read'] += RECORDS[header[1]].size
+            return self._decode_record(data, record, header)[1]
+
+
+    def list_movies(self):
+        """
+        Retrieves all movies stored in the binary file.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+
+        Returns:
+        dict: Title -> copy of the Movie record.
+        """
+        with self._lock.mutex:
+            return {title: movie.copy() for title, movie in self._load_data().items()}
+
+
+    def version(self):
+        """
+        Returns a token that changes whenever the binary file changes.
+
+        Returns:
+        str: The version token, built from the file signature.
+        """
+        return repr(self._file_signature())
+
+
+    def last_modified(self):
+        """
+        Returns the modification time of the binary file.
+
+        Returns:
+        float: A POSIX timestamp, or None if the file does not exist.
+        """
+        signature = self._file_signature()
+        return signature[0] / 1e9 if signature else None
+
+
+    def io_stats(self):
+        """
+        Returns the bytes read from and written to the binary file so far.
+
+        Index lookups count only the header, index slots, records and
+        title bytes they touch; reads served from the cache read nothing.
+
+        Returns:
+        dict: 'bytes_read' and 'bytes_written'.
+        """
+        return dict(self._io)
+
+
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        """
+        Returns the movies matching a filter, optionally ordered and paginated.
+
+        See IStorage.query for the meaning of the parameters.
+
+        Returns:
+        dict: The matching movies in the requested order, keyed by title.
+        """
+        with self._lock.mutex:
+            matches = apply_query(self._load_data().items(), filter, order_by, limit, offset)
+            return {title: movie.copy() for title, movie in matches.items()}
+
+
+    def add_movie(self,
+                  title,
+                  year,
+                  rating,
+                  poster,
+                  language,
+                  country,
+                  awards,
+                  imdbID,
+                  note=None,
+                  fetched_at=None):
+        """
+        Adds a new movie to the storage, replacing a movie with the same title.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        title (str): The title of the movie to be added.
+        year (int): The release year of the movie.
+        rating (float): The rating of the movie.
+        poster (str): The URL of the movie poster.
+        language (str): The language of the movie.
+        country (str): The country of the movie.
+        awards (str): The awards received by the movie.
+        imdbID (str): The unique identifier for the movie on IMDb.
+        note (str, optional): Additional notes about the movie. Defaults to None.
+        fetched_at (float, optional): When the details were fetched from OMDb. Defaults to None.
+
+        Returns:
+        None
+        """
+        with self._lock:
+            data = self._load_data()
+            previous = data.get(title)
+            data[title] = Movie(year, rating, poster, language, country, awards, imdbID, note,
+                                fetched_at)
+            self._save_data(data)
+            self._update_index(added=[(title, previous, data[title])])
+
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie from the storage based on the provided title.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        title (str): The title of the movie to be deleted.
+
+        Returns:
+        None
+        """
+        with self._lock:
+            data = self._load_data()
+            if title in data:
+                removed = data.pop(title)
+                self._save_data(data)
+                self._update_index(removed=[(title, removed)])
+
+
+    def update_movie(self,
+                     title,
+                     year=None,
+                     rating=None,
+                     language=None,
+                     country=None,
+                     awards=None,
+                     note=None,
+                     poster=None,
+                     fetched_at=None):
+        """
+        Updates the year, rating, language, country, awards, note, poster
+        and fetched_at timestamp of a movie.
+        Fields left as None keep their value.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        title (str): The title of the movie to be updated.
+
+        Returns:
+        None
+        """
+        self.update_movies([{'title': title, 'year': year, 'rating': rating, 'language': language,
+                             'country': country, 'awards': awards, 'note': note,
+                             'poster': poster, 'fetched_at': fetched_at}])
+
+
+    def add_movies(self, movies):
+        """
+        Adds several movies with a single load and a single write of the file.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        movies (iterable): Dictionaries with the keys of MOVIE_FIELDS ('note' is optional).
+
+        Returns:
+        dict: Maps each title to True if the movie was added,
+        or False if a required field is missing.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            added = []
+            for movie in movies:
+                try:
+                    details = movie_details(movie)
+                except KeyError:
+                    results[movie.get('title')] = False
+                    continue
+                added.append((movie['title'], data.get(movie['title']), details))
+                data[movie['title']] = details
+                results[movie['title']] = True
+            if added:
+                self._save_data(data)
+                self._update_index(added=added)
+            return results
+
+
+    def update_movies(self, updates):
+        """
+        Updates several movies with a single load and a single write of the file.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        updates (iterable): Dictionaries with the 'title' of the movie and
+        the new values for any of UPDATE_FIELDS.
+
+        Returns:
+        dict: Maps each title to True if the movie was updated,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            for update in updates:
+                title = update.get('title')
+                results[title] = title in data
+                if results[title]:
+                    apply_update(data[title], update)
+            if any(results.values()):
+                self._save_data(data)
+            return results
+
+
+    def delete_movies(self, titles):
+        """
+        Deletes several movies with a single load and a single write of the file.
+
+        Parameters:
+        self (StorageBinary): The instance of the StorageBinary class.
+        titles (iterable): The titles of the movies to delete.
+
+        Returns:
+        dict: Maps each title to True if the movie was deleted,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            removed = []
+            for title in titles:
+                results[title] = title in data
+                if results[title]:
+                    removed.append((title, data.pop(title)))
+            if removed:
+                self._save_data(data)
+                self._update_index(removed=removed)
+            return results
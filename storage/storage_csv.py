@@ -1,5 +1,24 @@
 import csv
-from storage.istorage import IStorage
+import os
+from storage.istorage import IStorage, apply_update, movie_details
+from storage.locking import atomic_write, file_lock
+from storage.movie import MISSING, Movie
+from storage.normalize import TitleIndex
+from storage.query import apply_query
+
+FIELDNAMES = ['title', 
+              'year', 
+              'rating', 
+              'poster', 
+              'language',  
+              'country', 
+              'awards', 
+              'imdbID',
+              'note',
+              'fetched_at']
+
+# Columns added after the first release, read as empty from older files
+ADDED_COLUMNS = ('fetched_at',)
 
 class StorageCsv(IStorage):
     def __init__(self, file_path):
@@ -7,8 +26,16 @@ class StorageCsv(IStorage):
         Initializes a new instance of StorageCsv class.
 
         :param file_path: A string representing the path to the CSV file where movie data will be stored.
+
+        Writes hold the file's lock (see storage.locking) from reading the rows 
+        to replacing the file, so concurrent writers do not lose updates.
+        Readers need no lock: the file is replaced atomically, never rewritten in place.
         """
         self.file_path = file_path
+        self._lock = file_lock(file_path)
+        self._io = {'bytes_read': 0, 'bytes_written': 0}
+        self._index = None
+        self._index_version = None
 
     
     def check_if_exists(self, title):
@@ -18,8 +45,139 @@ class StorageCsv(IStorage):
         :param title: Title of the movie to check.
         :return: True if the movie exists, False otherwise.
         """
-        data = self._load_data()
-        return title in data
+        return any(row['title'] == title for row in self._iter_rows())
+
+
+    def _title_index(self):
+        """
+        Returns the normalized title and imdbID index of the CSV file.
+
+        The index is built by streaming the raw rows once and reused until 
+        the file's version changes, e.g. after a write.
+
+        Parameters:
+        - self: The instance of the StorageCsv class.
+
+        Returns:
+        - TitleIndex: The index of the stored titles.
+        """
+        version = self.version()
+        if self._index is None or version != self._index_version:
+            self._index = TitleIndex()
+            for row in self._iter_rows():
+                self._index.add(row['title'], row)
+            self._index_version = version
+        return self._index
+
+
+    def find_title(self, title):
+        """
+        Finds the stored title matching a title once both are normalized.
+
+        :param title: Title of the movie to look for.
+        :return: The stored title, or None.
+        """
+        return self._title_index().find_title(title)
+
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Finds the stored title of the movie with an imdbID.
+
+        :param imdb_id: The IMDb ID.
+        :return: The stored title, or None.
+        """
+        return self._title_index().find_imdb_id(imdb_id)
+
+
+    def _iter_rows(self):
+        """
+        Streams the raw rows of the CSV file without converting any values.
+
+        Rows are read one at a time, so callers that stop iterating early 
+        (for example an existence check that found its title) never read 
+        the rest of the file, and memory use does not grow with the file size.
+
+        Parameters:
+        - self: The instance of the StorageCsv class.
+
+        Yields:
+        - dict: The raw CSV row, with every value as a string. Rows without a title are skipped.
+        """
+        try:
+            with open(self.file_path, mode='r', encoding='utf-8') as file:
+                try:
+                    reader = csv.DictReader(file)
+                    for row in reader:
+                        if not row.get('title'):  # Skip any empty rows
+                            continue
+                        yield row
+                finally:
+                    # What was actually read, also when the caller stopped early
+                    self._io['bytes_read'] += file.buffer.raw.tell()
+        except FileNotFoundError:
+            print(f"\nError: The file {self.file_path} was not found.")
+        except csv.Error as e:
+            print(f"\nError reading CSV file {self.file_path}: {e}")
+
+
+    @staticmethod
+    def _convert_row(row, fields=None):
+        """
+        Converts a raw CSV row into a movie details dictionary.
+
+        Parameters:
+        - row (dict): The raw CSV row.
+        - fields (iterable, optional): The detail fields to convert. 
+        Defaults to None, which converts all of them.
+
+        Returns:
+        - Movie: The movie details with year as int, rating as float 
+        (None for an empty or 'N/A' value), an empty note as None and
+        fetched_at as a float timestamp (None when empty or missing).
+        If only some fields are requested, a dict with just those fields.
+
+        Raises:
+        - KeyError: If an expected column is missing.
+        - ValueError: If the year or rating cannot be converted.
+        """
+        converters = {
+            'year': lambda value: None if value in ('', MISSING) else int(value),
+            'rating': lambda value: None if value in ('', MISSING) else float(value),
+            'note': lambda value: value if value else None,  # Convert empty string to None for consistency with other values
+            'fetched_at': lambda value: float(value) if value else None,
+        }
+
+        def value(field):
+            return row.get(field) if field in ADDED_COLUMNS else row[field]
+
+        if fields is None:
+            return Movie(*(converters.get(field, str)(value(field)) for field in FIELDNAMES[1:]))
+        return {field: converters.get(field, str)(value(field)) for field in fields}
+
+
+    def iter_movies(self, fields=None):
+        """
+        Lazily yields the movies stored in the CSV file.
+
+        Only the requested fields are converted, and rows that cannot be 
+        converted are reported and skipped, like in '_load_data'.
+
+        Parameters:
+        - self: The instance of the StorageCsv class.
+        - fields (iterable, optional): The detail fields to convert. 
+        Defaults to None, which converts all of them.
+
+        Yields:
+        - tuple: (title, details) for every valid row.
+        """
+        for row in self._iter_rows():
+            try:
+                yield row['title'], self._convert_row(row, fields)
+            except KeyError as e:
+                print(f"\nMissing expected column in row: {row}. Error: {e}")
+            except ValueError as e:
+                print(f"\nError converting data types in row: {row}. Error: {e}")
 
     
     def _load_data(self):
@@ -37,41 +195,16 @@ class StorageCsv(IStorage):
         - FileNotFoundError: If the specified file path does not exist.
         - csv.Error: If there is an error reading the CSV file.
         """
-        movies = {}
-        try:
-            with open(self.file_path, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if not row['title']:  # Skip any empty rows
-                        continue
-                    try:
-                        title = row['title']
-                        movies[title] = {
-                            'year': int(row['year']),
-                            'rating': float(row['rating']),
-                            'poster': row['poster'],
-                            'language' : row['language'], 
-                            'country' : row['country'], 
-                            'awards' : row['awards'],
-                            'imdbID' : row['imdbID'],
-                            'note': row['note'] if row['note'] else None,  # Convert empty string to None for consistency with other values
-                        }
-                    except KeyError as e:
-                        print(f"\nMissing expected column in row: {row}. Error: {e}")
-                    except ValueError as e:
-                        print(f"\nError converting data types in row: {row}. Error: {e}")
-        except FileNotFoundError:
-            print(f"\nError: The file {self.file_path} was not found.")
-        except csv.Error as e:
-            print(f"\nError reading CSV file {self.file_path}: {e}")
-
-        return movies
+        return dict(self.iter_movies())
 
     
     def _save_data(self, data):
         """
         Saves movie data to the CSV file.
 
+        The rows are written to a temporary file that then replaces the CSV file, 
+        so a crash mid-write never leaves a truncated file behind.
+
         Parameters:
         - self (StorageCsv): The instance of the StorageCsv class.
         - data (dict): A dictionary containing movie titles as keys 
@@ -84,17 +217,8 @@ class StorageCsv(IStorage):
         - csv.Error: If there is an error saving data to the CSV file. ,
         """
         try:
-            with open(self.file_path, mode='w', newline='', encoding='utf-8') as file:
-                fieldnames = ['title', 
-                              'year', 
-                              'rating', 
-                              'poster', 
-                              'language',  
-                              'country', 
-                              'awards', 
-                              'imdbID',
-                              'note']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
+            with atomic_write(self.file_path, newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
                 writer.writeheader()
                 for title, info in data.items():
                     writer.writerow({
@@ -106,8 +230,10 @@ class StorageCsv(IStorage):
                         'country' : info['country'], 
                         'awards' : info['awards'],
                         'imdbID' : info['imdbID'],  # Optional, default is empty string if not provided in CSV file
-                        'note' :'' #Optional
+                        'note' : info['note'] or '', # Optional, an empty cell reads back as None
+                        'fetched_at' : '' if info.get('fetched_at') is None else repr(info['fetched_at'])
                     })
+            self._io['bytes_written'] += os.path.getsize(self.file_path)
         except csv.Error as e:
             print(f"\nError saving data to {self.file_path}: {e}")
 
@@ -130,6 +256,81 @@ class StorageCsv(IStorage):
         """
         return self._load_data()
 
+
+    def version(self):
+        """
+        Returns a token that changes whenever the CSV file changes.
+
+        Parameters:
+        - self (StorageCsv): The instance of the StorageCsv class.
+
+        Returns:
+        - str: The version token, built from the file's mtime, size and inode.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return 'missing'
+        return f"{stat.st_mtime_ns}-{stat.st_size}-{stat.st_ino}"
+
+
+    def last_modified(self):
+        """
+        Returns the modification time of the CSV file.
+
+        Parameters:
+        - self (StorageCsv): The instance of the StorageCsv class.
+
+        Returns:
+        - float: A POSIX timestamp, or None if the file does not exist.
+        """
+        try:
+            return os.path.getmtime(self.file_path)
+        except OSError:
+            return None
+
+
+    def io_stats(self):
+        """
+        Returns the bytes read from and written to the CSV file so far.
+
+        Parameters:
+        - self (StorageCsv): The instance of the StorageCsv class.
+
+        Returns:
+        - dict: 'bytes_read' and 'bytes_written'.
+        """
+        return dict(self._io)
+
+
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        """
+        Returns the movies matching a filter, optionally ordered and paginated.
+
+        The CSV file is streamed row by row and the filter and ordering are 
+        evaluated on the raw values, converting only the year or rating 
+        they look at. Only the rows that end up in the result are fully 
+        converted, and an unordered query with a limit stops reading 
+        the file as soon as the page is complete.
+        See IStorage.query for the meaning of the parameters.
+
+        Parameters:
+        - self (StorageCsv): The instance of the StorageCsv class.
+
+        Returns:
+        - dict: The matching movies in the requested order, keyed by title.
+        """
+        rows = ((row['title'], row) for row in self._iter_rows())
+        movies = {}
+        for title, row in apply_query(rows, filter, order_by, limit, offset).items():
+            try:
+                movies[title] = self._convert_row(row)
+            except KeyError as e:
+                print(f"\nMissing expected column in row: {row}. Error: {e}")
+            except ValueError as e:
+                print(f"\nError converting data types in row: {row}. Error: {e}")
+        return movies
+
     
     def add_movie(self, 
                   title, 
@@ -140,7 +341,8 @@ class StorageCsv(IStorage):
                   country, 
                   awards, 
                   imdbID, 
-                  note=None):
+                  note=None,
+                  fetched_at=None):
         """
         Adds a new movie to the CSV file.
 
@@ -160,23 +362,24 @@ class StorageCsv(IStorage):
         - awards (str): The awards received by the movie.
         - imdbID (str): The unique identifier for the movie on IMDb.
         - note (str, optional): Additional notes about the movie. Defaults to None.
+        - fetched_at (float, optional): When the details were fetched from OMDb. Defaults to None.
 
 
         Returns:
         None 
         """
-        data = self._load_data()
-        data[title] = {
-            "year": year, 
-            "rating": rating, 
-            "poster": poster, 
-            "language" : language,  
-            "country": country, 
-            "awards": awards,
-            "imdbID": imdbID,  # Optional, default is empty string if not provided in CSV file
-            "note": note # Optional, default is empty string if not provided in CSV file
-            } 
-        self._save_data(data)
+        with self._lock:
+            data = self._load_data()
+            data[title] = Movie(year, 
+                                rating, 
+                                poster, 
+                                language, 
+                                country, 
+                                awards, 
+                                imdbID, 
+                                note,
+                                fetched_at)
+            self._save_data(data)
 
     
     def delete_movie(self, title):
@@ -194,10 +397,11 @@ class StorageCsv(IStorage):
         Returns:
         None
         """
-        data = self._load_data()
-        if title in data:
-            del data[title]
-            self._save_data(data)
+        with self._lock:
+            data = self._load_data()
+            if title in data:
+                del data[title]
+                self._save_data(data)
             
 
     def update_movie(self, 
@@ -207,9 +411,12 @@ class StorageCsv(IStorage):
                      language=None, 
                      country=None, 
                      awards=None, 
-                     note=None):
+                     note=None,
+                     poster=None,
+                     fetched_at=None):
         """
-        Updates the year, rating, language, country, awards, and note of a movie in the CSV file. 
+        Updates the year, rating, language, country, awards, note, poster and
+        fetched_at timestamp of a movie in the CSV file. 
 
         This method reads the existing movie data from the CSV file,
         checks if a movie with the given title exists, updates its specified fields if provided,
@@ -224,23 +431,113 @@ class StorageCsv(IStorage):
         - country (str, optional): The new country where the movie was produced. Defaults to None.
         - awards (str, optional): The new awards received by the movie. Defaults to None.
         - note (str, optional): The new additional notes about the movie. Defaults to None.
+        - poster (str, optional): The new URL of the poster. Defaults to None.
+        - fetched_at (float, optional): When the details were last fetched from OMDb. Defaults to None.
 
         Returns:
         None
         """
-        data = self._load_data()
-        if title in data:
-            if year is not None:
-                data[title]["year"] = year
-            if rating is not None:
-                data[title]['rating'] = rating
-            if language is not None:
-                 data[title]["language"] = language
-            if country is not None:
-                data[title]['country'] = country
-            if awards is not None:
-                data[title]['awards'] = awards
-            if note is not None:
-                data[title]['note'] = note
-            self._save_data(data)
-            
+        with self._lock:
+            data = self._load_data()
+            if title in data:
+                if year is not None:
+                    data[title]["year"] = year
+                if rating is not None:
+                    data[title]['rating'] = rating
+                if language is not None:
+                     data[title]["language"] = language
+                if country is not None:
+                    data[title]['country'] = country
+                if awards is not None:
+                    data[title]['awards'] = awards
+                if note is not None:
+                    data[title]['note'] = note
+                if poster is not None:
+                    data[title]['poster'] = poster
+                if fetched_at is not None:
+                    data[title]['fetched_at'] = fetched_at
+                self._save_data(data)
+
+
+    def add_movies(self, movies):
+        """
+        Adds several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageCsv): The instance of the StorageCsv class.
+        movies (iterable): Dictionaries with the keys 'title', 'year', 'rating', 
+        'poster', 'language', 'country', 'awards', 'imdbID' and optionally 'note'.
+
+        Returns:
+        dict: Maps each title to True if the movie was added,
+        or False if a required field is missing.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            changed = False
+            for movie in movies:
+                try:
+                    data[movie['title']] = movie_details(movie)
+                except KeyError:
+                    results[movie.get('title')] = False
+                    continue
+                results[movie['title']] = True
+                changed = True
+            if changed:
+                self._save_data(data)
+            return results
+
+
+    def update_movies(self, updates):
+        """
+        Updates several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageCsv): The instance of the StorageCsv class.
+        updates (iterable): Dictionaries with the 'title' of the movie and the new 
+        values for any of UPDATE_FIELDS.
+
+        Returns:
+        dict: Maps each title to True if the movie was updated,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            changed = False
+            for update in updates:
+                title = update.get('title')
+                results[title] = title in data
+                if results[title]:
+                    apply_update(data[title], update)
+                    changed = True
+            if changed:
+                self._save_data(data)
+            return results
+
+
+    def delete_movies(self, titles):
+        """
+        Deletes several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageCsv): The instance of the StorageCsv class.
+        titles (iterable): The titles of the movies to delete.
+
+        Returns:
+        dict: Maps each title to True if the movie was deleted,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            changed = False
+            for title in titles:
+                results[title] = title in data
+                if results[title]:
+                    del data[title]
+                    changed = True
+            if changed:
+                self._save_data(data)
+            return results
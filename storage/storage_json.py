@@ -1,16 +1,51 @@
 import json
 import os
-from storage.istorage import IStorage
+from storage.istorage import IStorage, apply_update, movie_details
+from storage.locking import atomic_write, file_lock
+from storage.movie import Movie
+from storage.normalize import TitleIndex
+from storage.query import apply_query
+
+JOURNAL_SUFFIX = '.journal'
+
 
 class StorageJson(IStorage):
-    def __init__(self, file_path):
+    def __init__(self, 
+                 file_path, 
+                 cached=True, 
+                 journal=False, 
+                 journal_max_records=1000, 
+                 journal_max_bytes=1024 * 1024):
         """
         Initializes a new instance of StorageJson class.
 
         :param file_path: A string representing the path to 
         the JSON file where the movie data will be stored.
+        :param cached: When True (the default), the parsed file is kept in memory
+        and only re-read when the file changes on disk.
+        :param journal: When True, mutations are appended as single lines to
+        '<file_path>.journal' instead of rewriting the whole JSON file.
+        :param journal_max_records: Number of journal records after which 
+        the journal is compacted into a fresh snapshot.
+        :param journal_max_bytes: Journal size in bytes after which 
+        the journal is compacted into a fresh snapshot.
+
+        Every read-modify-write cycle holds the file's lock (see storage.locking), 
+        so threads and processes sharing the file do not lose each other's updates.
         """
         self.file_path = file_path
+        self.journal_path = file_path + JOURNAL_SUFFIX
+        self.cached = cached
+        self.journal = journal
+        self.journal_max_records = journal_max_records
+        self.journal_max_bytes = journal_max_bytes
+        self._cache = None
+        self._cache_signature = None
+        self._journal_records = 0
+        self._lock = file_lock(file_path)
+        self._io = {'bytes_read': 0, 'bytes_written': 0}
+        self._index = None
+        self._index_data = None
         
     
     def check_if_exists(self, title):
@@ -20,43 +55,206 @@ class StorageJson(IStorage):
         :param title: Title of the movie to check.
         :return: True if the movie exists, False otherwise.
         """
-        data = self._load_data()
-        return title in data
+        with self._lock.mutex:
+            return title in self._load_data()
+
+
+    def _file_signature(self):
+        """
+        Returns a tuple identifying the current on-disk version of the JSON file.
+
+        The signature combines the modification time, size and inode of the file
+        and of its journal, so an external edit or a replaced file 
+        invalidates the in-memory cache.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        tuple: (mtime_ns, size, inode) for the data file and for the journal,
+        with None in place of a file that does not exist.
+        """
+        return (self._stat_signature(self.file_path), 
+                self._stat_signature(self.journal_path))
+
+
+    @staticmethod
+    def _stat_signature(path):
+        """
+        Returns (mtime_ns, size, inode) for the given path, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
 
     
+    def _title_index(self):
+        """
+        Returns the normalized title and imdbID index of the loaded data.
+
+        The index is built on first use and then kept up to date by the
+        mutators for as long as the same data stays cached, so duplicate
+        lookups are dictionary lookups. Callers hold the mutex.
+        """
+        data = self._load_data()
+        if self._index is None or self._index_data is not data:
+            self._index = TitleIndex(data)
+            self._index_data = data
+        return self._index
+
+
+    def _update_index(self, data, added=(), removed=()):
+        """
+        Applies committed mutations of the cached data to the title index.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        data (dict): The data the mutations were committed from.
+        added (iterable): (title, previous details or None, new details) tuples.
+        removed (iterable): (title, details) tuples.
+
+        Returns:
+        None
+        """
+        if self._index is None or self._index_data is not data or self._cache is not data:
+            return
+        for title, previous, details in added:
+            self._index.replace(title, previous, details)
+        for title, details in removed:
+            self._index.remove(title, details)
+
+
+    def find_title(self, title):
+        """
+        Finds the stored title matching a title once both are normalized.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        title (str): The title to look for.
+
+        Returns:
+        str: The stored title, or None.
+        """
+        with self._lock.mutex:
+            return self._title_index().find_title(title)
+
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Finds the stored title of the movie with an imdbID.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        imdb_id (str): The IMDb ID.
+
+        Returns:
+        str: The stored title, or None.
+        """
+        with self._lock.mutex:
+            return self._title_index().find_imdb_id(imdb_id)
+
+
     def _load_data(self):
+        """
+        Returns the movie data, served from the in-memory cache when possible.
+
+        In cached mode the JSON file (and its journal) is parsed only when its 
+        signature (mtime, size, inode) differs from the one recorded 
+        at the last load or save.
+        The returned dictionary is the cache itself, so callers that hand data
+        out of the storage must copy it first.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        dict: A dictionary containing the movie data.
+        """
+        if not self.cached:
+            return self._read_file()
+        signature = self._file_signature()
+        if self._cache is None or signature != self._cache_signature:
+            self._cache = self._read_file()
+            self._cache_signature = signature
+        return self._cache
+
+
+    def _read_file(self):
         """
         Loads data from the JSON file specified by the file_path attribute.
 
         This method attempts to open the JSON file at the specified path 
         and load its contents into a Python dictionary.
         If the file does not exist or cannot be opened, an empty dictionary is returned.
+        Any mutations recorded in the journal are replayed on top of the snapshot.
 
         Parameters:
         self (StorageJson): The instance of the StorageJson class.
 
         Returns:
-        dict: A dictionary containing the loaded movie data. 
+        dict: A dictionary mapping the titles to their Movie records. 
         If the file does not exist or cannot be opened, an empty dictionary is returned.
         """
         if os.path.exists(self.file_path):
             try:
                 with open(self.file_path, "r") as file:
-                    data = json.load(file)
+                    data = {title: Movie.from_dict(details) 
+                            for title, details in json.load(file).items()}
+                    self._io['bytes_read'] += os.fstat(file.fileno()).st_size
             except (FileNotFoundError, json.JSONDecodeError):
                 data = {}
         else:
             data = {} ## Return an empty dictionary if file does not exist
+        self._journal_records = self._replay_journal(data)
         return data
 
+
+    def _replay_journal(self, data):
+        """
+        Applies the mutations recorded in the journal file to the given data.
+
+        Each journal line is a JSON object: {"op": "put", "title": ..., "movie": {...}}
+        stores a complete movie record and {"op": "delete", "title": ...} removes one.
+        A line that cannot be parsed (for example a write torn by a crash) 
+        is skipped; every record carries the complete movie, so later lines
+        do not depend on it.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        data (dict): The snapshot data to apply the journal to, modified in place.
+
+        Returns:
+        int: The number of journal records that were applied.
+        """
+        applied = 0
+        try:
+            with open(self.journal_path, "r") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("op") == "put":
+                        data[entry["title"]] = Movie.from_dict(entry["movie"])
+                    elif entry.get("op") == "delete":
+                        data.pop(entry["title"], None)
+                    applied += 1
+                self._io['bytes_read'] += os.fstat(file.fileno()).st_size
+        except FileNotFoundError:
+            pass
+        return applied
+
     
     def _save_data(self, data):
         """
         Saves the provided movie data to the JSON file specified by the file_path attribute.
 
-        This method attempts to open the JSON file at the specified path 
-        and write the provided movie data 
-        into it in a formatted manner. If the file does not exist, it will be created.
+        The data is written to a temporary file that then replaces the JSON file, 
+        so a crash mid-write never leaves a truncated file behind. 
+        If the file does not exist, it will be created.
+        Callers hold the file lock.
 
         Parameters:
         self (StorageJson): The instance of the StorageJson class.
@@ -68,10 +266,113 @@ class StorageJson(IStorage):
         Returns:
         None
         """
-        with open(self.file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+        try:
+            with atomic_write(self.file_path) as file:
+                json.dump(data, file, indent=4, default=dict)  # Movie records are written as objects
+            self._io['bytes_written'] += os.path.getsize(self.file_path)
+            # The snapshot now holds everything the journal recorded.
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        except Exception:
+            # The cache may already hold the unsaved change; drop it so the
+            # next read goes back to whatever actually reached the disk.
+            self._cache = None
+            raise
+        self._journal_records = 0
+        if self.cached:
+            self._cache = data
+            self._cache_signature = self._file_signature()
+
+
+    def _append_journal(self, data, entries):
+        """
+        Appends mutation records to the journal file instead of rewriting the snapshot.
+
+        The journal is compacted into a fresh snapshot through '_save_data' 
+        once it holds more than 'journal_max_records' records or grows beyond
+        'journal_max_bytes' bytes.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        data (dict): The complete movie data, already containing the mutations.
+        entries (list): The journal records describing the mutations.
+
+        Returns:
+        None
+        """
+        lines = ''.join(json.dumps(entry, default=dict) + '\n' for entry in entries)
+        try:
+            with open(self.journal_path, 'a+b') as file:
+                # Start on a fresh line if a previous append was torn mid-record.
+                if file.tell() > 0:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b'\n':
+                        lines = '\n' + lines
+                encoded = lines.encode('utf-8')
+                file.write(encoded)
+                file.flush()
+                os.fsync(file.fileno())
+        except Exception:
+            self._cache = None
+            raise
+        self._io['bytes_written'] += len(encoded)
+        self._journal_records += len(entries)
+        if (self._journal_records > self.journal_max_records 
+                or os.path.getsize(self.journal_path) > self.journal_max_bytes):
+            self._save_data(data)
+        elif self.cached:
+            self._cache = data
+            self._cache_signature = self._file_signature()
+
+
+    def _commit(self, data, entries):
+        """
+        Persists mutated data, either as journal records or as a full snapshot.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        data (dict): The complete movie data, already containing the mutations.
+        entries (list): The journal records describing the mutations.
+
+        Returns:
+        None
+        """
+        if self.journal:
+            self._append_journal(data, entries)
+        else:
+            self._save_data(data)
+
+
+    def compact(self):
+        """
+        Folds the journal into a fresh snapshot of the JSON file.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        None
+        """
+        with self._lock:
+            self._save_data(self._load_data())
 
     
+    def get_movie(self, title):
+        """
+        Returns a copy of the details of one movie from the cached data.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        title (str): The title of the movie.
+
+        Returns:
+        Movie: The movie details, or None if there is no movie with that title.
+        """
+        with self._lock.mutex:
+            movie = self._load_data().get(title)
+            return None if movie is None else movie.copy()
+
+
     def list_movies(self):
         """
         Retrieves a list of all movies stored in the JSON file.
@@ -86,10 +387,71 @@ class StorageJson(IStorage):
         Returns:
         dict: A dictionary containing the loaded movie data. 
         The keys of the dictionary are the movie titles,
-        and the values are dictionaries containing 
-        the movie details (year, rating, poster).
+        and the values are copies of the cached Movie records,
+        so later updates and the caller's changes stay apart.
+        """
+        with self._lock.mutex:
+            return {title: movie.copy() for title, movie in self._load_data().items()}
+
+
+    def version(self):
+        """
+        Returns a token that changes whenever the JSON file or its journal changes.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        str: The version token, built from the file signatures.
+        """
+        return repr(self._file_signature())
+
+
+    def last_modified(self):
+        """
+        Returns the modification time of the JSON file or its journal, whichever is newer.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        float: A POSIX timestamp, or None if neither file exists.
+        """
+        times = [signature[0] / 1e9 for signature in self._file_signature() if signature]
+        return max(times) if times else None
+
+
+    def io_stats(self):
+        """
+        Returns the bytes read from and written to the JSON file and its journal so far.
+
+        Reads served from the in-memory cache read nothing.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        dict: 'bytes_read' and 'bytes_written'.
+        """
+        return dict(self._io)
+
+
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        """
+        Returns the movies matching a filter, optionally ordered and paginated.
+
+        Works directly on the loaded (cached) data and copies only the matching records.
+        See IStorage.query for the meaning of the parameters.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+
+        Returns:
+        dict: The matching movies in the requested order, keyed by title.
         """
-        return self._load_data()
+        with self._lock.mutex:
+            matches = apply_query(self._load_data().items(), filter, order_by, limit, offset)
+            return {title: movie.copy() for title, movie in matches.items()}
 
     
     def add_movie(self, 
@@ -101,7 +463,8 @@ class StorageJson(IStorage):
                   country, 
                   awards, 
                   imdbID, 
-                  note=None):
+                  note=None,
+                  fetched_at=None):
         """
         Adds a new movie to the storage.
 
@@ -110,7 +473,7 @@ class StorageJson(IStorage):
         and adds them to the storage. The movie data is stored in a dictionary,
         where the movie title is the key and the movie details 
         (year, rating, poster, language, country, awards, imdbID, note)
-        are stored as a nested dictionary.
+        are stored as a Movie record.
 
         Parameters:
         self (StorageJson): The instance of the StorageJson class.
@@ -123,22 +486,25 @@ class StorageJson(IStorage):
         awards (str): The awards received by the movie.
         imdbID (str): The unique identifier for the movie on IMDb.
         note (str, optional): Additional notes about the movie. Defaults to None.
+        fetched_at (float, optional): When the details were fetched from OMDb. Defaults to None.
 
         Returns:
         None
         """
-        data = self._load_data()
-        data[title] = {
-            "year": year, 
-            "rating": rating, 
-            "poster": poster, 
-            "language" : language, 
-            "country": country, 
-            "awards": awards,
-            "imdbID": imdbID, 
-            "note": note # Optional, default is empty string if not provided in file
-        }
-        self._save_data(data)
+        with self._lock:
+            data = self._load_data()
+            previous = data.get(title)
+            data[title] = Movie(year, 
+                                rating, 
+                                poster, 
+                                language, 
+                                country, 
+                                awards, 
+                                imdbID, 
+                                note,
+                                fetched_at)
+            self._commit(data, [{"op": "put", "title": title, "movie": data[title]}])
+            self._update_index(data, added=[(title, previous, data[title])])
 
     
     def delete_movie(self, title):
@@ -158,10 +524,12 @@ class StorageJson(IStorage):
         Returns:
         None
         """
-        data = self._load_data()
-        if title in data:
-            del data[title]
-            self._save_data(data)
+        with self._lock:
+            data = self._load_data()
+            if title in data:
+                removed = data.pop(title)
+                self._commit(data, [{"op": "delete", "title": title}])
+                self._update_index(data, removed=[(title, removed)])
 
     
     def update_movie(self, 
@@ -171,10 +539,12 @@ class StorageJson(IStorage):
                      language=None,  
                      country=None, 
                      awards=None, 
-                     note=None):
+                     note=None,
+                     poster=None,
+                     fetched_at=None):
         """  
-        Updates the year, rating, language, country, awards, 
-        and note of a movie in the storage based on the provided title. 
+        Updates the year, rating, language, country, awards, note, poster
+        and fetched_at timestamp of a movie in the storage based on the provided title. 
 
         This method retrieves the current movie data from the JSON file using 
         the '_load_data' method.
@@ -191,22 +561,119 @@ class StorageJson(IStorage):
         country (str): The new country of the movie.
         awards (str): The new awards of the movie.
         note (str): The new note of the movie.
+        poster (str): The new URL of the poster.
+        fetched_at (float): When the details were last fetched from OMDb.
 
         Returns:
         None
         """
-        data = self._load_data()
-        if title in data:
-            if year is not None:
-                data[title]["year"] = year
-            if rating is not None:
-                data[title]['rating'] = rating
-            if language is not None:
-                 data[title]["language"] = language
-            if country is not None:
-                data[title]['country'] = country
-            if awards is not None:
-                data[title]['awards'] = awards
-            if note is not None:
-                data[title]['note'] = note
-            self._save_data(data)
\ No newline at end of file
+        with self._lock:
+            data = self._load_data()
+            if title in data:
+                if year is not None:
+                    data[title]["year"] = year
+                if rating is not None:
+                    data[title]['rating'] = rating
+                if language is not None:
+                     data[title]["language"] = language
+                if country is not None:
+                    data[title]['country'] = country
+                if awards is not None:
+                    data[title]['awards'] = awards
+                if note is not None:
+                    data[title]['note'] = note
+                if poster is not None:
+                    data[title]['poster'] = poster
+                if fetched_at is not None:
+                    data[title]['fetched_at'] = fetched_at
+                self._commit(data, [{"op": "put", "title": title, "movie": data[title]}])
+
+
+    def add_movies(self, movies):
+        """
+        Adds several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        movies (iterable): Dictionaries with the keys 'title', 'year', 'rating', 
+        'poster', 'language', 'country', 'awards', 'imdbID' and optionally 'note'.
+
+        Returns:
+        dict: Maps each title to True if the movie was added,
+        or False if a required field is missing.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            entries = []
+            added = []
+            for movie in movies:
+                try:
+                    details = movie_details(movie)
+                except KeyError:
+                    results[movie.get('title')] = False
+                    continue
+                added.append((movie['title'], data.get(movie['title']), details))
+                data[movie['title']] = details
+                entries.append({"op": "put", "title": movie['title'], "movie": details})
+                results[movie['title']] = True
+            if entries:
+                self._commit(data, entries)
+                self._update_index(data, added=added)
+            return results
+
+
+    def update_movies(self, updates):
+        """
+        Updates several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        updates (iterable): Dictionaries with the 'title' of the movie and the new 
+        values for any of UPDATE_FIELDS.
+
+        Returns:
+        dict: Maps each title to True if the movie was updated,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            entries = []
+            for update in updates:
+                title = update.get('title')
+                results[title] = title in data
+                if results[title]:
+                    apply_update(data[title], update)
+                    entries.append({"op": "put", "title": title, "movie": data[title]})
+            if entries:
+                self._commit(data, entries)
+            return results
+
+
+    def delete_movies(self, titles):
+        """
+        Deletes several movies with a single load and a single write of the data.
+
+        Parameters:
+        self (StorageJson): The instance of the StorageJson class.
+        titles (iterable): The titles of the movies to delete.
+
+        Returns:
+        dict: Maps each title to True if the movie was deleted,
+        or False if it does not exist.
+        """
+        with self._lock:
+            data = self._load_data()
+            results = {}
+            entries = []
+            removed = []
+            for title in titles:
+                results[title] = title in data
+                if results[title]:
+                    removed.append((title, data.pop(title)))
+                    entries.append({"op": "delete", "title": title})
+            if entries:
+                self._commit(data, entries)
+                self._update_index(data, removed=removed)
+            return results
@@ -0,0 +1,523 @@
+import sqlite3
+import threading
+from storage.istorage import IStorage, UPDATE_FIELDS, movie_details
+from storage.movie import Movie
+from storage.normalize import normalize_title
+from storage.query import numeric_rating, numeric_year, parse_order_by, validate_filter
+
+COLUMNS = ['title',
+           'year',
+           'rating',
+           'poster',
+           'language',
+           'country',
+           'awards',
+           'imdbID',
+           'note',
+           'fetched_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    year INTEGER,
+    rating REAL,
+    poster TEXT,
+    language TEXT,
+    country TEXT,
+    awards TEXT,
+    imdbID TEXT,
+    note TEXT,
+    title_norm TEXT,
+    fetched_at REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_movies_title ON movies (title);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_movies_imdb_id ON movies (imdbID);
+CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year);
+CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating);
+
+-- A single row counting changes to the movies table, kept up to date by triggers
+-- so writes from any connection or process move the version forward.
+CREATE TABLE IF NOT EXISTS meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    modified REAL NOT NULL
+);
+INSERT OR IGNORE INTO meta (id, version, modified)
+    VALUES (1, 0, (julianday('now') - 2440587.5) * 86400.0);
+CREATE TRIGGER IF NOT EXISTS movies_version_insert AFTER INSERT ON movies BEGIN
+    UPDATE meta SET version = version + 1,
+                    modified = (julianday('now') - 2440587.5) * 86400.0;
+END;
+CREATE TRIGGER IF NOT EXISTS movies_version_update AFTER UPDATE ON movies BEGIN
+    UPDATE meta SET version = version + 1,
+                    modified = (julianday('now') - 2440587.5) * 86400.0;
+END;
+CREATE TRIGGER IF NOT EXISTS movies_version_delete AFTER DELETE ON movies BEGIN
+    UPDATE meta SET version = version + 1,
+                    modified = (julianday('now') - 2440587.5) * 86400.0;
+END;
+"""
+
+# Columns added after the first release; older databases get them on open
+ADDED_COLUMNS = {'title_norm': 'TEXT', 'fetched_at': 'REAL'}
+
+ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_movies_title_norm ON movies (title_norm);
+CREATE INDEX IF NOT EXISTS idx_movies_fetched_at ON movies (fetched_at);
+"""
+
+# A movie with the same title is overwritten; one with the imdbID of another title is
+# refused by the unique index, instead of REPLACE silently deleting that other movie
+INSERT_SQL = (f"INSERT INTO movies ({', '.join(COLUMNS)}, title_norm) "
+              f"VALUES ({', '.join('?' for _ in COLUMNS)}, ?) "
+              f"ON CONFLICT (title) DO UPDATE SET "
+              + ', '.join(f"{column} = excluded.{column}" for column in COLUMNS[1:] + ['title_norm']))
+
+class StorageSqlite(IStorage):
+    def __init__(self, file_path):
+        """
+        Initializes a new instance of StorageSqlite class.
+
+        Opens (or creates) the SQLite database and makes sure the movies table
+        and its indexes exist. Titles and imdbIDs are unique,
+        year and rating are indexed for filtering and sorting, and the
+        normalized title (see storage.normalize) for duplicate detection.
+
+        The connection may be used from several threads, e.g. by a background
+        RefreshScheduler; every statement and transaction holds a lock.
+
+        :param file_path: A string representing the path to the SQLite database file.
+        """
+        self.file_path = file_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+
+    def _migrate(self):
+        """
+        Adds the ADDED_COLUMNS to databases created without them, fills in
+        title_norm, and creates the indexes on the added columns.
+        """
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(movies)")]
+        with self._conn:
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE movies ADD COLUMN {column} {column_type}")
+            if 'title_norm' not in columns:
+                titles = [row[0] for row in self._conn.execute("SELECT title FROM movies")]
+                self._conn.executemany("UPDATE movies SET title_norm = ? WHERE title = ?",
+                                       [(normalize_title(title), title) for title in titles])
+        self._conn.executescript(ADDED_INDEXES)
+
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+    def _fetch(self, sql, params=()):
+        """
+        Runs one statement under the connection lock and returns all its rows.
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+    @staticmethod
+    def _row_to_details(row):
+        """
+        Converts a database row (without the title) into the Movie record
+        used by the other storage backends. NULL years and ratings stay None
+        and read as 'N/A' through the record's mapping interface.
+        """
+        year, rating, poster, language, country, awards, imdb_id, note, fetched_at = row
+        return Movie(year, rating, poster, language, country, awards, imdb_id or "", note,
+                     fetched_at)
+
+
+    def check_if_exists(self, title):
+        """
+        Checks if the Movie name exists in the database.
+
+        This is a point lookup on the unique title index.
+
+        :param title: Title of the movie to check.
+        :return: True if the movie exists, False otherwise.
+        """
+        return bool(self._fetch("SELECT 1 FROM movies WHERE title = ?", (title,)))
+
+
+    def get_movie(self, title):
+        """
+        Returns the details of one movie, a point lookup on the unique title index.
+
+        :param title: Title of the movie.
+        :return: The Movie record, or None if there is no movie with that title.
+        """
+        rows = self._fetch(f"SELECT {', '.join(COLUMNS[1:])} FROM movies WHERE title = ?", (title,))
+        return self._row_to_details(rows[0]) if rows else None
+
+
+    def find_title(self, title):
+        """
+        Finds the stored title matching a title once both are normalized,
+        a lookup on the normalized title index.
+
+        :param title: Title of the movie to look for.
+        :return: The stored title, or None.
+        """
+        rows = self._fetch("SELECT title FROM movies WHERE title_norm = ? ORDER BY id LIMIT 1",
+                           (normalize_title(title),))
+        return rows[0][0] if rows else None
+
+
+    def find_imdb_id(self, imdb_id):
+        """
+        Finds the stored title of the movie with an imdbID, a point lookup on the unique imdbID index.
+
+        :param imdb_id: The IMDb ID.
+        :return: The stored title, or None.
+        """
+        if not imdb_id:
+            return None
+        rows = self._fetch("SELECT title FROM movies WHERE imdbID = ?", (imdb_id,))
+        return rows[0][0] if rows else None
+
+
+    def list_movies(self):
+        """
+        Retrieves all movies stored in the database.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+
+        Returns:
+        dict: A dictionary containing movie titles as keys and
+        their respective details (year, rating, poster, language,
+        country, awards, imdbID, note, fetched_at) as values.
+        """
+        rows = self._fetch(f"SELECT {', '.join(COLUMNS)} FROM movies ORDER BY id")
+        return {row[0]: self._row_to_details(row[1:]) for row in rows}
+
+
+    def stale_movies(self, limit):
+        """
+        Returns the movies fetched from OMDb the longest time ago, read in order
+        from the fetched_at index. NULLs sort first, so movies without 
+        a timestamp come first.
+
+        :param limit: The maximum number of movies to return.
+        :return: (title, details) pairs, the stalest first.
+        """
+        rows = self._fetch(f"SELECT {', '.join(COLUMNS)} FROM movies "
+                           f"ORDER BY fetched_at, id LIMIT ?", (limit,))
+        return [(row[0], self._row_to_details(row[1:])) for row in rows]
+
+
+    def version(self):
+        """
+        Returns a token that changes whenever the movies table changes.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+
+        Returns:
+        str: The change counter maintained by the triggers on the movies table.
+        """
+        return str(self._fetch("SELECT version FROM meta")[0][0])
+
+
+    def last_modified(self):
+        """
+        Returns the time of the last change to the movies table.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+
+        Returns:
+        float: A POSIX timestamp.
+        """
+        return self._fetch("SELECT modified FROM meta")[0][0]
+
+
+    def query(self, filter=None, order_by=None, limit=None, offset=0):
+        """
+        Returns the movies matching a filter, optionally ordered and paginated.
+
+        The filter, ordering and pagination are translated into a single SQL 
+        statement, so rating and year conditions and orderings use their indexes
+        and only the requested page of rows is read.
+        See IStorage.query for the meaning of the parameters.
+        Note that SQLite only folds ASCII letters for 'title_contains'.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+
+        Returns:
+        dict: The matching movies in the requested order, keyed by title.
+        """
+        validate_filter(filter)
+        field, descending = parse_order_by(order_by)
+        filter = filter or {}
+        conditions = []
+        params = []
+        if filter.get('title_contains') is not None:
+            escaped = (filter['title_contains'].replace('\\', '\\\\')
+                       .replace('%', '\\%').replace('_', '\\_'))
+            conditions.append("title LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        for key, column, operator in (('min_rating', 'rating', '>='),
+                                      ('max_rating', 'rating', '<='),
+                                      ('min_year', 'year', '>='),
+                                      ('max_year', 'year', '<=')):
+            if filter.get(key) is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(filter[key])
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM movies"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if field is not None:
+            # NULLs sort lowest, like missing values in the generic implementation;
+            # the id keeps ties in insertion order.
+            sql += f" ORDER BY {field} {'DESC' if descending else 'ASC'}, id"
+        else:
+            sql += " ORDER BY id"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        return {row[0]: self._row_to_details(row[1:]) for row in self._fetch(sql, params)}
+
+
+    def add_movie(self,
+                  title,
+                  year,
+                  rating,
+                  poster,
+                  language,
+                  country,
+                  awards,
+                  imdbID,
+                  note=None,
+                  fetched_at=None):
+        """
+        Adds a new movie to the database.
+
+        An existing movie with the same title is replaced, mirroring the
+        overwrite behaviour of the file based storages. Callers check for
+        another title with the same imdbID first (see find_imdb_id); the
+        database refuses to store it twice.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        title (str): The title of the movie to be added.
+        year (int): The release year of the movie.
+        rating (float): The rating of the movie.
+        poster (str): The URL of the movie poster.
+        language (str): The language of the movie.
+        country (str): The country where the movie was produced.
+        awards (str): The awards received by the movie.
+        imdbID (str): The unique identifier for the movie on IMDb.
+        note (str, optional): Additional notes about the movie. Defaults to None.
+        fetched_at (float, optional): When the details were fetched from OMDb. Defaults to None.
+
+        Returns:
+        None
+
+        Raises:
+        ValueError: If another movie already has the imdbID.
+        """
+        with self._lock, self._conn:
+            self._insert(self._movie_row(title, year, rating, poster, language, country,
+                                         awards, imdbID, note, fetched_at))
+
+
+    def _insert(self, row):
+        """
+        Runs INSERT_SQL for a row built by _movie_row.
+        The caller holds the lock and is responsible for the transaction.
+
+        Raises:
+        ValueError: If another movie already has the imdbID of the row.
+        sqlite3.IntegrityError: If the row breaks another constraint.
+        """
+        try:
+            self._conn.execute(INSERT_SQL, row)
+        except sqlite3.IntegrityError:
+            imdb_id = row[COLUMNS.index('imdbID')]
+            existing = self.find_imdb_id(imdb_id)
+            if existing is None:
+                raise  # Another constraint, such as a missing title
+            raise ValueError(f"Movie {existing} already has the imdbID {imdb_id}") from None
+
+
+    @staticmethod
+    def _movie_row(title, year, rating, poster, language, country, awards, imdbID, note=None,
+                   fetched_at=None):
+        """
+        Builds the parameters of INSERT_SQL for a movie, storing missing years 
+        and ratings as NULL so they stay out of the way of the indexes,
+        and the normalized title last.
+        """
+        return (title,
+                numeric_year(year),
+                numeric_rating(rating),
+                poster,
+                language,
+                country,
+                awards,
+                imdbID or None,  # Empty IDs are stored as NULL so they don't collide
+                note,
+                fetched_at,
+                normalize_title(title))
+
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie from the database based on the given title.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        title (str): The title of the movie to be deleted.
+
+        Returns:
+        None
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM movies WHERE title = ?", (title,))
+
+
+    def update_movie(self,
+                     title,
+                     year=None,
+                     rating=None,
+                     language=None,
+                     country=None,
+                     awards=None,
+                     note=None,
+                     poster=None,
+                     fetched_at=None):
+        """
+        Updates the year, rating, language, country, awards, note, poster and
+        fetched_at timestamp of a movie in the database. Only the fields that
+        are provided are changed.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        title (str): The title of the movie to be updated.
+        year (int, optional): The new release year of the movie. Defaults to None.
+        rating (float, optional): The new rating of the movie. Defaults to None.
+        language (str, optional): The new language of the movie. Defaults to None.
+        country (str, optional): The new country where the movie was produced. Defaults to None.
+        awards (str, optional): The new awards received by the movie. Defaults to None.
+        note (str, optional): The new additional notes about the movie. Defaults to None.
+        poster (str, optional): The new URL of the poster. Defaults to None.
+        fetched_at (float, optional): When the details were last fetched from OMDb. Defaults to None.
+
+        Returns:
+        None
+        """
+        with self._lock, self._conn:
+            self._update(title, {'year': year, 
+                                 'rating': rating, 
+                                 'language': language, 
+                                 'country': country, 
+                                 'awards': awards, 
+                                 'note': note,
+                                 'poster': poster,
+                                 'fetched_at': fetched_at})
+
+
+    def _update(self, title, update):
+        """
+        Runs the UPDATE statement for the non-None fields of an update dictionary.
+        The caller holds the lock and is responsible for the transaction.
+
+        Returns:
+        bool: True if a movie with the given title exists.
+        """
+        changes = {field: update[field] for field in UPDATE_FIELDS 
+                   if update.get(field) is not None}
+        if 'year' in changes:
+            changes['year'] = numeric_year(changes['year'])
+        if 'rating' in changes:
+            changes['rating'] = numeric_rating(changes['rating'])
+        if not changes:
+            return self.check_if_exists(title)
+        assignments = ', '.join(f"{column} = ?" for column in changes)
+        cursor = self._conn.execute(f"UPDATE movies SET {assignments} WHERE title = ?",
+                                    (*changes.values(), title))
+        return cursor.rowcount > 0
+
+
+    def add_movies(self, movies):
+        """
+        Adds several movies in a single transaction.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        movies (iterable): Dictionaries with the keys 'title', 'year', 'rating', 
+        'poster', 'language', 'country', 'awards', 'imdbID' and optionally 'note'.
+
+        Returns:
+        dict: Maps each title to True if the movie was added, or False if a
+        required field is missing or another movie already has its imdbID.
+        """
+        results = {}
+        with self._lock, self._conn:
+            for movie in movies:
+                try:
+                    self._insert(self._movie_row(movie['title'], **movie_details(movie)))
+                except (KeyError, ValueError):
+                    results[movie.get('title')] = False
+                    continue
+                results[movie['title']] = True
+        return results
+
+
+    def update_movies(self, updates):
+        """
+        Updates several movies in a single transaction.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        updates (iterable): Dictionaries with the 'title' of the movie and the new 
+        values for any of 'year', 'rating', 'language', 'country', 'awards' and 'note'.
+
+        Returns:
+        dict: Maps each title to True if the movie was updated,
+        or False if it does not exist.
+        """
+        results = {}
+        with self._lock, self._conn:
+            for update in updates:
+                title = update.get('title')
+                results[title] = title is not None and self._update(title, update)
+        return results
+
+
+    def delete_movies(self, titles):
+        """
+        Deletes several movies in a single transaction.
+
+        Parameters:
+        self (StorageSqlite): The instance of the StorageSqlite class.
+        titles (iterable): The titles of the movies to delete.
+
+        Returns:
+        dict: Maps each title to True if the movie was deleted,
+        or False if it does not exist.
+        """
+        results = {}
+        with self._lock, self._conn:
+            for title in titles:
+                cursor = self._conn.execute("DELETE FROM movies WHERE title = ?", (title,))
+                results[title] = cursor.rowcount > 0
+        return results
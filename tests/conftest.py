@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+
+# Movies known to the stub OMDb server, in the shape OMDb returns them
+OMDB_MOVIES = {
+    "Inception": {
+        "Title": "Inception", "Year": "2010", "imdbRating": "8.8",
+        "Poster": "http://example.com/inception.jpg", "Language": "English",
+        "Country": "United States, United Kingdom",
+        "Awards": "Won 4 Oscars.", "imdbID": "tt1375666", "Response": "True",
+    },
+    "Memento": {
+        "Title": "Memento", "Year": "2000", "imdbRating": "8.4",
+        "Poster": "http://example.com/memento.jpg", "Language": "English",
+        "Country": "United States", "Awards": "N/A",
+        "imdbID": "tt0209144", "Response": "True",
+    },
+    "Tenet": {
+        "Title": "Tenet", "Year": "2020", "imdbRating": "7.3",
+        "Poster": "http://example.com/tenet.jpg", "Language": "English, Russian",
+        "Country": "United Kingdom, United States", "Awards": "Won 1 Oscar.",
+        "imdbID": "tt6723592", "Response": "True",
+    },
+}
+
+
+class StubOmdbServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubOmdbHandler)
+        self.movies = {title.lower(): dict(movie) for title, movie in OMDB_MOVIES.items()}
+        self.requests = []
+        self.fail_next = 0  # Number of upcoming requests answered with HTTP 503
+        self.garbled = set()  # Lowercase titles answered with a body that is not JSON
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class StubOmdbHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(params)
+        if self.server.fail_next:
+            self.server.fail_next -= 1
+            self._send(503, {"Response": "False", "Error": "Service unavailable"})
+            return
+        if params.get('t', '').lower() in self.server.garbled:
+            self._send(200, "<html>Bad gateway</html>")
+            return
+        movie = None
+        if 't' in params:
+            movie = self.server.movies.get(params['t'].lower())
+        elif 'i' in params:
+            movie = next((m for m in self.server.movies.values()
+                          if m['imdbID'] == params['i']), None)
+        if movie is None:
+            self._send(200, {"Response": "False", "Error": "Movie not found!"})
+        else:
+            self._send(200, movie)
+
+    def _send(self, status, body):
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def omdb_server():
+    server = StubOmdbServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,74 @@
+import pytest
+from movie_app.stats import rating_summary
+from storage.query import apply_query
+
+np = pytest.importorskip("numpy")
+from movie_app.analytics import MISSING_YEAR, MovieColumns
+
+MOVIES = {
+    "Inception": {"year": 2010, "rating": 8.8, "language": "English, Japanese", "country": "USA, UK"},
+    "Memento": {"year": "2000", "rating": "8.4", "language": "English", "country": "USA"},
+    "Amélie": {"year": 2001, "rating": 8.3, "language": "French", "country": "France"},
+    "Tenet": {"year": 2020, "rating": 7.3, "language": "English", "country": "USA, UK"},
+    "Dunkirk": {"year": 2017, "rating": "N/A", "language": "English", "country": "UK"},
+    "Metropolis": {"year": "N/A", "rating": 8.3, "language": "N/A", "country": "Germany"},
+}
+
+
+@pytest.fixture
+def columns():
+    return MovieColumns(MOVIES)
+
+
+def test_columns_are_compact(columns):
+    assert columns.ratings.dtype == np.float32
+    assert columns.years.dtype == np.int16
+    assert np.isnan(columns.ratings[4])
+    assert columns.years[5] == MISSING_YEAR
+
+
+@pytest.mark.parametrize("order_by", ['rating', '-rating', 'year', '-year', 'title', '-title'])
+def test_order_matches_storage_query(columns, order_by):
+    expected = list(apply_query(MOVIES.items(), order_by=order_by))
+    assert [columns.titles[row] for row in columns.select(order_by=order_by)] == expected
+
+
+def test_filter_matches_storage_query(columns):
+    for bounds in ({'min_rating': 8.3}, {'max_rating': 8.4, 'min_year': 2001}, {'max_year': 2010}):
+        expected = list(apply_query(MOVIES.items(), filter=bounds))
+        assert [columns.titles[row] for row in columns.select(columns.mask(**bounds))] == expected
+
+
+def test_rows_format_missing_values(columns):
+    assert list(columns.rows([1, 4, 5])) == [("Memento", 2000, 8.4),
+                                            ("Dunkirk", 2017, 'N/A'),
+                                            ("Metropolis", 'N/A', 8.3)]
+
+
+def test_rating_summary(columns):
+    summary = columns.rating_summary()
+    expected = rating_summary(MOVIES)
+    assert summary['average'] == pytest.approx(expected['average'])
+    assert summary['median'] == expected['median']
+    assert summary['best'] == expected['best']
+    assert summary['worst'] == expected['worst']
+    assert (summary['count'], summary['rated']) == (6, 5)
+
+
+def test_reports(columns):
+    histogram = columns.histogram(bins=5)
+    assert histogram[3] == (6.0, 8.0, 1)
+    assert histogram[4] == (8.0, 10.0, 4)
+    assert columns.percentiles((0, 50, 100)) == {0: 7.3, 50: 8.3, 100: 8.8}
+    assert columns.decade_averages() == [(2000, 2, 8.35), (2010, 1, 8.8), (2020, 1, 7.3)]
+    assert columns.group_averages('country') == [
+        ("France", 1, 8.3), ("Germany", 1, 8.3), ("USA", 3, 8.17), ("UK", 2, 8.05)]
+    assert columns.group_averages('language', min_count=2) == [("English", 3, 8.17)]
+
+
+def test_empty_catalog():
+    columns = MovieColumns({})
+    assert columns.rating_summary()['median'] is None
+    assert columns.percentiles() == {}
+    assert columns.decade_averages() == []
+    assert columns.group_averages('country') == []
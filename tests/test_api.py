@@ -0,0 +1,140 @@
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from flask import Flask
+from movie_app.api import register_routes
+from storage.storage_json import StorageJson
+from storage.storage_sqlite import StorageSqlite
+
+
+def movie(title, year, rating):
+    return {"title": title, "year": year, "rating": rating,
+            "poster": f"http://example.com/{title.lower()}.jpg",
+            "language": "English", "country": "USA", "awards": "N/A",
+            "imdbID": f"tt-{title.lower()}"}
+
+
+MOVIES = [movie("Inception", "2010", "8.8"),
+          movie("Memento", "2000", "8.4"),
+          movie("Tenet", "2020", "7.3"),
+          movie("Dunkirk", "2017", "N/A")]
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'json':
+        path = tmp_path / 'movies.json'
+        path.write_text('{}')
+        storage = StorageJson(str(path))
+    else:
+        storage = StorageSqlite(str(tmp_path / 'movies.db'))
+    storage.add_movies(MOVIES)
+    yield storage
+    if request.param == 'sqlite':
+        storage.close()
+
+
+@pytest.fixture
+def client(storage):
+    app = Flask(__name__)
+    register_routes(app, storage)
+    return app.test_client()
+
+
+def test_list_movies_paginates_and_sorts(client):
+    response = client.get('/api/movies?sort=-rating&per_page=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [m['title'] for m in body['movies']] == ["Inception", "Memento"]
+    assert body['has_more'] is True
+
+    body = client.get('/api/movies?sort=-rating&per_page=2&page=2').get_json()
+    assert [m['title'] for m in body['movies']] == ["Tenet", "Dunkirk"]
+    assert body['has_more'] is False
+
+
+def test_filter_and_search(client):
+    body = client.get('/api/movies?min_year=2010&max_rating=8.5&sort=year').get_json()
+    assert [m['title'] for m in body['movies']] == ["Tenet"]
+
+    body = client.get('/api/movies/search?q=en').get_json()
+    assert sorted(m['title'] for m in body['movies']) == ["Memento", "Tenet"]
+    assert client.get('/api/movies/search').status_code == 400
+
+
+def test_invalid_parameters(client):
+    assert client.get('/api/movies?sort=poster').status_code == 400
+    assert client.get('/api/movies?min_rating=high').status_code == 400
+    assert client.get('/api/movies?page=two').status_code == 400
+
+
+def test_get_movie(client):
+    response = client.get('/api/movies/Memento')
+    assert response.get_json()['year'] in ("2000", 2000)
+    assert client.get('/api/movies/Unknown').status_code == 404
+
+
+def test_status(client):
+    body = client.get('/api/status').get_json()
+    assert body['count'] == 4
+    assert body['rated'] == 3
+    assert body['median'] == 8.4
+    assert body['best'] == {'rating': 8.8, 'titles': ["Inception"]}
+    assert body['worst'] == {'rating': 7.3, 'titles': ["Tenet"]}
+
+
+def test_etag_revalidation(client, storage):
+    response = client.get('/api/movies')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert 'Last-Modified' in response.headers
+
+    cached = client.get('/api/movies', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    # Every URL has its own tag
+    other = client.get('/api/movies?page=2', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+    storage.delete_movie("Tenet")
+    changed = client.get('/api/movies', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_if_modified_since(client):
+    last_modified = client.get('/api/status').headers['Last-Modified']
+    response = client.get('/api/status', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+
+def test_large_responses_are_gzipped(client, storage):
+    storage.add_movies(movie(f"Movie {i}", "1999", "5.0") for i in range(50))
+    plain = client.get('/api/movies?per_page=100')
+    assert 'Content-Encoding' not in plain.headers
+
+    response = client.get('/api/movies?per_page=100', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+    assert response.headers['ETag'] != plain.headers['ETag']
+    revalidated = client.get('/api/movies?per_page=100',
+                             headers={'Accept-Encoding': 'gzip',
+                                      'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    small = client.get('/api/movies/Memento', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_concurrent_requests_while_writing(client, storage):
+    # The server runs threaded, so reads race with writes of other threads
+    def read(number):
+        if number % 10 == 0:
+            storage.update_movie("Tenet", rating=str(7 + number / 1000))
+        return client.get('/api/movies?sort=-rating' if number % 2 else '/api/status').status_code
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(read, range(100))) == {200}
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from movie_app.async_omdb_client import AsyncOmdbClient
+from movie_app.importer import BulkImporter
+from movie_app.instrumentation import Metrics
+from movie_app.omdb_client import OmdbClient
+from storage.storage_json import StorageJson
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_fetch_many(omdb_server):
+    async def fetch():
+        async with AsyncOmdbClient('test-key', base_url=omdb_server.url) as client:
+            return await client.fetch_many(["Inception", "Unknown Movie", "Tenet"])
+
+    inception, unknown, tenet = run(fetch())
+    assert inception["imdbID"] == "tt1375666"
+    assert unknown is None
+    assert tenet["Year"] == "2020"
+
+
+def test_fetch_by_id(omdb_server):
+    async def fetch():
+        async with AsyncOmdbClient('test-key', base_url=omdb_server.url) as client:
+            return await client.fetch_by_id("tt0209144")
+
+    assert run(fetch())["Title"] == "Memento"
+
+
+def test_server_errors_are_retried(omdb_server):
+    omdb_server.fail_next = 2
+
+    async def fetch():
+        async with AsyncOmdbClient('test-key', base_url=omdb_server.url,
+                                   retries=3, backoff=0.01) as client:
+            return await client.fetch("Inception")
+
+    assert run(fetch())["Title"] == "Inception"
+    assert len(omdb_server.requests) == 3
+
+
+def test_gives_up_after_retries(omdb_server):
+    omdb_server.fail_next = 10
+
+    async def fetch():
+        async with AsyncOmdbClient('test-key', base_url=omdb_server.url,
+                                   retries=1, backoff=0.01) as client:
+            return await client.fetch("Inception")
+
+    assert run(fetch()) is None
+    assert len(omdb_server.requests) == 2
+
+
+def test_invalid_response_fails_only_its_lookup(omdb_server):
+    omdb_server.garbled.add("memento")
+
+    async def fetch():
+        async with AsyncOmdbClient(None, base_url=omdb_server.url) as client:
+            return await client.fetch_many(["Inception", "Memento"])
+
+    inception, memento = run(fetch())
+    assert inception["Title"] == "Inception"
+    assert memento is None
+    assert all('apikey' not in request for request in omdb_server.requests)
+
+
+def test_importer_asyncio_engine(tmp_path, omdb_server):
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    client = OmdbClient('test-key', base_url=omdb_server.url)
+    importer = BulkImporter(storage, client, workers=50, rate_limit=None, engine='asyncio')
+    report = importer.import_titles(["Inception", "Memento", "Unknown Movie"])
+    assert sorted(report['added']) == ["Inception", "Memento"]
+    assert report['not_found'] == ["Unknown Movie"]
+    assert set(storage.list_movies()) == {"Inception", "Memento"}
+
+
+def test_importer_asyncio_engine_records_metrics(tmp_path, omdb_server):
+    metrics = Metrics()
+    client = OmdbClient('test-key', base_url=omdb_server.url, metrics=metrics)
+    importer = BulkImporter(StorageJson(str(tmp_path / 'movies.json')), client,
+                            rate_limit=None, engine='asyncio')
+    importer.import_titles(["Inception", "Unknown Movie"])
+    report = metrics.report()
+    assert report['timings']['omdb.request']['count'] == 2
+    assert report['counters']['omdb.bytes_received'] > 0
+
+
+def test_importer_rejects_unknown_engine(tmp_path):
+    with pytest.raises(ValueError):
+        BulkImporter(StorageJson(str(tmp_path / 'movies.json')), None, engine='fibers')
@@ -0,0 +1,34 @@
+import pytest
+from benchmarks.suite import BACKENDS, compare, run, synthetic_catalog
+
+
+def test_synthetic_catalog_is_reproducible_with_unique_titles():
+    catalog = synthetic_catalog(500, seed=3)
+    assert catalog == synthetic_catalog(500, seed=3)
+    assert len({movie['title'] for movie in catalog}) == 500
+    assert catalog != synthetic_catalog(500, seed=4)
+
+
+def test_run_reports_every_backend_and_operation():
+    report = run(sizes=[50], operations=['load', 'add', 'search', 'status'], repeat=1)
+    assert report['meta']['repeat'] == 1
+    entries = {(entry['backend'], entry['operation']) for entry in report['results']}
+    assert entries == {(backend, operation) for backend in BACKENDS
+                       for operation in ('load', 'add', 'search', 'status')}
+    for entry in report['results']:
+        assert entry['size'] == 50
+        assert entry['seconds'] >= 0 and entry['peak_bytes'] >= 0
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        run(backends=['json'], sizes=[10], operations=['fly'], repeat=1)
+
+
+def test_compare_flags_regressions():
+    def report(seconds, peak):
+        return {'results': [{'backend': 'json', 'size': 10, 'operation': 'load',
+                             'seconds': seconds, 'peak_bytes': peak}]}
+    assert compare(report(1.0, 100), report(1.1, 100)) == [('json', 10, 'load', 1.1, 1.0, False)]
+    assert compare(report(1.0, 100), report(1.5, 100))[0][-1] is True
+    assert compare(report(1.0, 100), report(1.0, 200))[0][-1] is True
@@ -0,0 +1,26 @@
+import pytest
+from movie_app.countries import countries_to_flags, lookup_country_code
+
+
+@pytest.mark.parametrize("name, code", [
+    ("United States", "US"),
+    ("united kingdom", "GB"),
+    ("USA", "US"),
+    ("UK", "GB"),
+    ("Russia", "RU"),
+    ("South Korea", "KR"),
+    ("DEU", "DE"),
+    ("Czech Republic", "CZ"),
+])
+def test_lookup_country_code(name, code):
+    assert lookup_country_code(name) == code
+
+
+def test_lookup_unknown_country():
+    with pytest.raises(LookupError):
+        lookup_country_code("Atlantis")
+
+
+def test_countries_to_flags():
+    assert countries_to_flags("USA, UK") == "🇺🇸 USA, 🇬🇧 UK"
+    assert countries_to_flags("N/A") == "🏳️ N/A"
@@ -0,0 +1,67 @@
+import time
+import pytest
+from movie_app.importer import BulkImporter, read_titles
+from movie_app.omdb_client import OmdbClient, RateLimiter
+from storage.storage_json import StorageJson
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageJson(str(tmp_path / 'movies.json'))
+
+
+@pytest.fixture
+def client(omdb_server):
+    client = OmdbClient('test-key', base_url=omdb_server.url)
+    yield client
+    client.close()
+
+
+def test_read_titles_skips_blanks_comments_and_duplicates(tmp_path):
+    titles_file = tmp_path / 'titles.txt'
+    titles_file.write_text("Inception\n\n# watch later\nMemento\nInception\n")
+    assert read_titles(str(titles_file)) == ["Inception", "Memento"]
+
+
+def test_import_titles(storage, client, omdb_server):
+    storage.add_movie("Memento", "2000", "8.4", "", "English", "United States", "N/A", "tt0209144")
+    importer = BulkImporter(storage, client, workers=4, rate_limit=None)
+
+    report = importer.import_titles(["inception", "Memento", "Tenet", "Unknown Movie"])
+
+    assert sorted(report['added']) == ["Inception", "Tenet"]
+    assert report['skipped'] == ["Memento"]
+    assert report['not_found'] == ["Unknown Movie"]
+    movies = storage.list_movies()
+    assert movies["Inception"]["imdbID"] == "tt1375666"
+    assert movies["Tenet"]["year"] == 2020
+    # Existing titles are skipped without asking OMDb
+    assert all(request['t'] != "Memento" for request in omdb_server.requests)
+    assert all(request['apikey'] == 'test-key' for request in omdb_server.requests)
+
+
+def test_import_skips_normalized_duplicates(storage, client, omdb_server):
+    storage.add_movie("Memento", "2000", "8.4", "", "English", "United States", "N/A", "tt0209144")
+    importer = BulkImporter(storage, client, rate_limit=None)
+
+    report = importer.import_titles(["MEMENTO", "Tenet", "tenet!"])
+
+    assert report['added'] == ["Tenet"]
+    assert report['skipped'] == ["MEMENTO", "tenet!"]
+    assert [request['t'] for request in omdb_server.requests] == ["Tenet"]
+
+
+def test_import_writes_one_batch(storage, client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(storage, 'add_movie', lambda *args, **kwargs: calls.append(args))
+    BulkImporter(storage, client, rate_limit=None).import_titles(["Inception", "Tenet"])
+    assert calls == []
+    assert set(storage.list_movies()) == {"Inception", "Tenet"}
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 5 / 50
@@ -0,0 +1,83 @@
+import os
+import pstats
+import pytest
+from unittest.mock import patch
+from movie_app.instrumentation import Histogram, InstrumentedStorage, Metrics, profile_call
+from movie_app.movie_app import MovieApp
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+MOVIES = [{"title": title, "year": "2010", "rating": rating, "poster": "", "language": "English",
+           "country": "USA", "awards": "N/A", "imdbID": f"tt-{title.lower()}"}
+          for title, rating in (("Inception", "8.8"), ("Memento", "8.4"), ("Tenet", "7.3"))]
+
+
+def test_histogram_percentiles_stay_within_observed_range():
+    histogram = Histogram()
+    for milliseconds in range(1, 101):
+        histogram.observe(milliseconds / 1000)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['mean'] == pytest.approx(0.0505)
+    assert 0.025 <= summary['p50'] <= 0.1
+    assert summary['p50'] <= summary['p95'] <= summary['p99'] <= summary['max'] == 0.1
+    assert sum(summary['buckets'].values()) == 100
+    assert Histogram().percentile(50) is None
+
+
+def test_timer_records_failures_too():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.timer('failing'):
+            raise ValueError
+    metrics.increment('calls', 2)
+    report = metrics.report()
+    assert report['timings']['failing']['count'] == 1
+    assert report['counters'] == {'calls': 2}
+    assert 'failing' in metrics.format_report()
+
+
+@pytest.mark.parametrize("storage_class, name", [(StorageJson, 'movies.json'), (StorageCsv, 'movies.csv')])
+def test_instrumented_storage_counts_calls_and_bytes(tmp_path, storage_class, name):
+    metrics = Metrics()
+    path = str(tmp_path / name)
+    InstrumentedStorage(storage_class(path), metrics).add_movies(MOVIES)
+    assert metrics.report()['counters']['storage.bytes_written'] == os.path.getsize(path)
+
+    storage = InstrumentedStorage(storage_class(path), metrics)
+    assert storage.check_if_exists("Memento")
+    assert list(storage.query(order_by='-rating', limit=1)) == ["Inception"]
+    report = metrics.report()
+    assert set(report['timings']) >= {'storage.add_movies', 'storage.check_if_exists', 'storage.query'}
+    assert report['counters']['storage.bytes_read'] >= os.path.getsize(path)
+    assert storage.file_path == path
+
+
+@patch('builtins.input', side_effect=['5', '42', '0'])
+def test_menu_commands_are_timed(mock_input, tmp_path):
+    metrics = Metrics()
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movies(MOVIES)
+    app = MovieApp(storage, metrics=metrics)
+    app.run()
+    timings = metrics.report()['timings']
+    assert timings['command.status']['count'] == 1
+    assert 'storage.list_movies' in timings
+
+
+def test_api_requests_are_timed_and_reported(tmp_path):
+    metrics = Metrics()
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movies(MOVIES)
+    client = MovieApp(storage, metrics=metrics)._app.test_client()
+    assert client.get('/api/movies').status_code == 200
+    report = client.get('/api/metrics').get_json()
+    assert report['timings']['api.list_movies']['count'] == 1
+    assert 'storage.query' in report['timings']
+
+
+def test_profile_call_dumps_the_profile(tmp_path, capsys):
+    path = str(tmp_path / "run.prof")
+    assert profile_call(path, sorted, [3, 1, 2]) == [1, 2, 3]
+    assert pstats.Stats(path).total_calls > 0
+    assert "Profile written" in capsys.readouterr().out
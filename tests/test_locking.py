@@ -0,0 +1,91 @@
+import json
+import multiprocessing
+import os
+import threading
+import pytest
+from storage.locking import atomic_write, file_lock
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+
+def movie(title):
+    return {"title": title, "year": 2000, "rating": 7.0, "poster": "N/A",
+            "language": "English", "country": "USA", "awards": "N/A",
+            "imdbID": f"tt-{title}"}
+
+
+def make_storage(kind, path):
+    return StorageJson(path) if kind == 'json' else StorageCsv(path)
+
+
+def add_from_process(kind, path, prefix, count):
+    storage = make_storage(kind, path)
+    for i in range(count):
+        storage.add_movies([movie(f"{prefix} {i}")])
+
+
+@pytest.fixture(params=['json', 'csv'])
+def kind_and_path(request, tmp_path):
+    path = tmp_path / f"movies.{request.param}"
+    path.write_text('{}' if request.param == 'json' else ','.join(['title', 'year', 'rating']) + '\n')
+    return request.param, str(path)
+
+
+def test_threads_do_not_lose_updates(kind_and_path):
+    kind, path = kind_and_path
+    storages = [make_storage(kind, path) for _ in range(4)]
+
+    def worker(storage, prefix):
+        for i in range(10):
+            storage.add_movies([movie(f"{prefix} {i}")])
+
+    threads = [threading.Thread(target=worker, args=(storage, f"T{n}"))
+               for n, storage in enumerate(storages)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(make_storage(kind, path).list_movies()) == 40
+
+
+def test_processes_do_not_lose_updates(kind_and_path):
+    kind, path = kind_and_path
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=add_from_process, args=(kind, path, f"P{n}", 10))
+                 for n in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    assert len(make_storage(kind, path).list_movies()) == 30
+
+
+def test_atomic_write_keeps_old_content_on_failure(tmp_path):
+    path = tmp_path / 'movies.json'
+    path.write_text('{"Memento": {}}')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file:
+            file.write('{"trunc')
+            raise RuntimeError("crash mid-write")
+    assert json.loads(path.read_text()) == {"Memento": {}}
+    assert os.listdir(tmp_path) == ['movies.json']
+
+
+def test_atomic_write_keeps_permissions(tmp_path):
+    path = tmp_path / 'movies.json'
+    path.write_text('{}')
+    os.chmod(path, 0o640)
+    with atomic_write(str(path)) as file:
+        file.write('{"Memento": {}}')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert json.loads(path.read_text()) == {"Memento": {}}
+
+
+def test_file_lock_is_shared_and_reentrant(tmp_path):
+    path = str(tmp_path / 'movies.json')
+    lock = file_lock(path)
+    assert file_lock(os.path.join(str(tmp_path), '.', 'movies.json')) is lock
+    with lock:
+        with lock:
+            assert os.path.exists(path + '.lock')
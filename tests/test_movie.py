@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import pytest
+from storage.movie import Movie
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+
+def test_normalizes_year_and_rating():
+    movie = Movie(year="2010–2013", rating="8.8", country="USA")
+    assert movie.year == 2010
+    assert movie.rating == 8.8
+    assert movie['year'] == 2010
+    unknown = Movie(year="N/A", rating="N/A")
+    assert unknown.year is None and unknown.rating is None
+    assert unknown['year'] == 'N/A'
+    assert unknown.get('rating') == 'N/A'
+
+
+def test_behaves_like_a_details_dict():
+    details = {'year': 2010, 'rating': 8.8, 'poster': 'p.jpg', 'language': 'English',
+               'country': 'USA', 'awards': 'N/A', 'imdbID': 'tt1375666', 'note': None,
+               'fetched_at': 1700000000.0}
+    movie = Movie.from_dict(dict(details, plot="ignored"))
+    assert movie == details
+    assert dict(movie) == details
+    assert {**movie} == details
+    assert 'plot' not in movie
+    with pytest.raises(KeyError):
+        movie['plot']
+
+
+def test_setitem_normalizes_and_copy_is_independent():
+    movie = Movie(rating=7.0)
+    copy = movie.copy()
+    movie['rating'] = "9.1"
+    movie['note'] = "Rewatch"
+    assert movie.rating == 9.1
+    assert copy.rating == 7.0 and copy.note is None
+    with pytest.raises(KeyError):
+        movie['plot'] = "x"
+
+
+def test_repeated_strings_are_shared():
+    first = Movie(country="".join(["U", "S", "A"]))
+    second = Movie(country="".join(["U", "SA"]))
+    assert first.country is second.country
+
+
+def test_has_no_instance_dict():
+    assert not hasattr(Movie(), '__dict__')
+
+
+@pytest.mark.parametrize("storage_class, extension", [(StorageJson, '.json'), (StorageCsv, '.csv')])
+def test_storages_round_trip_typed_values(storage_class, extension):
+    fd, path = tempfile.mkstemp(suffix=extension)
+    os.close(fd)
+    os.remove(path)
+    try:
+        storage = storage_class(path)
+        storage.add_movie("Inception", "2010", "8.8", "poster.jpg", "English", "USA", "N/A", "tt1375666")
+        storage.update_movie("Inception", note="Dream within a dream")
+        storage.add_movie("Unknown", "N/A", "N/A", "", "", "", "", "")
+        movies = storage_class(path).list_movies()
+        assert movies["Inception"].year == 2010
+        assert movies["Inception"].rating == 8.8
+        assert movies["Inception"]['note'] == "Dream within a dream"
+        assert movies["Unknown"]['rating'] == 'N/A'
+        if extension == '.json':
+            with open(path) as file:
+                assert json.load(file)["Inception"]["rating"] == 8.8
+    finally:
+        for leftover in (path, path + '.lock', path + '.journal'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
@@ -11,7 +11,8 @@ class MockStorage(IStorage):
     def list_movies(self):
         return self.movies
 
-    def add_movie(self, title, year, rating, poster, language, country, awards, imdbID):
+    def add_movie(self, title, year, rating, poster, language, country, awards, imdbID,
+                  note=None, fetched_at=None):
         self.movies[title] = {
             "year": year,
             "rating": rating,
@@ -72,6 +73,19 @@ def test_add_movie(mock_input, mock_fetch, app):
     assert movie["awards"] == "Nominated for 8 Oscars."
     assert movie["imdbID"] == "tt1375666"
 
+# Test that a differently spelled duplicate is caught before asking OMDb
+@patch.object(MovieApp, '_fetch_movie_data')
+@patch('builtins.input', side_effect=['inception!'])
+def test_add_movie_skips_normalized_duplicate(mock_input, mock_fetch, app, capsys):
+    app, storage = app
+    storage.add_movie("Inception", "2010", "8.8", "", "English", "USA", "N/A", "tt1375666")
+
+    app._command_add_movie()
+
+    mock_fetch.assert_not_called()
+    assert "Movie Inception already exists" in capsys.readouterr().out
+    assert list(storage.list_movies()) == ["Inception"]
+
 # Test deleting a movie
 @patch('builtins.input', side_effect=['The Lord of the Rings: The Fellowship of the Ring'])
 def test_delete_movie(mock_input, app):
@@ -88,3 +102,99 @@ def test_delete_movie(mock_input, app):
     )
     app._command_delete_movie()
     assert "The Lord of the Rings: The Fellowship of the Ring" not in storage.list_movies()
+
+# Test filtering movies by minimum rating
+@patch('builtins.input', side_effect=['8'])
+def test_filter_movies(mock_input, app, capsys):
+    app, storage = app
+    storage.add_movie("Inception", "2010", "8.8", "", "English", "USA", "N/A", "tt1375666")
+    storage.add_movie("Tenet", "2020", "7.3", "", "English", "USA", "N/A", "tt6723592")
+    storage.add_movie("Unrated", "2024", "N/A", "", "English", "USA", "N/A", "tt0000001")
+    app._command_filter_movies()
+    output = capsys.readouterr().out
+    assert "Inception (2010): 8.8" in output
+    assert "Tenet" not in output
+    assert "Unrated" not in output
+
+# Test sorting movies by year
+def test_sort_movies_by_year(app, capsys):
+    app, storage = app
+    storage.add_movie("Memento", "2000", "8.4", "", "English", "USA", "N/A", "tt0209144")
+    storage.add_movie("Tenet", "2020", "7.3", "", "English", "USA", "N/A", "tt6723592")
+    storage.add_movie("Inception", "2010", "8.8", "", "English", "USA", "N/A", "tt1375666")
+    app._command_sort_movies_by_year()
+    output = capsys.readouterr().out
+    assert output.index("Tenet") < output.index("Inception") < output.index("Memento")
+
+
+# Test that search ranks fuzzy matches and follows changes made through the app
+@patch('builtins.input', side_effect=['dark knigth', 'Batman Begins', 'batman'])
+def test_search_movie(mock_input, app, capsys):
+    app, storage = app
+    for title, year, rating in (("The Dark Knight", 2008, 9.0),
+                                ("Dark Waters", 2019, 7.6),
+                                ("Batman Begins", 2005, 8.2)):
+        storage.add_movie(title, year, rating, "N/A", "English", "USA", "N/A", "tt0")
+    app._command_search_movie()
+    output = capsys.readouterr().out
+    assert output.index("The Dark Knight (2008): 9.0") < output.index("Dark Waters (2019): 7.6")
+
+    app._command_delete_movie()
+    app._command_search_movie()
+    assert "No matching movies found." in capsys.readouterr().out
+
+
+# Test that search skips titles deleted behind the index's back
+@patch('builtins.input', side_effect=['inception', 'inception'])
+def test_search_skips_deleted_titles(mock_input, app, capsys):
+    app, storage = app
+    storage.add_movie("Inception", 2010, 8.8, "N/A", "English", "USA", "N/A", "tt1375666")
+    app._command_search_movie()
+    assert "Inception (2010): 8.8" in capsys.readouterr().out
+    del storage.movies["Inception"]  # Unseen by the index, as MockStorage has no version
+    app._command_search_movie()
+    assert "No matching movies found." in capsys.readouterr().out
+
+
+# Test that status follows changes made through the app and outside of it
+@patch('builtins.input', side_effect=['Memento', '', '9.5', '', '', '', ''])
+def test_status(mock_input, app, capsys):
+    app, storage = app
+    app.verify_stats = True
+    storage.add_movie("Memento", 2000, 8.4, "N/A", "English", "USA", "N/A", "tt0209144")
+    storage.add_movie("Tenet", 2020, 7.3, "N/A", "English", "USA", "N/A", "tt6723592")
+    storage.add_movie("Dunkirk", 2017, "N/A", "N/A", "English", "USA", "N/A", "tt5013056")
+    app._command_status()
+    output = capsys.readouterr().out
+    assert "Median rating: 7.8" in output
+    assert "Skipping 1 movie(s) without a valid rating." in output
+
+    app._command_update_movie()
+    app._command_status()
+    output = capsys.readouterr().out
+    assert "Best movie(s) by rating:\n\nMemento (9.5)" in output
+    assert "inconsistent" not in output
+
+    storage.delete_movie("Tenet")
+    app._command_status()
+    output = capsys.readouterr().out
+    assert "Worst movie(s) by rating:\n\nMemento (9.5)" in output
+    assert "inconsistent" not in output
+
+
+# Test the vectorized status and sort commands
+def test_columnar_commands(app, capsys):
+    pytest.importorskip("numpy")
+    app, storage = app
+    app.columnar = True
+    storage.add_movie("Memento", 2000, 8.4, "N/A", "English", "USA", "N/A", "tt0209144")
+    storage.add_movie("Tenet", 2020, 7.3, "N/A", "English", "USA", "N/A", "tt6723592")
+    app._command_sort_movies_by_year()
+    output = capsys.readouterr().out
+    assert output.index("Tenet (2020): 7.3") < output.index("Memento (2000): 8.4")
+
+    storage.add_movie("Inception", 2010, 8.8, "N/A", "English", "USA", "N/A", "tt1375666")
+    app._command_status()
+    output = capsys.readouterr().out
+    assert "Median rating: 8.4" in output
+    assert "Best movie(s) by rating:\n\nInception (8.8)" in output
@@ -0,0 +1,38 @@
+from storage.normalize import TitleIndex, normalize_title
+
+
+def test_normalize_title_folds_case_accents_and_punctuation():
+    assert normalize_title("Amélie") == normalize_title("AMELIE!") == "amelie"
+    assert normalize_title("Spider-Man: No Way Home") == "spider man no way home"
+    assert normalize_title("  The   Matrix ") == "the matrix"
+    assert normalize_title("ＷＡＬＬ·Ｅ") == "wall e"  # Full-width characters
+    assert normalize_title("Straße") == normalize_title("STRASSE")
+
+
+def test_title_index_finds_titles_and_imdb_ids():
+    index = TitleIndex({"Amélie": {"imdbID": "tt0211915"}, "Inception": {"imdbID": "tt1375666"}})
+    assert index.find_title("amelie") == "Amélie"
+    assert index.find_title("INCEPTION.") == "Inception"
+    assert index.find_title("Tenet") is None
+    assert index.find_imdb_id("tt1375666") == "Inception"
+    assert index.find_imdb_id("") is None
+
+
+def test_title_index_updates():
+    index = TitleIndex()
+    index.add("Inception", {"imdbID": "tt1375666"})
+    index.add("inception", {"imdbID": ""})
+    index.remove("Inception", {"imdbID": "tt1375666"})
+    assert index.find_title("Inception") == "inception"
+    assert index.find_imdb_id("tt1375666") is None
+    index.replace("inception", {"imdbID": ""}, {"imdbID": "tt0000001"})
+    assert index.find_imdb_id("tt0000001") == "inception"
+
+
+def test_shared_imdb_id_survives_removing_one_title():
+    index = TitleIndex({"Inception": {"imdbID": "tt1375666"},
+                        "Inception (2010)": {"imdbID": "tt1375666"}})
+    index.remove("Inception", {"imdbID": "tt1375666"})
+    assert index.find_imdb_id("tt1375666") == "Inception (2010)"
+    index.remove("Inception (2010)", {"imdbID": "tt1375666"})
+    assert index.find_imdb_id("tt1375666") is None
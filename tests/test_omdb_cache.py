@@ -0,0 +1,58 @@
+import time
+import pytest
+from movie_app.omdb_cache import OmdbCache
+from movie_app.omdb_client import OmdbClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OmdbCache(str(tmp_path / 'omdb_cache.sqlite'))
+    yield cache
+    cache.close()
+
+
+def test_client_serves_repeated_lookups_from_cache(cache, omdb_server):
+    client = OmdbClient('test-key', base_url=omdb_server.url, cache=cache)
+    movie = client.fetch("inception")
+    assert movie["Title"] == "Inception"
+
+    # Same title (normalized), canonical title and imdbID all hit the cache
+    assert client.fetch("  INCEPTION ") == movie
+    assert client.fetch("Inception") == movie
+    assert client.fetch_by_id("tt1375666") == movie
+    assert len(omdb_server.requests) == 1
+    assert cache.stats()['hits'] == 3
+    assert cache.stats()['misses'] == 1
+
+
+def test_not_found_is_cached_with_shorter_ttl(tmp_path, omdb_server):
+    cache = OmdbCache(str(tmp_path / 'omdb_cache.sqlite'), negative_ttl=0.05)
+    client = OmdbClient('test-key', base_url=omdb_server.url, cache=cache)
+    assert client.fetch("Unknown Movie") is None
+    assert client.fetch("Unknown Movie") is None
+    assert len(omdb_server.requests) == 1
+    assert cache.stats()['negative_hits'] == 1
+
+    time.sleep(0.1)
+    assert client.fetch("Unknown Movie") is None
+    assert len(omdb_server.requests) == 2
+    cache.close()
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / 'omdb_cache.sqlite')
+    cache = OmdbCache(path, max_entries=2)
+    cache.put_movie({"Title": "Memento", "imdbID": ""})
+    time.sleep(0.01)
+    cache.put_movie({"Title": "Tenet", "imdbID": ""})
+    time.sleep(0.01)
+    cache.get_title("Memento")  # Memento is now more recently used than Tenet
+    time.sleep(0.01)
+    cache.put_movie({"Title": "Dunkirk", "imdbID": ""})
+    cache.close()
+
+    cache = OmdbCache(path, max_entries=2)
+    assert cache.get_title("Memento")[0]
+    assert cache.get_title("Dunkirk")[0]
+    assert not cache.get_title("Tenet")[0]
+    cache.close()
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from movie_app.posters import PosterCache
+from movie_app.website import WebsiteGenerator
+
+# Tiny stand-ins for poster images; the pipeline only looks at their bytes
+IMAGES = {
+    '/inception.jpg': b'\xff\xd8\xff\xe0inception poster',
+    '/memento.jpg': b'\xff\xd8\xff\xe0memento poster',
+    '/memento-copy.jpg': b'\xff\xd8\xff\xe0memento poster',
+}
+LAST_MODIFIED = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+
+class ImageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ImageHandler)
+        self.images = dict(IMAGES)
+        self.requests = []
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        content = self.server.images.get(self.path)
+        if content is None:
+            self._send(404, b'')
+            return
+        etag = '"' + hashlib.md5(content).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag)
+            return
+        self._send(200, content, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if status == 200:
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Last-Modified', LAST_MODIFIED)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    server = ImageServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def posters(tmp_path):
+    cache = PosterCache(str(tmp_path / 'posters'), workers=4, thumbnail_workers=1)
+    yield cache
+    cache.close()
+
+
+def test_downloads_are_content_addressed(posters, image_server):
+    urls = [image_server.url(path) for path in IMAGES] + ['N/A', image_server.url('/missing.jpg')]
+
+    assets = posters.fetch(urls)
+
+    assert set(assets) == {image_server.url(path) for path in IMAGES}
+    for path, content in IMAGES.items():
+        with open(assets[image_server.url(path)], 'rb') as file:
+            assert file.read() == content
+    # The same image under two URLs is stored once, named after its digest
+    memento = assets[image_server.url('/memento.jpg')]
+    assert memento == assets[image_server.url('/memento-copy.jpg')]
+    assert os.path.basename(memento) == hashlib.sha256(IMAGES['/memento.jpg']).hexdigest() + '.jpg'
+    assert posters.stats == {'downloaded': 3, 'not_modified': 0, 'failed': 1, 'thumbnails': 0}
+
+
+def test_unchanged_posters_are_not_downloaded_again(posters, image_server):
+    url = image_server.url('/inception.jpg')
+    first = posters.fetch([url])
+    image_server.requests.clear()
+
+    assert posters.fetch([url]) == first
+    path, headers = image_server.requests[0]
+    assert headers['If-None-Match'] == '"' + hashlib.md5(IMAGES['/inception.jpg']).hexdigest() + '"'
+    assert headers['If-Modified-Since'] == LAST_MODIFIED
+    assert posters.stats['not_modified'] == 1
+
+    # A changed image gets a new file
+    image_server.images['/inception.jpg'] = b'\xff\xd8\xff\xe0new inception poster'
+    assert posters.fetch([url])[url] != first[url]
+
+
+def test_thumbnails(posters, image_server):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', (600, 890), 'red').save(buffer, 'PNG')
+    image_server.images['/large.png'] = buffer.getvalue()
+
+    asset = posters.fetch([image_server.url('/large.png')])[image_server.url('/large.png')]
+
+    assert '/thumbs/' in asset.replace(os.sep, '/')
+    with Image.open(asset) as thumbnail:
+        assert thumbnail.size[0] <= 240 and thumbnail.size[1] <= 356
+    assert posters.stats['thumbnails'] == 1
+
+
+def test_without_pillow_full_size_posters_are_used(posters, image_server, monkeypatch, capsys):
+    monkeypatch.setattr('movie_app.posters._pillow', lambda: None)
+    url = image_server.url('/inception.jpg')
+
+    asset = posters.fetch([url])[url]
+
+    assert '/thumbs/' not in asset.replace(os.sep, '/')
+    assert "Pillow is not installed" in capsys.readouterr().out
+
+
+def test_website_shows_local_posters(tmp_path, posters, image_server):
+    template_path = tmp_path / 'index_template.html'
+    template_path.write_text("<ul>\n__TEMPLATE_MOVIE_GRID__\n</ul>\n")
+    generator = WebsiteGenerator(template_path=str(template_path),
+                                 output_path=str(tmp_path / 'index.html'), posters=posters)
+    movies = {
+        "Inception": {"year": 2010, "poster": image_server.url('/inception.jpg'), "imdbID": "tt1375666"},
+        "Unknown": {"year": 2000, "poster": image_server.url('/missing.jpg'), "imdbID": "tt0000001"},
+    }
+
+    generator.generate(movies.items())
+
+    html = (tmp_path / 'index.html').read_text()
+    digest = hashlib.sha256(IMAGES['/inception.jpg']).hexdigest()
+    assert f"<img src='posters/{digest[:2]}/{digest}.jpg'" in html
+    # Posters that could not be downloaded stay linked
+    assert f"<img src='{image_server.url('/missing.jpg')}'" in html
+    assert movies["Inception"]["poster"] == image_server.url('/inception.jpg')
@@ -0,0 +1,126 @@
+import time
+import pytest
+from movie_app.omdb_client import OmdbClient
+from movie_app.refresh import RefreshScheduler, changed_fields
+from storage.istorage import IStorage
+from storage.movie import Movie
+from storage.storage_json import StorageJson
+from storage.storage_sqlite import StorageSqlite
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    storage.add_movie("Inception", "2010", "8.0", "http://example.com/old.jpg", "English",
+                      "United States, United Kingdom", "Won 4 Oscars.", "tt1375666")
+    storage.add_movie("Memento", "2000", "8.4", "", "English", "United States", "N/A",
+                      "tt0209144", fetched_at=time.time())
+    storage.add_movie("Lost Movie", "1999", "5.0", "", "English", "United States", "N/A",
+                      "tt0000000", fetched_at=1.0)
+    return storage
+
+
+@pytest.fixture
+def client(omdb_server):
+    client = OmdbClient('test-key', base_url=omdb_server.url)
+    yield client
+    client.close()
+
+
+def test_changed_fields():
+    stored = Movie(2010, 8.8, "p.jpg", "English", "USA", "N/A", "tt1375666")
+    data = {"Year": "2010", "imdbRating": "N/A", "Poster": "p.jpg", "Language": "English",
+            "Country": "USA", "Awards": "Won 1 Oscar.", "imdbID": "tt1375666"}
+    assert changed_fields(stored, data) == {'rating': 'N/A', 'awards': "Won 1 Oscar."}
+
+
+def test_refresh_once(storage, client, omdb_server, monkeypatch):
+    writes = []
+    update_movies = storage.update_movies
+    monkeypatch.setattr(storage, 'update_movies',
+                        lambda updates: writes.append(updates) or update_movies(updates))
+    scheduler = RefreshScheduler(storage, client, batch_size=10, max_age=3600, rate_limit=None)
+
+    report = scheduler.refresh_once(now=1000000.0)
+
+    assert report == {'refreshed': ["Inception"],
+                      'changed': {"Inception": ['rating', 'poster']},
+                      'failed': ["Lost Movie"]}
+    # Looked up by imdbID; Memento was fetched recently and is left alone
+    assert sorted(request['i'] for request in omdb_server.requests) == ["tt0000000", "tt1375666"]
+    assert len(writes) == 1
+    movies = storage.list_movies()
+    assert movies["Inception"]["rating"] == 8.8
+    assert movies["Inception"]["poster"] == "http://example.com/inception.jpg"
+    assert movies["Inception"]["fetched_at"] == 1000000.0
+    assert movies["Lost Movie"]["fetched_at"] == 1000000.0
+    assert movies["Lost Movie"]["rating"] == 5.0
+
+
+class DictStorage(IStorage):
+    """
+    A minimal storage that relies on the default update_movies and stale_movies.
+    """
+
+    def __init__(self):
+        self.movies = {}
+
+    def check_if_exists(self, title):
+        return title in self.movies
+
+    def list_movies(self):
+        return dict(self.movies)
+
+    def add_movie(self, title, year, rating, poster, language, country, awards, imdbID,
+                  note=None, fetched_at=None):
+        self.movies[title] = Movie(year, rating, poster, language, country, awards, imdbID,
+                                   note, fetched_at)
+
+    def delete_movie(self, title):
+        self.movies.pop(title, None)
+
+    def update_movie(self, title, year=None, rating=None, language=None, country=None,
+                     awards=None, note=None, poster=None, fetched_at=None):
+        movie = self.movies[title]
+        for field, value in (('year', year), ('rating', rating), ('language', language),
+                             ('country', country), ('awards', awards), ('note', note),
+                             ('poster', poster), ('fetched_at', fetched_at)):
+            if value is not None:
+                movie[field] = value
+
+
+def test_refresh_with_default_update_movies(client):
+    storage = DictStorage()
+    storage.add_movie("Inception", "2010", "8.0", "http://example.com/old.jpg", "English",
+                      "United States, United Kingdom", "Won 4 Oscars.", "tt1375666")
+    scheduler = RefreshScheduler(storage, client, max_age=3600, rate_limit=None)
+
+    report = scheduler.refresh_once(now=1000000.0)
+
+    assert report['changed'] == {"Inception": ['rating', 'poster']}
+    movie = storage.movies["Inception"]
+    assert movie.rating == 8.8
+    assert movie.poster == "http://example.com/inception.jpg"
+    assert movie.fetched_at == 1000000.0
+
+
+def test_stale_movies_come_oldest_first(tmp_path):
+    for storage in (StorageJson(str(tmp_path / 'movies.json')),
+                    StorageSqlite(str(tmp_path / 'movies.db'))):
+        storage.add_movie("New", 2020, 7.0, "", "English", "USA", "N/A", "tt1", fetched_at=300.0)
+        storage.add_movie("Old", 2020, 7.0, "", "English", "USA", "N/A", "tt2", fetched_at=100.0)
+        storage.add_movie("Unknown", 2020, 7.0, "", "English", "USA", "N/A", "tt3")
+        assert [title for title, _ in storage.stale_movies(2)] == ["Unknown", "Old"]
+
+
+def test_background_refresh(storage, client, omdb_server):
+    scheduler = RefreshScheduler(storage, client, interval=60, rate_limit=None)
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while scheduler.last_report is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop(timeout=5)
+    assert scheduler.last_report['changed'] == {"Inception": ['rating', 'poster']}
+    assert storage.list_movies()["Inception"]["rating"] == 8.8
@@ -0,0 +1,93 @@
+import pytest
+from movie_app.search import COMMON_POSTINGS, SearchIndex, tokenize, trigrams
+
+MOVIES = {
+    "The Dark Knight": {"language": "English", "country": "USA", "awards": "Won 2 Oscars."},
+    "The Dark Knight Rises": {"language": "English", "country": "UK, USA", "awards": "N/A"},
+    "Amélie": {"language": "French", "country": "France", "awards": "Nominated for 5 Oscars."},
+    "Knight and Day": {"language": "English", "country": "USA", "awards": "N/A"},
+    "Spider-Man": {"language": "English", "country": "USA", "awards": "N/A"},
+}
+
+
+@pytest.fixture
+def index():
+    return SearchIndex.build(MOVIES)
+
+
+def titles(results):
+    return [title for title, _ in results]
+
+
+def test_tokenize_normalizes_case_and_accents():
+    assert tokenize("Amélie: LE Fabuleux") == ["amelie", "le", "fabuleux"]
+    assert trigrams("up") == {" up", "up "}
+
+
+def test_ranks_by_matched_words_then_length(index):
+    assert titles(index.search("dark knight")) == [
+        "The Dark Knight", "The Dark Knight Rises", "Knight and Day"]
+
+
+def test_whole_title_ranks_first(index):
+    assert titles(index.search("the dark knight rises"))[0] == "The Dark Knight Rises"
+    assert titles(index.search("spider man")) == ["Spider-Man"]
+
+
+def test_typos_and_prefixes(index):
+    assert titles(index.search("dark knigth"))[:2] == ["The Dark Knight", "The Dark Knight Rises"]
+    assert titles(index.search("knigt")) == ["Knight and Day", "The Dark Knight", "The Dark Knight Rises"]
+    assert titles(index.search("amel")) == ["Amélie"]
+    assert index.search("zzzz") == []
+
+
+def test_substrings_inside_a_word(index):
+    assert titles(index.search("meli")) == ["Amélie"]
+    assert titles(index.search("ider")) == ["Spider-Man"]
+
+
+def test_limit(index):
+    assert len(index.search("knight", limit=2)) == 2
+
+
+def test_incremental_maintenance(index):
+    index.add("Knightriders", {})
+    assert "Knightriders" in titles(index.search("knightriders"))
+
+    index.remove("Knight and Day")
+    index.remove("Unknown")
+    assert "Knight and Day" not in titles(index.search("knight"))
+    assert index.search("day") == []
+    assert len(index) == 5
+
+    # Re-adding a title replaces its previous entry
+    index.add("Spider-Man", {})
+    assert len(index) == 5
+
+
+def test_optional_fields():
+    index = SearchIndex.build(MOVIES, fields=('title', 'country', 'awards'))
+    assert titles(index.search("france")) == ["Amélie"]
+    # A title match outweighs a match in another field
+    index.add("Oscar", {})
+    assert titles(index.search("oscar"))[0] == "Oscar"
+
+    index.update("Amélie", {"country": "Germany", "awards": None})
+    assert index.search("france") == []
+    assert titles(index.search("germany")) == ["Amélie"]
+    assert "Amélie" in titles(index.search("oscars"))
+
+    with pytest.raises(ValueError):
+        SearchIndex(fields=('title', 'poster'))
+
+
+def test_common_words_refine_rarer_ones():
+    movies = {f"The Movie {i}": {} for i in range(COMMON_POSTINGS + 1)}
+    movies["The Dark Knight"] = {}
+    index = SearchIndex.build(movies)
+    assert titles(index.search("the knight")) == ["The Dark Knight"]
+    assert titles(index.search("the", limit=2)) == ["The Movie 0", "The Movie 1"]
+
+    # The cached ranking of a word follows the index changes
+    index.remove("The Movie 0")
+    assert titles(index.search("the", limit=1)) == ["The Movie 1"]
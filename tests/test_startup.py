@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+from movie_app.movie_app import MovieApp
+from storage.storage_json import StorageJson
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_startup_does_not_import_heavy_dependencies():
+    code = ("import sys, main; "
+            "print(sorted(m for m in ('flask', 'requests', 'pycountry', 'dotenv', 'numpy') "
+            "if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_omdb_client_and_flask_app_are_created_on_first_use(tmp_path):
+    app = MovieApp(StorageJson(str(tmp_path / "movies.json")))
+    assert app._omdb_client is None and app._flask_app is None
+    assert app._omdb is app._omdb
+    assert app._app.test_client().get('/api/status').status_code == 200
@@ -0,0 +1,64 @@
+import random
+import pytest
+from movie_app.stats import RatingStats, rating_summary
+
+MOVIES = {
+    "Inception": {"rating": 8.8},
+    "Memento": {"rating": "8.4"},
+    "Tenet": {"rating": 7.3},
+    "Dunkirk": {"rating": "N/A"},
+    "Interstellar": {"rating": 8.8},
+}
+
+
+def test_build_matches_rating_summary():
+    stats = RatingStats.build(MOVIES)
+    assert stats.verify(MOVIES) == []
+    summary = stats.summary()
+    assert summary['average'] == pytest.approx(rating_summary(MOVIES)['average'])
+    assert summary['count'] == 5
+    assert summary['rated'] == 4
+    assert summary['median'] == pytest.approx(8.6)
+    assert summary['best'] == {'rating': 8.8, 'titles': ["Inception", "Interstellar"]}
+    assert summary['worst'] == {'rating': 7.3, 'titles': ["Tenet"]}
+
+
+def test_updates_and_removals():
+    stats = RatingStats.build(MOVIES)
+    stats.set("Tenet", 9.1)
+    stats.remove("Inception")
+    stats.remove("Unknown")
+    summary = stats.summary()
+    assert summary['count'] == 4
+    assert summary['median'] == 8.8
+    assert summary['best'] == {'rating': 9.1, 'titles': ["Tenet"]}
+    assert summary['worst'] == {'rating': 8.4, 'titles': ["Memento"]}
+
+    for title in list(MOVIES):
+        stats.remove(title)
+    assert stats.summary() == rating_summary({})
+    stats.set("Alone", 6.0)
+    assert stats.summary()['median'] == 6.0
+
+
+def test_random_changes_stay_consistent():
+    rng = random.Random(7)
+    stats = RatingStats()
+    movies = {}
+    for step in range(3000):
+        title = f"Movie {rng.randrange(60)}"
+        if rng.random() < 0.65:
+            rating = rng.choice([rng.randint(10, 100) / 10, 'N/A', 7.5])
+            stats.set(title, rating)
+            movies[title] = {'rating': rating}
+        else:
+            stats.remove(title)
+            movies.pop(title, None)
+        if step % 25 == 0:
+            assert stats.verify(movies) == []
+
+
+def test_verify_reports_differences():
+    stats = RatingStats.build(MOVIES)
+    changed = dict(MOVIES, Tenet={"rating": 9.5})
+    assert stats.verify(changed) == ['median', 'average', 'best', 'worst']
@@ -0,0 +1,149 @@
+import unittest
+import os
+import struct
+from storage.storage_binary import (HEADER, MAGIC, NO_STRING, RECORDS, StorageBinary,
+                                    _title_hash, encode)
+from storage.movie import Movie
+
+class TestStorageBinary(unittest.TestCase):
+    def setUp(self):
+        self.file_path = 'test_movies.bin'
+        self.storage = StorageBinary(self.file_path)
+
+    def tearDown(self):
+        self.storage.close()
+        for path in (self.file_path, self.file_path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def add_inception(self):
+        self.storage.add_movie(
+            "Inception",
+            "2010",
+            "8.8",
+            "http://example.com/poster.jpg",
+            language="English",
+            country="USA",
+            awards="Nominated for 8 Oscars.",
+            imdbID="tt1375666"
+        )
+
+    def test_add_movie(self):
+        self.add_inception()
+        movies = StorageBinary(self.file_path).list_movies()
+        self.assertEqual(movies["Inception"]["year"], 2010)
+        self.assertEqual(movies["Inception"]["rating"], 8.8)
+        self.assertEqual(movies["Inception"]["country"], "USA")
+        self.assertIsNone(movies["Inception"]["note"])
+
+    def test_point_lookups_read_only_a_few_bytes(self):
+        self.storage.add_movies([{"title": f"Movie {number}", "year": "2000", "rating": "7.0",
+                                  "poster": "", "language": "English", "country": "USA",
+                                  "awards": "N/A", "imdbID": f"tt{number}"}
+                                 for number in range(2000)])
+        reader = StorageBinary(self.file_path)
+        self.assertTrue(reader.check_if_exists("Movie 1234"))
+        self.assertFalse(reader.check_if_exists("Movie 99999"))
+        self.assertEqual(reader.get_movie("Movie 42").imdbID, "tt42")
+        self.assertIsNone(reader.get_movie("Unknown"))
+        self.assertLess(reader.io_stats()['bytes_read'], 1000)
+        self.assertGreater(os.path.getsize(self.file_path), 100000)
+        reader.close()
+
+    def test_missing_values_and_unicode(self):
+        self.storage.add_movie("Amélie", "N/A", "N/A", "", "Français", "France", "N/A", "tt0211915")
+        self.storage.update_movie("Amélie", note="Café 2")
+        reader = StorageBinary(self.file_path)
+        movie = reader.get_movie("Amélie")
+        self.assertEqual(movie["year"], "N/A")
+        self.assertEqual(movie["rating"], "N/A")
+        self.assertEqual(movie["note"], "Café 2")
+        self.assertEqual(reader.list_movies()["Amélie"], movie)
+        reader.close()
+
+    def test_update_and_delete(self):
+        self.add_inception()
+        self.storage.update_movie("Inception", rating=9.0)
+        self.assertEqual(StorageBinary(self.file_path).get_movie("Inception").rating, 9.0)
+        results = self.storage.delete_movies(["Inception", "Unknown"])
+        self.assertEqual(results, {"Inception": True, "Unknown": False})
+        self.assertFalse(StorageBinary(self.file_path).check_if_exists("Inception"))
+
+    def test_sees_changes_from_other_instances(self):
+        self.add_inception()
+        self.assertTrue(self.storage.check_if_exists("Inception"))
+        other = StorageBinary(self.file_path)
+        other.delete_movie("Inception")
+        self.assertFalse(self.storage.check_if_exists("Inception"))
+        self.assertEqual(self.storage.list_movies(), {})
+        other.close()
+
+    def test_query(self):
+        self.add_inception()
+        self.storage.add_movie("Tenet", "2020", "7.3", "", "English", "USA", "N/A", "tt6723592")
+        movies = self.storage.query(filter={'min_rating': 8}, order_by='-year')
+        self.assertEqual(list(movies), ["Inception"])
+
+    def test_initialize_and_invalid_file(self):
+        self.storage.initialize()
+        self.assertEqual(os.path.getsize(self.file_path), len(encode({})))
+        self.assertEqual(self.storage.list_movies(), {})
+        with open(self.file_path, 'wb') as file:
+            file.write(b'{"not": "binary"}' + bytes(HEADER.size))
+        with self.assertRaises(ValueError):
+            StorageBinary(self.file_path).check_if_exists("Inception")
+
+    def test_encode_shares_repeated_strings(self):
+        one = encode({"A": Movie(2000, 7.0, country="United States of America")})
+        two = encode({"A": Movie(2000, 7.0, country="United States of America"),
+                      "B": Movie(2001, 6.0, country="United States of America")})
+        # The second movie adds a record, index slots and its title, not the country again
+        self.assertLess(len(two) - len(one), 100)
+
+    def test_find_title_and_imdb_id(self):
+        self.add_inception()
+        self.assertEqual(self.storage.find_title("inception!"), "Inception")
+        self.assertEqual(self.storage.find_imdb_id("tt1375666"), "Inception")
+        self.storage.delete_movie("Inception")
+        self.assertIsNone(self.storage.find_title("Inception"))
+        self.assertIsNone(self.storage.find_imdb_id("tt1375666"))
+
+    def test_duplicate_lookups_do_not_decode_the_movies(self):
+        self.storage.add_movies([{"title": f"Movie {number}", "year": "2000", "rating": "7.0",
+                                  "poster": "", "language": "English", "country": "USA",
+                                  "awards": "Won 1 Oscar.", "imdbID": f"tt{number}"}
+                                 for number in range(500)])
+        reader = StorageBinary(self.file_path)
+        reader._read_file = None  # Any full decode fails
+        self.assertEqual(reader.find_title("MOVIE 42"), "Movie 42")
+        self.assertEqual(reader.find_imdb_id("tt7"), "Movie 7")
+        self.assertIsNone(reader.find_imdb_id("tt9999"))
+        # The new file of another instance is indexed again
+        self.storage.delete_movie("Movie 7")
+        self.assertIsNone(reader.find_imdb_id("tt7"))
+        reader.close()
+
+    def test_fetched_at_and_version_1_files(self):
+        self.storage.add_movie("Tenet", 2020, 7.3, "", "English", "USA", "N/A", "tt6723592",
+                               fetched_at=1700000000.5)
+        self.assertEqual(StorageBinary(self.file_path).get_movie("Tenet").fetched_at, 1700000000.5)
+        # A file written before fetched_at was stored
+        title, country = b"Memento", b"USA"
+        buckets = 8
+        records_offset = HEADER.size + buckets * 4
+        heap_offset = records_offset + RECORDS[1].size
+        slots = [0] * buckets
+        slots[_title_hash(title) & (buckets - 1)] = 1
+        strings = [0, NO_STRING, 0, NO_STRING, len(title), len(country)] + [0, NO_STRING] * 3
+        content = (HEADER.pack(MAGIC, 1, 0, 1, buckets, records_offset, heap_offset)
+                   + struct.pack(f'<{buckets}I', *slots)
+                   + RECORDS[1].pack(0, len(title), 2000, 8.4, *strings)
+                   + title + country)
+        with open(self.file_path, 'wb') as file:
+            file.write(content)
+        storage = StorageBinary(self.file_path)
+        self.assertEqual(storage.get_movie("Memento"), Movie(2000, 8.4, country="USA"))
+        self.assertEqual(storage.list_movies()["Memento"]["fetched_at"], None)
+
+if __name__ == '__main__':
+    unittest.main()
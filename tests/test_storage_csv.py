@@ -0,0 +1,82 @@
+import unittest
+import os
+from unittest.mock import patch
+from storage.storage_csv import StorageCsv
+
+class TestStorageCsv(unittest.TestCase):
+    def setUp(self):
+        self.file_path = 'test_movies.csv'
+        self.storage = StorageCsv(self.file_path)
+        for title, year, rating, imdb_id in (("Inception", 2010, 8.8, "tt1375666"),
+                                             ("Memento", 2000, 8.4, "tt0209144"),
+                                             ("Tenet", 2020, 7.3, "tt6723592")):
+            self.storage.add_movie(title, year, rating, "http://example.com/poster.jpg",
+                                   language="English", country="USA",
+                                   awards="N/A", imdbID=imdb_id)
+
+    def tearDown(self):
+        # Ensure the test file is removed after each test
+        for path in (self.file_path, self.file_path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_list_movies_converts_types(self):
+        movies = self.storage.list_movies()
+        self.assertEqual(list(movies), ["Inception", "Memento", "Tenet"])
+        self.assertEqual(movies["Inception"]["year"], 2010)
+        self.assertEqual(movies["Inception"]["rating"], 8.8)
+        self.assertIsNone(movies["Inception"]["note"])
+
+    def test_check_if_exists_stops_at_first_match(self):
+        with patch.object(StorageCsv, '_convert_row') as mock_convert:
+            self.assertTrue(self.storage.check_if_exists("Inception"))
+            self.assertFalse(self.storage.check_if_exists("Dunkirk"))
+            mock_convert.assert_not_called()
+
+    def test_iter_movies_converts_requested_fields_only(self):
+        title, details = next(self.storage.iter_movies(fields=['rating']))
+        self.assertEqual(title, "Inception")
+        self.assertEqual(details, {'rating': 8.8})
+
+    def test_query_streams_rows(self):
+        top = self.storage.query(order_by='-rating', limit=1)
+        self.assertEqual(list(top), ["Inception"])
+        self.assertEqual(top["Inception"]["year"], 2010)
+        recent = self.storage.query(filter={'min_year': 2005}, order_by='year')
+        self.assertEqual(list(recent), ["Inception", "Tenet"])
+
+    def test_bulk_mutations_write_once(self):
+        with patch.object(StorageCsv, '_save_data', wraps=self.storage._save_data) as mock_save:
+            added = self.storage.add_movies([
+                {"title": "Dunkirk", "year": 2017, "rating": 7.8, "poster": "",
+                 "language": "English", "country": "UK", "awards": "N/A", "imdbID": "tt5013056"},
+                {"title": "Broken"},
+            ])
+            self.assertEqual(added, {"Dunkirk": True, "Broken": False})
+            updated = self.storage.update_movies([{"title": "Tenet", "rating": 7.5},
+                                                  {"title": "Oppenheimer", "rating": 8.3}])
+            self.assertEqual(updated, {"Tenet": True, "Oppenheimer": False})
+            deleted = self.storage.delete_movies(["Memento", "Inception"])
+            self.assertEqual(deleted, {"Memento": True, "Inception": True})
+            self.assertEqual(mock_save.call_count, 3)
+        movies = self.storage.list_movies()
+        self.assertEqual(list(movies), ["Tenet", "Dunkirk"])
+        self.assertEqual(movies["Tenet"]["rating"], 7.5)
+
+    def test_find_title_and_imdb_id(self):
+        self.assertEqual(self.storage.find_title("memento"), "Memento")
+        self.assertEqual(self.storage.find_imdb_id("tt6723592"), "Tenet")
+        self.assertIsNone(self.storage.find_title("Dunkirk"))
+        self.storage.delete_movie("Memento")
+        self.assertIsNone(self.storage.find_title("Memento"))
+
+    def test_reads_files_without_fetched_at(self):
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write("title,year,rating,poster,language,country,awards,imdbID,note\n"
+                       "Memento,2000,8.4,,English,USA,N/A,tt0209144,\n")
+        self.assertIsNone(self.storage.list_movies()["Memento"]["fetched_at"])
+        self.storage.update_movies([{"title": "Memento", "fetched_at": 1700000000.5}])
+        self.assertEqual(self.storage.list_movies()["Memento"]["fetched_at"], 1700000000.5)
+
+if __name__ == '__main__':
+    unittest.main()
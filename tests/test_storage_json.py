@@ -1,5 +1,7 @@
 import unittest
 import os
+import json
+from unittest.mock import patch
 from storage.storage_json import StorageJson
 
 class TestStorageJson(unittest.TestCase):
@@ -9,8 +11,9 @@ class TestStorageJson(unittest.TestCase):
 
     def tearDown(self):
         # Ensure the test file is removed after each test
-        if os.path.exists(self.file_path):
-            os.remove(self.file_path)
+        for path in (self.file_path, self.file_path + '.journal', self.file_path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_add_movie(self):
         self.storage.add_movie(
@@ -65,5 +68,127 @@ class TestStorageJson(unittest.TestCase):
         movies = self.storage.list_movies()
         self.assertEqual(movies["Inception"]["rating"], 9.0)
 
+    def test_cached_reads_do_not_reparse(self):
+        self.storage.add_movie(
+            "Inception", 
+            2010, 
+            8.8, 
+            "http://example.com/poster.jpg",
+            language="English",
+            country="USA",
+            awards="Nominated for 8 Oscars.",
+            imdbID="tt1375666"
+        )
+        with patch('storage.storage_json.json.load', wraps=json.load) as mock_load:
+            self.assertTrue(self.storage.check_if_exists("Inception"))
+            self.storage.list_movies()
+            self.assertEqual(mock_load.call_count, 0)
+
+    def test_listed_movies_are_snapshots(self):
+        self.storage.add_movie("Inception", 2010, 8.8, "", "English", "USA", "N/A", "tt1375666")
+        before = self.storage.list_movies()
+        self.storage.update_movie("Inception", rating=9.0)
+        self.assertEqual(before["Inception"]["rating"], 8.8)
+        before["Inception"]["note"] = "Changed by the caller"
+        self.assertIsNone(self.storage.list_movies()["Inception"]["note"])
+        self.assertIsNone(self.storage.query()["Inception"]["note"])
+
+    def test_cache_reloads_after_external_edit(self):
+        self.storage.add_movie(
+            "Inception", 
+            2010, 
+            8.8, 
+            "http://example.com/poster.jpg",
+            language="English",
+            country="USA",
+            awards="Nominated for 8 Oscars.",
+            imdbID="tt1375666"
+        )
+        with open(self.file_path, 'w') as file:
+            json.dump({"Memento": {"year": 2000, "rating": 8.4}}, file)
+        movies = self.storage.list_movies()
+        self.assertIn("Memento", movies)
+        self.assertNotIn("Inception", movies)
+
+    def test_journal_appends_and_replays(self):
+        storage = StorageJson(self.file_path, journal=True)
+        storage.add_movie("Inception", 2010, 8.8, "http://example.com/poster.jpg",
+                          language="English", country="USA",
+                          awards="Nominated for 8 Oscars.", imdbID="tt1375666")
+        storage.add_movie("Memento", 2000, 8.4, "http://example.com/memento.jpg",
+                          language="English", country="USA",
+                          awards="N/A", imdbID="tt0209144")
+        storage.update_movie("Inception", rating=9.0)
+        storage.delete_movie("Memento")
+        self.assertFalse(os.path.exists(self.file_path))
+        with open(self.file_path + '.journal') as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+        movies = StorageJson(self.file_path).list_movies()
+        self.assertEqual(list(movies), ["Inception"])
+        self.assertEqual(movies["Inception"]["rating"], 9.0)
+
+    def test_journal_compacts_into_snapshot(self):
+        storage = StorageJson(self.file_path, journal=True, journal_max_records=2)
+        for year in (2001, 2002, 2003):
+            storage.add_movie(f"Movie {year}", year, 7.0, "", language="English",
+                              country="USA", awards="N/A", imdbID=f"tt{year}")
+        self.assertFalse(os.path.exists(self.file_path + '.journal'))
+        with open(self.file_path) as file:
+            self.assertEqual(len(json.load(file)), 3)
+
+    def test_query_filters_sorts_and_paginates(self):
+        for title, year, rating in (("Inception", 2010, 8.8),
+                                    ("Memento", 2000, 8.4),
+                                    ("Tenet", 2020, 7.3),
+                                    ("Unrated", 2024, "N/A")):
+            self.storage.add_movie(title, year, rating, "", language="English",
+                                   country="USA", awards="N/A", imdbID="")
+        top = self.storage.query(filter={'min_rating': 8.0}, order_by='-rating')
+        self.assertEqual(list(top), ["Inception", "Memento"])
+        page = self.storage.query(order_by='-year', limit=2, offset=1)
+        self.assertEqual(list(page), ["Tenet", "Inception"])
+        self.assertEqual(list(self.storage.query(order_by='-rating'))[-1], "Unrated")
+        self.assertEqual(list(self.storage.query(filter={'title_contains': 'EN'})),
+                         ["Memento", "Tenet"])
+        with self.assertRaises(ValueError):
+            self.storage.query(order_by='poster')
+
+    def test_bulk_mutations_write_once(self):
+        with patch.object(StorageJson, '_save_data', wraps=self.storage._save_data) as mock_save:
+            added = self.storage.add_movies([
+            {"title": "Inception", "year": 2010, "rating": 8.8, "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt1375666"},
+            {"title": "Memento", "year": 2000, "rating": 8.4, "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt0209144"},
+            {"title": "Broken", "year": 2001},
+        ])
+            self.assertEqual(added, {"Inception": True, "Memento": True, "Broken": False})
+            updated = self.storage.update_movies([{"title": "Inception", "rating": 9.0},
+                                                  {"title": "Dunkirk", "rating": 7.8}])
+            self.assertEqual(updated, {"Inception": True, "Dunkirk": False})
+            deleted = self.storage.delete_movies(["Memento", "Dunkirk"])
+            self.assertEqual(deleted, {"Memento": True, "Dunkirk": False})
+            self.assertEqual(mock_save.call_count, 3)
+        movies = StorageJson(self.file_path).list_movies()
+        self.assertEqual(list(movies), ["Inception"])
+        self.assertEqual(movies["Inception"]["rating"], 9.0)
+
+    def test_find_title_and_imdb_id(self):
+        self.storage.add_movie("Amélie", 2001, 8.3, "", "French", "France", "N/A", "tt0211915")
+        self.assertEqual(self.storage.find_title("amelie"), "Amélie")
+        self.assertEqual(self.storage.find_imdb_id("tt0211915"), "Amélie")
+        # The index follows adds and deletes, also the bulk ones
+        self.storage.add_movies([{"title": "Inception", "year": 2010, "rating": 8.8, "poster": "",
+                                  "language": "English", "country": "USA", "awards": "N/A",
+                                  "imdbID": "tt1375666"}])
+        self.assertEqual(self.storage.find_title("INCEPTION"), "Inception")
+        self.storage.delete_movies(["Amélie"])
+        self.assertIsNone(self.storage.find_title("Amelie"))
+        self.assertIsNone(self.storage.find_imdb_id("tt0211915"))
+        # Writes from another instance are picked up
+        StorageJson(self.file_path).add_movie("Tenet", 2020, 7.3, "", "English", "USA", "N/A", "tt6723592")
+        self.assertEqual(self.storage.find_title("tenet"), "Tenet")
+
 if __name__ == '__main__':
     unittest.main()
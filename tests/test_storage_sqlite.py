@@ -0,0 +1,141 @@
+import unittest
+import os
+import sqlite3
+from storage.storage_sqlite import StorageSqlite
+
+class TestStorageSqlite(unittest.TestCase):
+    def setUp(self):
+        self.file_path = 'test_movies.db'
+        self.storage = StorageSqlite(self.file_path)
+
+    def tearDown(self):
+        # Ensure the test database is removed after each test
+        self.storage.close()
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def add_inception(self):
+        self.storage.add_movie(
+            "Inception", 
+            "2010", 
+            "8.8", 
+            "http://example.com/poster.jpg",
+            language="English",
+            country="USA",
+            awards="Nominated for 8 Oscars.",
+            imdbID="tt1375666"
+        )
+
+    def test_add_movie(self):
+        self.add_inception()
+        self.assertTrue(self.storage.check_if_exists("Inception"))
+        movies = self.storage.list_movies()
+        self.assertEqual(movies["Inception"]["year"], 2010)
+        self.assertEqual(movies["Inception"]["rating"], 8.8)
+        self.assertEqual(movies["Inception"]["country"], "USA")
+        self.assertEqual(movies["Inception"]["imdbID"], "tt1375666")
+
+    def test_missing_rating_is_reported_as_na(self):
+        self.storage.add_movie("Unrated", "2024", "N/A", "", "English",
+                               "USA", "N/A", "tt0000001")
+        self.assertEqual(self.storage.list_movies()["Unrated"]["rating"], "N/A")
+
+    def test_delete_movie(self):
+        self.add_inception()
+        self.storage.delete_movie("Inception")
+        self.assertFalse(self.storage.check_if_exists("Inception"))
+
+    def test_update_movie(self):
+        self.add_inception()
+        self.storage.update_movie("Inception", rating=9.0, note="Rewatch")
+        movies = self.storage.list_movies()
+        self.assertEqual(movies["Inception"]["rating"], 9.0)
+        self.assertEqual(movies["Inception"]["note"], "Rewatch")
+        self.assertEqual(movies["Inception"]["year"], 2010)
+
+    def test_data_persists_across_connections(self):
+        self.add_inception()
+        self.storage.close()
+        self.storage = StorageSqlite(self.file_path)
+        self.assertIn("Inception", self.storage.list_movies())
+
+    def test_query_is_pushed_down(self):
+        for title, year, rating, imdb_id in (("Inception", "2010", "8.8", "tt1"),
+                                             ("Memento", "2000", "8.4", "tt2"),
+                                             ("Tenet", "2020", "7.3", "tt3"),
+                                             ("Unrated", "2024", "N/A", "tt4")):
+            self.storage.add_movie(title, year, rating, "", "English",
+                                   "USA", "N/A", imdb_id)
+        top = self.storage.query(filter={'min_rating': 8.0}, order_by='-rating')
+        self.assertEqual(list(top), ["Inception", "Memento"])
+        page = self.storage.query(order_by='-year', limit=2, offset=1)
+        self.assertEqual(list(page), ["Tenet", "Inception"])
+        self.assertEqual(list(self.storage.query(order_by='-rating'))[-1], "Unrated")
+        self.assertEqual(list(self.storage.query(filter={'title_contains': 'en'})),
+                         ["Memento", "Tenet"])
+        plan = self.storage._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT title FROM movies WHERE rating >= 8").fetchall()
+        self.assertIn("idx_movies_rating", str(plan))
+
+    def test_bulk_mutations(self):
+        added = self.storage.add_movies([
+            {"title": "Inception", "year": 2010, "rating": 8.8, "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt1375666"},
+            {"title": "Memento", "year": 2000, "rating": 8.4, "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt0209144"},
+            {"title": "Broken", "year": 2001},
+        ])
+        self.assertEqual(added, {"Inception": True, "Memento": True, "Broken": False})
+        updated = self.storage.update_movies([{"title": "Inception", "rating": 9.0},
+                                              {"title": "Dunkirk", "rating": 7.8}])
+        self.assertEqual(updated, {"Inception": True, "Dunkirk": False})
+        deleted = self.storage.delete_movies(["Memento", "Dunkirk"])
+        self.assertEqual(deleted, {"Memento": True, "Dunkirk": False})
+        movies = self.storage.list_movies()
+        self.assertEqual(list(movies), ["Inception"])
+        self.assertEqual(movies["Inception"]["rating"], 9.0)
+
+    def test_imdb_id_of_another_title_is_refused(self):
+        self.add_inception()
+        with self.assertRaises(ValueError):
+            self.storage.add_movie("Inception (2010)", "2010", "8.8", "", "English",
+                                   "USA", "N/A", "tt1375666")
+        results = self.storage.add_movies([
+            {"title": "Origin", "year": "2010", "rating": "8.8", "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt1375666"},
+            {"title": "Memento", "year": "2000", "rating": "8.4", "poster": "",
+             "language": "English", "country": "USA", "awards": "N/A", "imdbID": "tt0209144"}])
+        self.assertEqual(results, {"Origin": False, "Memento": True})
+        self.assertEqual(sorted(self.storage.list_movies()), ["Inception", "Memento"])
+        # Other constraint violations are not reported as imdbID clashes
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.storage.add_movie(None, "2010", "8.8", "", "English", "USA", "N/A", "tt0000001")
+        # The same title is still overwritten
+        self.storage.add_movie("Inception", "2010", "9.0", "", "English", "USA", "N/A", "tt1375666")
+        self.assertEqual(self.storage.list_movies()["Inception"]["rating"], 9.0)
+
+    def test_find_title_and_imdb_id(self):
+        self.add_inception()
+        self.assertEqual(self.storage.find_title("  INCEPTION "), "Inception")
+        self.assertEqual(self.storage.find_imdb_id("tt1375666"), "Inception")
+        self.assertIsNone(self.storage.find_imdb_id(""))
+        self.storage.delete_movie("Inception")
+        self.assertIsNone(self.storage.find_title("Inception"))
+
+    def test_old_databases_are_migrated(self):
+        self.storage.close()
+        os.remove(self.file_path)
+        conn = sqlite3.connect(self.file_path)
+        conn.execute("CREATE TABLE movies (id INTEGER PRIMARY KEY, title TEXT NOT NULL, year INTEGER, "
+                     "rating REAL, poster TEXT, language TEXT, country TEXT, awards TEXT, "
+                     "imdbID TEXT, note TEXT)")
+        conn.execute("INSERT INTO movies (title, imdbID) VALUES ('Amélie', 'tt0211915')")
+        conn.commit()
+        conn.close()
+        self.storage = StorageSqlite(self.file_path)
+        self.assertEqual(self.storage.find_title("amelie"), "Amélie")
+        self.storage.update_movies([{"title": "Amélie", "fetched_at": 1700000000.5}])
+        self.assertEqual(self.storage.get_movie("Amélie")["fetched_at"], 1700000000.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import pytest
+from movie_app.website import WebsiteGenerator, render_card
+from storage.movie import Movie
+
+TEMPLATE = ("<title>__TEMPLATE_TITLE__</title>\n"
+            "<ul class=\"movie-grid\">\n__TEMPLATE_MOVIE_GRID__\n</ul>\n")
+
+MOVIES = {
+    "Inception": {"year": "2010", "rating": "8.8", "poster": "http://example.com/inception.jpg",
+                  "language": "English", "country": "USA", "awards": "Won 4 Oscars.",
+                  "imdbID": "tt1375666", "note": None},
+    "Memento": {"year": "2000", "rating": "8.4", "poster": "http://example.com/memento.jpg",
+                "language": "English", "country": "USA", "awards": "N/A",
+                "imdbID": "tt0209144", "note": "Watch backwards"},
+}
+
+
+@pytest.fixture
+def generator(tmp_path):
+    template_path = tmp_path / 'index_template.html'
+    template_path.write_text(TEMPLATE)
+    return WebsiteGenerator(template_path=str(template_path),
+                            output_path=str(tmp_path / 'index.html'))
+
+
+def test_render_card():
+    card = render_card("Memento", MOVIES["Memento"])
+    assert card == (
+        "<li class='movie'>\n"
+        "<a href='https://www.imdb.com/title/tt0209144' target='_blank'>\n"
+        "<img src='http://example.com/memento.jpg' alt='Memento poster' "
+        "class='movie-poster' title='Watch backwards'>\n"
+        "</a>\n"
+        "<div class='movie-info'>\n"
+        "<div class='movie-title'>Memento</div>\n"
+        "<div class='movie-year'>2000</div>\n"
+        "<div class='movie-language'>English</div>\n"
+        "<div class='movie-country'>🇺🇸 USA</div>\n"
+        "</div>\n"
+        "</li>\n"
+    )
+
+
+def test_render_card_of_legacy_record():
+    # Records saved before country and poster were stored have neither
+    details = Movie.from_dict({"year": "1999", "rating": "7.5", "imdbID": "tt0000001"})
+    card = render_card("Old Movie", details)
+    assert "<img src='default_poster_url'" in card
+    assert "<div class='movie-country'>🏳️ Unknown</div>" in card
+    assert "<div class='movie-language'>Unknown</div>" in card
+
+
+def test_generate_streams_cards_into_template(generator):
+    generator.generate(MOVIES.items())
+    with open(generator.output_path) as file:
+        content = file.read()
+    assert content.startswith("<title>My Movie Collection</title>")
+    assert content.index("Inception") < content.index("Memento")
+    assert "Awards: Won 4 Oscars." in content
+    assert "__TEMPLATE_MOVIE_GRID__" not in content
+    assert generator.rendered == 2
+
+
+def test_regeneration_only_renders_changed_cards(generator):
+    generator.generate(MOVIES.items())
+    changed = dict(MOVIES, Memento=dict(MOVIES["Memento"], rating="8.5"))
+    generator.generate(changed.items())
+    assert (generator.rendered, generator.reused) == (1, 1)
+    generator.generate(changed.items())
+    assert (generator.rendered, generator.reused) == (0, 2)
+
+
+def paged_movies(count):
+    return {f"Movie {number:03}": dict(MOVIES["Inception"], year=str(2000 + number % 3),
+                                       imdbID=f"tt{number:07}")
+            for number in range(count)}
+
+
+def test_generate_pages_shards_the_grid(tmp_path, generator):
+    (tmp_path / 'index_template.html').write_text(TEMPLATE + "__TEMPLATE_PAGINATION__\n")
+    report = generator.generate_pages(paged_movies(25).items(), page_size=10, workers=2)
+    assert sorted(report['written']) == ["index-2.html", "index-3.html", "index.html"]
+    second = (tmp_path / 'index-2.html').read_text()
+    assert second.count("<li class='movie'>") == 10
+    assert "href='index.html' rel='prev'" in second
+    assert "href='index-3.html' rel='next'" in second
+    assert (tmp_path / 'index-3.html').read_text().count("<li class='movie'>") == 5
+
+
+def test_small_sites_are_rendered_in_process(generator, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no worker processes for a small site")
+
+    monkeypatch.setattr('concurrent.futures.ProcessPoolExecutor', no_pool)
+    report = generator.generate_pages(paged_movies(25).items(), page_size=10)
+    assert len(report['written']) == 3
+
+
+def test_generate_pages_only_rewrites_changed_pages(generator):
+    movies = paged_movies(25)
+    generator.generate_pages(movies.items(), page_size=10, workers=1)
+    movies["Movie 024"] = dict(movies["Movie 024"], rating="9.9", awards="Won 1 Oscar.")
+    report = generator.generate_pages(movies.items(), page_size=10, workers=1)
+    assert report['written'] == ["index-3.html"]
+    assert (generator.rendered, generator.reused) == (1, 24)
+
+    report = generator.generate_pages(list(movies.items())[:15], page_size=10, workers=1)
+    assert report['written'] == ["index-2.html"]
+    assert not os.path.exists(os.path.join(os.path.dirname(generator.output_path), 'index-3.html'))
+
+
+def test_generate_pages_by_year(tmp_path, generator):
+    generator.generate_pages(paged_movies(6).items(), page_size=10, group_by='year', workers=1)
+    overview = (tmp_path / 'by-year.html').read_text()
+    assert overview.index("year-2002.html") < overview.index("year-2000.html")
+    assert "2001 (2)" in overview
+    assert (tmp_path / 'year-2001.html').read_text().count("<li class='movie'>") == 2